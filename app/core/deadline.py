@@ -0,0 +1,119 @@
+# app/core/deadline.py
+"""
+Prazo (deadline) por request, propagado por ContextVar até os clientes upstream.
+
+A rota abre o escopo; Birdeye, Solscan e o LLM consultam o tempo restante para
+limitar timeout por tentativa, backoff e retries. Tasks filhas (gather,
+ensure_future) herdam o prazo.
+
+    with deadline_scope(2.5):                       # segundos; None = sem prazo
+        r = await client.get(url, timeout=cap(HTTP_TIMEOUT))
+        await sleep(backoff)                        # DeadlineExceeded se não couber
+        await wait(limiter.acquire(path))           # espera limitada ao restante
+
+Escopos aninhados nunca estendem o prazo de fora. Sem escopo, tudo é no-op.
+
+Chamadas coalescidas (single-flight) servem vários requests: rodam com o maior prazo
+entre os chamadores (ver widen), então retries e backoff param quando nenhum deles
+ainda espera. Refresh SWR roda sem prazo (ver detached_context). Cada chamador só
+limita a própria espera.
+"""
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Prazo do request esgotado (é um TimeoutError: quem já trata timeout continua tratando)."""
+
+
+def _exceeded(what: str, msg: str = "prazo do request esgotado") -> DeadlineExceeded:
+    return DeadlineExceeded(f"{what} -> {msg}" if what else msg)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """Abre um prazo de `seconds` a partir de agora (None/<=0 não muda nada)."""
+    if seconds is None or seconds <= 0:
+        yield _DEADLINE.get()
+        return
+    at = time.monotonic() + seconds
+    outer = _DEADLINE.get()
+    if outer is not None:
+        at = min(at, outer)
+    token = _DEADLINE.set(at)
+    try:
+        yield at
+    finally:
+        _DEADLINE.reset(token)
+
+
+def detached_context() -> contextvars.Context:
+    """Cópia do contexto atual sem prazo, para tasks que não pertencem a um único request."""
+    ctx = contextvars.copy_context()
+    ctx.run(_DEADLINE.set, None)
+    return ctx
+
+
+def current() -> Optional[float]:
+    """Instante (time.monotonic) em que o prazo atual acaba, ou None sem prazo."""
+    return _DEADLINE.get()
+
+
+def widen(at: Optional[float]) -> None:
+    """Estende o prazo do contexto atual até `at` (None = sem prazo); nunca encurta."""
+    cur = _DEADLINE.get()
+    if cur is not None and (at is None or at > cur):
+        _DEADLINE.set(at)
+
+
+def remaining() -> Optional[float]:
+    """Segundos restantes (pode ser <= 0) ou None sem prazo."""
+    at = _DEADLINE.get()
+    return None if at is None else at - time.monotonic()
+
+
+def expired() -> bool:
+    r = remaining()
+    return r is not None and r <= 0
+
+
+def check(what: str = "") -> None:
+    if expired():
+        raise _exceeded(what)
+
+
+def cap(timeout: float, what: str = "") -> float:
+    """min(timeout, restante); DeadlineExceeded se o prazo já acabou."""
+    r = remaining()
+    if r is None:
+        return timeout
+    if r <= 0:
+        raise _exceeded(what)
+    return min(timeout, r)
+
+
+async def sleep(delay: float, what: str = "") -> None:
+    """Backoff que respeita o prazo: se não sobra tempo para dormir e tentar de novo, desiste já."""
+    r = remaining()
+    if r is not None and r <= delay:
+        raise _exceeded(what, "sem prazo para novo retry")
+    await asyncio.sleep(delay)
+
+
+async def wait(aw: Awaitable[T], what: str = "") -> T:
+    """Aguarda `aw` no máximo até o prazo (cancela e levanta DeadlineExceeded)."""
+    r = remaining()
+    if r is None:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, timeout=max(0.0, r))
+    except asyncio.TimeoutError:
+        raise _exceeded(what) from None
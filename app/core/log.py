@@ -0,0 +1,196 @@
+# app/core/log.py
+"""
+Logging estruturado e não bloqueante.
+
+Quem loga só enfileira o record (QueueHandler com fila limitada); uma thread
+(QueueListener) formata em JSON e escreve no stdout. Fila cheia descarta e conta,
+nunca trava o event loop.
+
+    from app.core.log import get_logger
+    log = get_logger(__name__)
+    log.info("enriquecido", mint=mint, stage="enrich", duration_ms=12.3)
+    log.sample("selecionado", mint=mint)   # linha por token: DEBUG + amostragem
+
+Variáveis: LOG_LEVEL (INFO), LOG_FORMAT (json | text), LOG_SAMPLE_RATE (fração das
+linhas por token emitidas quando DEBUG está ligado), LOG_QUEUE_SIZE.
+"""
+import os
+import sys
+import time
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional
+    orjson = None
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+ROOT_LOGGER = "memebot"
+_RESERVED = ("ts", "level", "logger", "msg")
+
+
+def _json(obj: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por record: ts, level, logger, msg + campos estruturados."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for k, v in (getattr(record, "fields", None) or {}).items():
+            out[k if k not in _RESERVED else f"field_{k}"] = v
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return _json(out)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legível para desenvolvimento: hora nível logger msg k=v ..."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{k}={v}" for k, v in (getattr(record, "fields", None) or {}).items())
+        line = f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.levelname:<7} {record.name} {record.getMessage()}"
+        if fields:
+            line = f"{line} {fields}"
+        if record.exc_text:
+            line = f"{line}\n{record.exc_text}"
+        return line
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler que nunca bloqueia: fila cheia -> descarta e conta."""
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Só resolve msg % args e o traceback aqui; a formatação (JSON) roda na thread do listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_lock = threading.Lock()
+_handler: Optional[_DroppingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(
+    level: str = LOG_LEVEL,
+    fmt: str = LOG_FORMAT,
+    stream=None,
+    queue_size: int = LOG_QUEUE_SIZE,
+) -> None:
+    """(Re)configura o logger 'memebot'. Idempotente; chamado sob demanda por get_logger."""
+    global _handler, _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+        q: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=max(1, queue_size))
+        out = logging.StreamHandler(stream or sys.stdout)
+        out.setFormatter(TextFormatter() if fmt == "text" else JsonFormatter())
+
+        root = logging.getLogger(ROOT_LOGGER)
+        if _handler is not None:
+            root.removeHandler(_handler)
+        _handler = _DroppingQueueHandler(q)
+        root.addHandler(_handler)
+        root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+        root.propagate = False
+
+        _listener = QueueListener(q, out)
+        _listener.start()
+
+
+def flush_logs() -> None:
+    """Esvazia a fila e para a thread (atexit / testes). O próximo setup religa."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(flush_logs)
+
+
+def log_stats() -> Dict[str, Any]:
+    return {
+        "level": logging.getLevelName(logging.getLogger(ROOT_LOGGER).level).lower(),
+        "queued": _handler.queue.qsize() if _handler is not None else 0,
+        "dropped": _handler.dropped if _handler is not None else 0,
+    }
+
+
+class Logger:
+    """Fachada fina sobre logging.Logger com campos estruturados via kwargs."""
+
+    __slots__ = ("_log", "sample_rate")
+
+    def __init__(self, logger: logging.Logger, sample_rate: float = LOG_SAMPLE_RATE):
+        self._log = logger
+        self.sample_rate = sample_rate
+
+    def _emit(self, level: int, msg: str, exc_info: Any, fields: Dict[str, Any]) -> None:
+        if self._log.isEnabledFor(level):
+            self._log.log(level, msg, exc_info=exc_info, extra={"fields": fields}, stacklevel=3)
+
+    def debug(self, msg: str, *, exc_info: Any = None, **fields: Any) -> None:
+        self._emit(logging.DEBUG, msg, exc_info, fields)
+
+    def info(self, msg: str, *, exc_info: Any = None, **fields: Any) -> None:
+        self._emit(logging.INFO, msg, exc_info, fields)
+
+    def warning(self, msg: str, *, exc_info: Any = None, **fields: Any) -> None:
+        self._emit(logging.WARNING, msg, exc_info, fields)
+
+    def error(self, msg: str, *, exc_info: Any = None, **fields: Any) -> None:
+        self._emit(logging.ERROR, msg, exc_info, fields)
+
+    def sample(self, msg: str, **fields: Any) -> None:
+        """Linha por token (laços quentes): DEBUG e só uma fração LOG_SAMPLE_RATE."""
+        if not self._log.isEnabledFor(logging.DEBUG):
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        self._log.log(logging.DEBUG, msg, extra={"fields": fields}, stacklevel=2)
+
+    def enabled(self, level: int = logging.DEBUG) -> bool:
+        return self._log.isEnabledFor(level)
+
+
+def get_logger(name: str) -> Logger:
+    """Logger filho de 'memebot' (ex.: app.services.watchlist -> memebot.services.watchlist)."""
+    if _listener is None:
+        setup_logging()
+    short = name[4:] if name.startswith("app.") else name
+    return Logger(logging.getLogger(f"{ROOT_LOGGER}.{short}"))
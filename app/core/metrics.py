@@ -0,0 +1,285 @@
+# app/core/metrics.py
+"""
+Métricas em memória no formato texto do Prometheus (GET /metrics).
+
+Sem dependência externa: cada série é uma lista indexada pela tupla de labels.
+Labels são passados posicionalmente, na ordem de `labelnames`:
+
+    UPSTREAM_SECONDS.observe(dt, "birdeye", "/defi/price", 200)
+    FALLBACKS.inc("birdeye", "overview_to_price")
+
+Em laços quentes use a série pré-resolvida (labels()), que evita montar a tupla
+e o dict lookup: STAGE_SCORE = STAGE_SECONDS.labels("score"); STAGE_SCORE.observe(dt).
+
+Não é thread-safe de propósito (tudo roda no event loop); chamadas a partir de
+threads (asyncio.to_thread) podem perder um incremento, nunca corrompem o dict.
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latências de rede/LLM: 5ms .. 30s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Etapas locais (normalize/merge/score): 10µs .. 100ms
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01, 0.1, 1.0, 10.0, 30.0)
+
+_REGISTRY: List["_Metric"] = []
+
+
+def _escape(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        _REGISTRY.append(self)
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        head = f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n"
+        return head + "".join(f"{line}\n" for line in self._samples())
+
+    def clear(self) -> None:
+        # Zera no lugar: células pré-resolvidas (labels()) continuam válidas
+        for v in self._values.values():
+            for i in range(len(v)):
+                v[i] = 0
+
+
+class _Cell:
+    """Série já resolvida (labels fixos): caminho quente sem montar tupla nem dict lookup."""
+    __slots__ = ("_v",)
+
+    def __init__(self, v: List[float]):
+        self._v = v
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._v[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._v[0] -= amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def _cell(self, labels: Tuple) -> List[float]:
+        v = self._values.get(labels)
+        if v is None:
+            v = self._values[labels] = [0.0]
+        return v
+
+    def labels(self, *labels: Any) -> _Cell:
+        return _Cell(self._cell(labels))
+
+    def inc(self, *labels: Any, amount: float = 1.0) -> None:
+        self._cell(labels)[0] += amount
+
+    def value(self, *labels: Any) -> float:
+        v = self._values.get(labels)
+        return v[0] if v else 0.0
+
+    def _samples(self) -> Iterable[str]:
+        for labels, v in sorted(self._values.items(), key=lambda kv: tuple(map(str, kv[0]))):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_num(v[0])}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: Any, amount: float = 1.0) -> None:
+        self._cell(labels)[0] -= amount
+
+    def set(self, value: float, *labels: Any) -> None:
+        self._cell(labels)[0] = float(value)
+
+
+class _HistogramCell:
+    __slots__ = ("_d", "_buckets")
+
+    def __init__(self, d: List[float], buckets: Tuple[float, ...]):
+        self._d = d
+        self._buckets = buckets
+
+    def observe(self, value: float) -> None:
+        d = self._d
+        d[bisect_left(self._buckets, value)] += 1
+        d[-1] += value
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("_cell", "_t0")
+
+    def __init__(self, cell: _HistogramCell):
+        self._cell = cell
+
+    def __enter__(self) -> "_Timer":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._cell.observe(time.perf_counter() - self._t0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [contagem por bucket (+Inf no fim)..., soma]; total = soma das contagens
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def _series(self, labels: Tuple) -> List[float]:
+        d = self._values.get(labels)
+        if d is None:
+            d = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        return d
+
+    def labels(self, *labels: Any) -> _HistogramCell:
+        """Série pré-resolvida para labels fixos (etapas do pipeline)."""
+        return _HistogramCell(self._series(labels), self.buckets)
+
+    def observe(self, value: float, *labels: Any) -> None:
+        d = self._series(labels)
+        d[bisect_left(self.buckets, value)] += 1
+        d[-1] += value
+
+    def time(self, *labels: Any) -> _Timer:
+        """with HIST.time("label"): ... — observa a duração do bloco."""
+        return _Timer(self.labels(*labels))
+
+    def count(self, *labels: Any) -> int:
+        d = self._values.get(labels)
+        return int(sum(d[:-1])) if d else 0
+
+    def _samples(self) -> Iterable[str]:
+        n = len(self.buckets)
+        for labels, d in sorted(self._values.items(), key=lambda kv: tuple(map(str, kv[0]))):
+            acc = 0
+            for i, le in enumerate(self.buckets + (float("inf"),)):
+                acc += d[i]
+                le_label = 'le="' + _num(le) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le_label)} {acc}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(d[n + 1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {acc}"
+
+
+def render_metrics() -> str:
+    return "".join(m.render() for m in _REGISTRY)
+
+
+def reset_metrics() -> None:
+    """Zera todas as séries (testes)."""
+    for m in _REGISTRY:
+        m.clear()
+
+
+# ------------------------------
+# Métricas da aplicação
+# ------------------------------
+UPSTREAM_SECONDS = Histogram(
+    "memebot_upstream_request_seconds",
+    "Latência de cada request upstream (por tentativa).",
+    ("upstream", "endpoint", "status"),
+)
+UPSTREAM_INFLIGHT = Gauge(
+    "memebot_upstream_inflight_requests",
+    "Requests upstream em andamento.",
+    ("upstream",),
+)
+UPSTREAM_RETRIES = Counter(
+    "memebot_upstream_retries_total",
+    "Novas tentativas após 429/5xx.",
+    ("upstream", "endpoint", "status"),
+)
+FALLBACKS = Counter(
+    "memebot_fallbacks_total",
+    "Caminhos de fallback usados (ex.: overview -> price, Solscan v2 -> v1).",
+    ("upstream", "kind"),
+)
+SOLSCAN_META_SECONDS = Histogram(
+    "memebot_solscan_meta_seconds",
+    "Tempo total do token_meta na Solscan por caminho (v2, v1, v2_then_v1).",
+    ("path",),
+)
+STAGE_SECONDS = Histogram(
+    "memebot_stage_seconds",
+    "Tempo por etapa do pipeline (normalize, merge, score, llm, enrich). merge inclui score.",
+    ("stage",),
+    buckets=STAGE_BUCKETS,
+)
+HTTP_INFLIGHT = Gauge(
+    "memebot_http_inflight_requests",
+    "Requests HTTP em andamento nesta instância.",
+)
+HTTP_SECONDS = Histogram(
+    "memebot_http_request_seconds",
+    "Latência das rotas da API.",
+    ("method", "route", "status"),
+)
+
+
+STAGE_NORMALIZE = STAGE_SECONDS.labels("normalize")
+STAGE_MERGE = STAGE_SECONDS.labels("merge")
+STAGE_SCORE = STAGE_SECONDS.labels("score")
+STAGE_LLM = STAGE_SECONDS.labels("llm")
+STAGE_ENRICH = STAGE_SECONDS.labels("enrich")
+
+
+class MetricsMiddleware:
+    """ASGI puro (sem BaseHTTPMiddleware): gauge de requests em voo + latência por rota."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def _send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_INFLIGHT.inc()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            HTTP_INFLIGHT.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_SECONDS.observe(time.perf_counter() - started, scope.get("method", ""), path, status[0])
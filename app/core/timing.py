@@ -0,0 +1,157 @@
+# app/core/timing.py
+"""
+Server-Timing por request: cronômetros de etapa num ContextVar.
+
+O ServerTimingMiddleware abre um RequestTimings por request HTTP; qualquer código
+abaixo dele (rotas, serviços e tasks filhas de gather/ensure_future, que herdam o
+contexto) marca etapas sem receber nada por parâmetro:
+
+    with stage("solscan"):
+        meta = await sol.token_meta(mint)
+    overview = await timed("birdeye_overview", be.overview_with_fallback(mint))
+    record("score", dt)
+
+Fora de um request (ingester, watchlist, testes) tudo vira no-op.
+Etapas repetidas (rota em lote) somam duração e contagem; etapas em paralelo se
+sobrepõem, então a soma delas pode passar do "total".
+"""
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class RequestTimings:
+    __slots__ = ("started", "_stages")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self._stages: Dict[str, List[float]] = {}  # nome -> [segundos, contagem]
+
+    def add(self, name: str, seconds: float) -> None:
+        s = self._stages.get(name)
+        if s is None:
+            self._stages[name] = [seconds, 1]
+        else:
+            s[0] += seconds
+            s[1] += 1
+
+    def __bool__(self) -> bool:
+        return bool(self._stages)
+
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def header(self) -> str:
+        """Valor do header Server-Timing (durações em ms; desc="Nx" quando repetida)."""
+        parts = []
+        for name, (secs, n) in self._stages.items():
+            part = f"{name};dur={secs * 1000:.1f}"
+            if n > 1:
+                part += f';desc="{int(n)}x"'
+            parts.append(part)
+        parts.append(f"total;dur={self.total() * 1000:.1f}")
+        return ", ".join(parts)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Corpo do campo `_timings` (modo debug)."""
+        return {
+            "total_ms": round(self.total() * 1000, 2),
+            "stages": {
+                name: {"ms": round(secs * 1000, 2), "count": int(n)}
+                for name, (secs, n) in self._stages.items()
+            },
+        }
+
+
+_CURRENT: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _CURRENT.get()
+
+
+def detach_timings() -> None:
+    """Desliga o Server-Timing no contexto atual (task que não é do request; use com Context.run)."""
+    _CURRENT.set(None)
+
+
+def record(name: str, seconds: float) -> None:
+    """Soma uma duração já medida (ex.: reaproveitando o dt da métrica)."""
+    t = _CURRENT.get()
+    if t is not None:
+        t.add(name, seconds)
+
+
+class _Stage:
+    __slots__ = ("_name", "_timings", "_t0")
+
+    def __init__(self, name: str, timings: Optional[RequestTimings]):
+        self._name = name
+        self._timings = timings
+
+    def __enter__(self) -> "_Stage":
+        if self._timings is not None:
+            self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._timings is not None:
+            self._timings.add(self._name, time.perf_counter() - self._t0)
+
+
+def stage(name: str) -> _Stage:
+    """with stage("solscan"): ... — mede o bloco (inclusive awaits) no request atual."""
+    return _Stage(name, _CURRENT.get())
+
+
+async def timed(name: str, aw: Awaitable[T]) -> T:
+    """Await medido; útil dentro de asyncio.gather, onde não cabe um `with`."""
+    t = _CURRENT.get()
+    if t is None:
+        return await aw
+    t0 = time.perf_counter()
+    try:
+        return await aw
+    finally:
+        t.add(name, time.perf_counter() - t0)
+
+
+def with_timings(body: Dict[str, Any], debug: bool) -> Dict[str, Any]:
+    """Anexa `_timings` ao corpo da rota quando debug=true (sem mexer no dict original)."""
+    t = _CURRENT.get()
+    if not debug or t is None:
+        return body
+    return {**body, "_timings": t.as_dict()}
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI puro: abre o RequestTimings do request e escreve o header Server-Timing
+    no http.response.start (só quando alguma etapa foi marcada). Em respostas
+    em streaming, vale o que rodou antes do primeiro byte.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+
+        async def _send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and timings:
+                headers = list(message.get("headers") or [])
+                headers.append((b"server-timing", timings.header().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _CURRENT.set(timings)
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _CURRENT.reset(token)
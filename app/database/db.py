@@ -0,0 +1,284 @@
+# app/database/db.py
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional
+
+# Banco local (SQLite). Em produção aponte para um volume persistente.
+DB_PATH = os.getenv("DB_PATH", "memebot.db")
+
+
+def connect(path: str = DB_PATH) -> sqlite3.Connection:
+    """Conexão SQLite em WAL (leitores não bloqueiam o escritor), compartilhável entre threads."""
+    if path != ":memory:":
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class _SQLiteStore:
+    """Base: uma conexão por store + lock (sqlite3 não é thread-safe por conexão)."""
+
+    SCHEMA = ""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ------------------------------
+# Meta de tokens (Solscan) com TTL longo e cache negativo
+# ------------------------------
+class TokenMetaStore(_SQLiteStore):
+    """
+    Guarda o meta "plano" da Solscan por mint.
+    - ttl: validade de um meta encontrado (padrão 1 dia)
+    - negative_ttl: validade de um "não encontrado" ({}), para não reconsultar a cada request
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS token_meta (
+        mint       TEXT PRIMARY KEY,
+        payload    TEXT NOT NULL,
+        empty      INTEGER NOT NULL,
+        fetched_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path: str = DB_PATH, ttl: float = 86_400, negative_ttl: float = 3_600):
+        super().__init__(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    def get(self, mint: str) -> Optional[Dict[str, Any]]:
+        """None = não está no cache (ou expirou); {} = cache negativo válido."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, empty, fetched_at FROM token_meta WHERE mint = ?", (mint,)
+            ).fetchone()
+        if row is None:
+            return None
+        payload, empty, fetched_at = row
+        ttl = self.negative_ttl if empty else self.ttl
+        if time.time() - fetched_at > ttl:
+            return None
+        try:
+            return json.loads(payload)
+        except Exception:
+            return None
+
+    def put(self, mint: str, meta: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO token_meta (mint, payload, empty, fetched_at) VALUES (?, ?, ?, ?)",
+                (mint, json.dumps(meta or {}, ensure_ascii=False), 0 if meta else 1, time.time()),
+            )
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM token_meta WHERE (empty = 0 AND fetched_at < ?) OR (empty = 1 AND fetched_at < ?)",
+                (now - self.ttl, now - self.negative_ttl),
+            )
+        return cur.rowcount
+
+    # Versões assíncronas (I/O de disco fora do event loop)
+    async def aget(self, mint: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get, mint)
+
+    async def aput(self, mint: str, meta: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self.put, mint, meta)
+
+
+# ------------------------------
+# Veredictos do LLM (cache endereçado por conteúdo)
+# ------------------------------
+class VerdictStore(_SQLiteStore):
+    """
+    Guarda a decisão do LLM por hash do payload enviado (+ prompt + modelo), junto
+    com as métricas do token no momento da análise (para as regras de materialidade).
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS llm_verdicts (
+        key           TEXT PRIMARY KEY,
+        token_address TEXT,
+        verdict       TEXT NOT NULL,
+        liquidity     REAL,
+        volume        REAL,
+        flags         TEXT NOT NULL,
+        created_at    REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_llm_verdicts_created ON llm_verdicts (created_at);
+    """
+
+    def __init__(self, path: str = DB_PATH, ttl: float = 21_600):
+        super().__init__(path)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna {"verdict", "liquidity", "volume", "flags", "created_at"} ou None (ausente/expirado)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT verdict, liquidity, volume, flags, created_at FROM llm_verdicts WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        verdict, liquidity, volume, flags, created_at = row
+        if time.time() - created_at > self.ttl:
+            return None
+        try:
+            return {
+                "verdict": json.loads(verdict),
+                "liquidity": liquidity,
+                "volume": volume,
+                "flags": json.loads(flags),
+                "created_at": created_at,
+            }
+        except Exception:
+            return None
+
+    def put(self, key: str, token_address: Optional[str], verdict: Dict[str, Any],
+            liquidity: Optional[float], volume: Optional[float], flags: List[str]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_verdicts "
+                "(key, token_address, verdict, liquidity, volume, flags, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, token_address, json.dumps(verdict, ensure_ascii=False), liquidity, volume,
+                 json.dumps(sorted(flags)), time.time()),
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM llm_verdicts WHERE created_at < ?", (time.time() - self.ttl,))
+        return cur.rowcount
+
+
+# ------------------------------
+# Série temporal de snapshots enriquecidos
+# ------------------------------
+# (campo do snapshot, coluna)
+SNAPSHOT_COLUMNS = (
+    ("score_local", "score_local"),
+    ("classification", "classification"),
+    ("liquidityUSD", "liquidity_usd"),
+    ("mcapUSD", "mcap_usd"),
+    ("fdvUSD", "fdv_usd"),
+    ("volumeUSD_5m", "volume_5m"),
+    ("volumeUSD_1h", "volume_1h"),
+    ("volumeUSD_24h", "volume_24h"),
+    ("txnsBuy_5m", "txns_buy_5m"),
+    ("txnsSell_5m", "txns_sell_5m"),
+    ("buyers_5m", "buyers_5m"),
+    ("sellers_5m", "sellers_5m"),
+    ("buySellPressure_5m", "pressure_5m"),
+)
+_SNAPSHOT_SELECT = "mint, ts, flags, " + ", ".join(col for _, col in SNAPSHOT_COLUMNS)
+
+
+class SnapshotStore(_SQLiteStore):
+    """
+    Histórico de snapshots por (mint, ts). A chave primária (mint, ts) em tabela
+    WITHOUT ROWID deixa as linhas de um mint contíguas e ordenadas por tempo:
+    "último por mint" e "intervalo de tempo" viram buscas no índice.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        mint           TEXT NOT NULL,
+        ts             REAL NOT NULL,
+        flags          TEXT NOT NULL,
+        score_local    REAL,
+        classification TEXT,
+        liquidity_usd  REAL,
+        mcap_usd       REAL,
+        fdv_usd        REAL,
+        volume_5m      REAL,
+        volume_1h      REAL,
+        volume_24h     REAL,
+        txns_buy_5m    REAL,
+        txns_sell_5m   REAL,
+        buyers_5m      REAL,
+        sellers_5m     REAL,
+        pressure_5m    REAL,
+        PRIMARY KEY (mint, ts)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_snapshots_ts ON snapshots (ts);
+    """
+
+    @staticmethod
+    def _row(mint: str, ts: float, snapshot: Dict[str, Any]) -> tuple:
+        flags = json.dumps(list(snapshot.get("flags") or []), ensure_ascii=False)
+        return (mint, ts, flags) + tuple(snapshot.get(field) for field, _ in SNAPSHOT_COLUMNS)
+
+    @staticmethod
+    def _to_dict(row: tuple) -> Dict[str, Any]:
+        mint, ts, flags = row[:3]
+        out: Dict[str, Any] = {"tokenAddress": mint, "ts": ts, "flags": json.loads(flags)}
+        for (field, _), value in zip(SNAPSHOT_COLUMNS, row[3:]):
+            out[field] = value
+        return out
+
+    def put_many(self, items: List[tuple]) -> int:
+        """items = [(mint, ts, snapshot)] gravados numa única transação (executemany)."""
+        rows = [self._row(mint, ts, snap) for mint, ts, snap in items]
+        if not rows:
+            return 0
+        placeholders = ", ".join("?" for _ in range(3 + len(SNAPSHOT_COLUMNS)))
+        sql = f"INSERT OR REPLACE INTO snapshots ({_SNAPSHOT_SELECT}) VALUES ({placeholders})"
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, rows)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def latest_many(self, mints: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Último snapshot de cada mint (ausentes ficam de fora): uma busca no índice por mint."""
+        sql = f"SELECT {_SNAPSHOT_SELECT} FROM snapshots WHERE mint = ? ORDER BY ts DESC LIMIT 1"
+        rows = []
+        with self._lock:
+            for mint in dict.fromkeys(mints):
+                row = self._conn.execute(sql, (mint,)).fetchone()
+                if row is not None:
+                    rows.append(row)
+        return {row[0]: self._to_dict(row) for row in rows}
+
+    def history(self, mint: str, since: Optional[float] = None, until: Optional[float] = None,
+                limit: int = 1000) -> List[Dict[str, Any]]:
+        """Os `limit` snapshots mais recentes do mint em [since, until], do mais antigo para o mais novo."""
+        sql = f"SELECT {_SNAPSHOT_SELECT} FROM snapshots WHERE mint = ? AND ts >= ? AND ts <= ? ORDER BY ts DESC LIMIT ?"
+        params = (mint, since if since is not None else 0.0, until if until is not None else time.time(), limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_dict(r) for r in reversed(rows)]
+
+    def purge_older_than(self, ts: float) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM snapshots WHERE ts < ?", (ts,))
+        return cur.rowcount
+
+    async def alatest_many(self, mints: List[str]) -> Dict[str, Dict[str, Any]]:
+        return await asyncio.to_thread(self.latest_many, mints)
+
+    async def ahistory(self, mint: str, since: Optional[float] = None, until: Optional[float] = None,
+                       limit: int = 1000) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.history, mint, since, until, limit)
@@ -1,11 +1,69 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import signals
 from app.routers.signals import router as signals_router
 from app.routers import links
 from app.routers import tokens
+from app.routers import watchlist
+from app.routers.responses import FastJSONResponse
+from app.services.http_pool import HTTP_SHARED_CLIENTS
+from app.services.solscan_client import SolscanClient, SOLSCAN_FLIGHTS
+from app.services.birdeye_client import BirdeyeClient, BIRDEYE_BREAKER, BIRDEYE_CACHE, BIRDEYE_LIMITER, BIRDEYE_FLIGHTS
+from app.services.CoinGeckoService import CoinGeckoService, COINGECKO_CACHE, COINGECKO_FLIGHTS
+from app.services.snapshot_history import SNAPSHOT_HISTORY, SNAPSHOT_WRITER
+from app.services.watchlist import WATCHLIST, WATCHLIST_ENABLED, WATCHLIST_MINTS
+from app.services.dex_ingester import DEX_INGESTER, DEX_INGEST_ENABLED
+from app.core.log import get_logger, log_stats
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.core.timing import ServerTimingMiddleware
 
-app = FastAPI(title="MemeBot API")
+log = get_logger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clientes HTTP compartilhados (pool keep-alive/HTTP2) por toda a vida da aplicação.
+    # Sem eles, as rotas caem no modo "um cliente por request" (ver app/routers/deps.py).
+    app.state.solscan = None
+    app.state.birdeye = None
+    app.state.coingecko = None
+    if HTTP_SHARED_CLIENTS:
+        app.state.solscan = SolscanClient(shared=True)
+        app.state.coingecko = CoinGeckoService(shared=True)
+        try:
+            app.state.birdeye = BirdeyeClient(shared=True)
+        except ValueError as e:
+            log.warning("Birdeye desabilitado no modo compartilhado", stage="startup", error=str(e))
+
+    # Escritor do histórico de snapshots (lotes em background)
+    if SNAPSHOT_HISTORY:
+        SNAPSHOT_WRITER.start()
+
+    # Refresher da watchlist (usa os clientes compartilhados quando existem)
+    if WATCHLIST_ENABLED:
+        for mint in WATCHLIST_MINTS:
+            WATCHLIST.add(mint)
+        WATCHLIST.start(app.state.solscan, app.state.birdeye)
+
+    # Poll do feed de perfis do DexScreener (chain=dex)
+    if DEX_INGEST_ENABLED:
+        DEX_INGESTER.start()
+    try:
+        yield
+    finally:
+        await DEX_INGESTER.stop()
+        await WATCHLIST.stop()
+        await SNAPSHOT_WRITER.stop()
+        if app.state.birdeye is not None:
+            await app.state.birdeye.aclose()
+        if app.state.solscan is not None:
+            await app.state.solscan.close()
+        if app.state.coingecko is not None:
+            await app.state.coingecko.aclose()
+
+
+app = FastAPI(title="MemeBot API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,11 +75,37 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(signals_router)
 app.include_router(links.router)
 app.include_router(tokens.router)
+app.include_router(watchlist.router)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "birdeye": {
+            "cache": BIRDEYE_CACHE.stats(),
+            "rate_limit": BIRDEYE_LIMITER.stats(),
+            "singleflight": BIRDEYE_FLIGHTS.stats(),
+            "circuit": BIRDEYE_BREAKER.stats(),
+        },
+        "solscan": {
+            "singleflight": SOLSCAN_FLIGHTS.stats(),
+        },
+        "coingecko": {
+            "cache": COINGECKO_CACHE.stats(),
+            "singleflight": COINGECKO_FLIGHTS.stats(),
+        },
+        "watchlist": WATCHLIST.stats(),
+        "snapshot_history": SNAPSHOT_WRITER.stats(),
+        "dex_ingester": DEX_INGESTER.stats(),
+        "logging": log_stats(),
+    }
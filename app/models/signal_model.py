@@ -1,5 +1,5 @@
 # app/models/signal_model.py
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
 
 
@@ -70,62 +70,11 @@ class Signal(BaseModel):
     def from_solana_snapshot(cls, snap: Dict[str, Any], *, chain_id: int = 101) -> "Signal":
         """
         Converte o snapshot vindo do seu solana_normalizer + merges do Birdeye.
+        Campos via mapa único (solana_signal_fields) + uma chamada ao pydantic-core
+        (model_validate): mais rápido que kwargs campo a campo e, no pydantic 2.11,
+        também que model_construct (que roda em Python).
         """
-        links_raw = snap.get("links") or []
-        links = [Link(type=str(l.get("type") or ""), url=str(l.get("url"))) for l in links_raw if l.get("url")]
-
-        # status/failed opcionais via flags/classification locais
-        status = "ok"
-        failed = list(snap.get("flags") or [])
-        if snap.get("classification") == "discard":
-            status = "partial" if failed else "partial"
-
-        return cls(
-            tokenAddress = str(snap.get("tokenAddress") or ""),
-            chainId      = int(chain_id),
-            url          = snap.get("solscanUrl") or snap.get("dexscreenerUrl") or snap.get("dextoolsUrl") or snap.get("birdeyeUrl"),
-            icon         = None,
-            header       = snap.get("header") or snap.get("symbol") or snap.get("name"),
-            description  = snap.get("description"),
-            links        = links,
-
-            status       = status,
-            failed       = failed,
-
-            # básicos
-            name         = snap.get("name"),
-            symbol       = snap.get("symbol"),
-
-            # tempo
-            ageMinutes   = snap.get("ageMinutes"),
-            ageSeconds   = None,
-
-            # preço/liq/caps
-            priceUSD     = snap.get("priceUSD"),
-            liquidityUSD = snap.get("liquidityUSD"),
-            mcapUSD      = snap.get("mcapUSD"),
-            fdvUSD       = snap.get("fdvUSD"),
-
-            # volumes
-            volumeUSD_5m  = snap.get("volumeUSD_5m"),
-            volumeUSD_1h  = snap.get("volumeUSD_1h"),
-            volumeUSD_24h = snap.get("volumeUSD_24h"),
-            volumeH24     = snap.get("volumeUSD_24h"),
-
-            # fluxo ordens
-            txnsBuy_5m   = snap.get("txnsBuy_5m"),
-            txnsSell_5m  = snap.get("txnsSell_5m"),
-            buyers_5m    = snap.get("buyers_5m"),
-            sellers_5m   = snap.get("sellers_5m"),
-            txnsBuy_24h  = None,
-            txnsSell_24h = None,
-            buySellRatio_24h = None,
-
-            # score/flags
-            score_local     = snap.get("score_local"),
-            classification  = snap.get("classification"),
-            flags           = list(snap.get("flags") or []),
-        )
+        return cls.model_validate(solana_signal_fields(snap, chain_id=chain_id))
 
     @classmethod
     def from_evm_normalized(cls, t: Dict[str, Any]) -> "Signal":
@@ -193,3 +142,72 @@ class Signal(BaseModel):
     class Config:
         orm_mode = True
         allow_population_by_field_name = True
+
+
+# ---------------------------
+# Snapshot Solana -> Signal (mapa único de campos)
+# ---------------------------
+SOCIAL_LINK_TYPES = frozenset({"website", "twitter", "telegram", "discord"})
+SOLANA_URL_KEYS = ("solscanUrl", "dexscreenerUrl", "birdeyeUrl", "dextoolsUrl")
+OK_CLASSIFICATIONS = frozenset({"high_potential", "watchlist"})
+
+
+def _opt_int(v: Any) -> Optional[int]:
+    # Contagens vindas da VolumeWindow chegam como float (ex.: 10.0)
+    return None if v is None else int(v)
+
+
+# (campo do Signal, chave do snapshot, conversor opcional)
+SOLANA_FIELD_MAP: Tuple[Tuple[str, str, Optional[Callable[[Any], Any]]], ...] = (
+    ("description", "description", None),
+    ("name", "name", None),
+    ("symbol", "symbol", None),
+    ("ageMinutes", "ageMinutes", _opt_int),
+    ("priceUSD", "priceUSD", None),
+    ("liquidityUSD", "liquidityUSD", None),
+    ("mcapUSD", "mcapUSD", None),
+    ("fdvUSD", "fdvUSD", None),
+    ("volumeUSD_5m", "volumeUSD_5m", None),
+    ("volumeUSD_1h", "volumeUSD_1h", None),
+    ("volumeUSD_24h", "volumeUSD_24h", None),
+    ("volumeH24", "volumeUSD_24h", None),
+    ("txnsBuy_5m", "txnsBuy_5m", _opt_int),
+    ("txnsSell_5m", "txnsSell_5m", _opt_int),
+    ("buyers_5m", "buyers_5m", _opt_int),
+    ("sellers_5m", "sellers_5m", _opt_int),
+    ("score_local", "score_local", None),
+    ("classification", "classification", None),
+)
+
+
+def solana_signal_fields(snap: Dict[str, Any], *, chain_id: int = 101) -> Dict[str, Any]:
+    """
+    Kwargs do Signal a partir de um snapshot Solana (dict ou Snapshot).
+    - status: "ok" se classificação high_potential/watchlist, senão "partial"
+    - failed/flags: flags do scoring local
+    - links: só website/twitter/telegram/discord com URL (tipo em minúsculas)
+    """
+    get = snap.get
+    flags = list(get("flags") or [])
+    links = []
+    for l in get("links") or []:
+        type_ = (l.get("type") or l.get("label", "")).lower()
+        url = l.get("url")
+        if type_ in SOCIAL_LINK_TYPES and url:
+            links.append({"type": type_, "url": url})
+
+    out: Dict[str, Any] = {
+        "tokenAddress": str(get("tokenAddress") or ""),
+        "chainId": int(chain_id),
+        "url": next((get(k) for k in SOLANA_URL_KEYS if get(k)), None),
+        "icon": None,
+        "header": get("header") or get("symbol") or get("name"),
+        "links": links,
+        "status": "ok" if get("classification") in OK_CLASSIFICATIONS else "partial",
+        "failed": flags,
+        "flags": list(flags),
+    }
+    for field, key, conv in SOLANA_FIELD_MAP:
+        v = get(key)
+        out[field] = conv(v) if conv is not None else v
+    return out
@@ -0,0 +1,139 @@
+# app/models/snapshot.py
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+# Campos conhecidos do snapshot Solana (ordem = ordem do JSON).
+# Base do normalize_solscan_meta_to_snapshot + derivados do merge/scoring.
+SNAPSHOT_FIELDS = (
+    "tokenAddress", "url", "header", "description", "chainId", "links",
+    "listedAt", "ageMinutes", "holders",
+    "mintAuthorityDisabled", "freezeAuthorityDisabled",
+    "liquidityUSD", "mcapUSD", "fdvUSD",
+    "volumeUSD_5m", "volumeUSD_15m", "volumeUSD_1h", "volumeUSD_24h",
+    "txnsBuy_5m", "txnsSell_5m",
+    "txnsBuy_15m", "txnsSell_15m",
+    "txnsBuy_1h", "txnsSell_1h",
+    "buyers_5m", "sellers_5m",
+    "buyers_1h", "sellers_1h",
+    "lpLockedPct", "lpLockProvider",
+    "creatorWalletActive", "devWalletBuys", "devWalletSells",
+    "proxy", "upgradeable", "blacklistFn",
+    "maxTx", "maxWallet", "taxBuy", "taxSell",
+    "honeypotRisk", "rugcheckScore",
+    "dexscreenerUrl", "dextoolsUrl", "birdeyeUrl", "solscanUrl", "pairUrl", "chain",
+    # derivados
+    "capLiqRatio", "buySellPressure_5m",
+    "score_local", "score_breakdown", "flags", "classification",
+    "birdeyeFallbackFromOverview",
+)
+_FIELDS = frozenset(SNAPSHOT_FIELDS)
+
+
+class Snapshot(MutableMapping):
+    """
+    Snapshot compacto: um slot por campo conhecido, em vez de um dict de ~60 chaves.
+
+    Comporta-se como dict (get/[]/in/update/items/==), então merge_birdeye_into_snapshot,
+    attach_local_scoring e Signal.from_solana_snapshot funcionam sem mudança.
+    Slot não preenchido = chave ausente (como no dict). Chaves fora de SNAPSHOT_FIELDS
+    (birdeyeStatus, solscanError, ...) vão para um dict auxiliar criado só quando preciso.
+    O dict/JSON só é montado em to_dict(), na borda (resposta HTTP).
+    """
+
+    __slots__ = SNAPSHOT_FIELDS + ("_extra",)
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        self._extra: Optional[Dict[str, Any]] = None
+        if data:
+            for k, v in data.items():
+                self[k] = v
+        for k, v in kwargs.items():
+            self[k] = v
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Snapshot":
+        return data if isinstance(data, Snapshot) else cls(data)
+
+    # --- interface de dict ---
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELDS:
+            return getattr(self, key, default)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in _FIELDS:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for k in SNAPSHOT_FIELDS:
+            if hasattr(self, k):
+                yield k
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for k in SNAPSHOT_FIELDS if hasattr(self, k)) + len(self._extra or ())
+
+    def __repr__(self) -> str:
+        return f"Snapshot({self.to_dict()!r})"
+
+    # --- serialização ---
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for k in SNAPSHOT_FIELDS:
+            try:
+                out[k] = getattr(self, k)
+            except AttributeError:
+                pass
+        if self._extra:
+            out.update(self._extra)
+        return out
+
+    def copy(self) -> "Snapshot":
+        new = Snapshot.__new__(Snapshot)
+        for k in SNAPSHOT_FIELDS:
+            try:
+                setattr(new, k, getattr(self, k))
+            except AttributeError:
+                pass
+        new._extra = dict(self._extra) if self._extra else None
+        return new
+
+    __copy__ = copy
+
+
+def snapshot_to_dict(snap: Any) -> Dict[str, Any]:
+    """Snapshot ou dict -> dict novo (para respostas JSON e cópias)."""
+    return snap.to_dict() if isinstance(snap, Snapshot) else dict(snap)
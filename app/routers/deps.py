@@ -0,0 +1,55 @@
+# app/routers/deps.py
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from fastapi import Request
+
+from app.services.solscan_client import SolscanClient
+from app.services.birdeye_client import BirdeyeClient
+from app.services.CoinGeckoService import CoinGeckoService
+
+
+@asynccontextmanager
+async def open_solscan(request: Request) -> AsyncIterator[SolscanClient]:
+    """
+    Cliente Solscan compartilhado (criado no lifespan em app/main.py). Se não houver
+    um (HTTP_SHARED_CLIENTS=false ou app rodando sem lifespan), cria um por request.
+    """
+    shared = getattr(request.app.state, "solscan", None)
+    if shared is not None:
+        yield shared
+        return
+    async with SolscanClient() as sol:
+        yield sol
+
+
+@asynccontextmanager
+async def open_birdeye(request: Request) -> AsyncIterator[BirdeyeClient]:
+    """Idem para o Birdeye."""
+    shared = getattr(request.app.state, "birdeye", None)
+    if shared is not None:
+        yield shared
+        return
+    async with BirdeyeClient() as be:
+        yield be
+
+
+@asynccontextmanager
+async def open_coingecko(request: Request) -> AsyncIterator[CoinGeckoService]:
+    """Idem para a CoinGecko."""
+    shared = getattr(request.app.state, "coingecko", None)
+    if shared is not None:
+        yield shared
+        return
+    async with CoinGeckoService() as cg:
+        yield cg
+
+
+# --- Dependências FastAPI (Depends) ---
+async def get_solscan(request: Request) -> AsyncIterator[SolscanClient]:
+    async with open_solscan(request) as sol:
+        yield sol
+
+
+async def get_birdeye(request: Request) -> AsyncIterator[BirdeyeClient]:
+    async with open_birdeye(request) as be:
+        yield be
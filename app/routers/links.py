@@ -1,20 +1,27 @@
 # app/routers/links.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
 from typing import Any, Dict
+from app.core.timing import stage, with_timings
 from app.services.birdeye_client import BirdeyeClient
+from app.routers.deps import get_birdeye
 
 router = APIRouter(prefix="/signals/solana", tags=["signals:solana"])
 
 @router.get("/links/{mint}")
-async def links_for_mint(mint: str) -> Dict[str, Any]:
-    async with BirdeyeClient() as be:
+async def links_for_mint(
+    mint: str,
+    be: BirdeyeClient = Depends(get_birdeye),
+    debug: bool = Query(False, description="Inclui _timings (ms por etapa) no corpo"),
+) -> Dict[str, Any]:
+    with stage("birdeye_pairs"):
         pairs = await be.token_pairs(mint)
+    with stage("birdeye_price"):
         price = await be.price(mint, include_liquidity=True)
 
-    return {
+    return with_timings({
         "tokenAddress": mint,
         "birdeyeUrl": f"https://birdeye.so/token/{mint}?chain=solana",
         "solscanUrl": f"https://solscan.io/token/{mint}",
         "pairs_raw": pairs.get("data"),
         "price_raw": price.get("data"),
-    }
+    }, debug)
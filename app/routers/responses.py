@@ -0,0 +1,34 @@
+# app/routers/responses.py
+import json
+from typing import Any, List
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+from app.models.signal_model import Signal
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:  # orjson é opcional: cai no json da stdlib
+    orjson = None
+    FastJSONResponse = JSONResponse
+
+
+def dumps(obj: Any) -> str:
+    """JSON compacto (orjson quando disponível), p/ streaming e payloads montados à mão."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+# Serializador do pydantic-core para a lista inteira (sem dicts intermediários)
+_SIGNALS_ADAPTER = TypeAdapter(List[Signal])
+
+
+def signals_response(signals: List[Signal]) -> Response:
+    """
+    Lista de Signal direto para JSON, sem a revalidação do response_model do FastAPI
+    (os modelos já foram montados por nós). O response_model continua na rota para o OpenAPI.
+    """
+    return Response(content=_SIGNALS_ADAPTER.dump_json(signals), media_type="application/json")
@@ -1,20 +1,20 @@
 # app/routers/signals.py
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict, Any, Optional, Tuple
-
+import os
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+
+from app.core.deadline import deadline_scope
+from app.core.log import get_logger
+from app.core.timing import stage, with_timings
 from app.models.signal_model import Signal
-from app.services.gpt_analysis import analyze_tokens
+from app.models.snapshot import snapshot_to_dict
+from app.routers.responses import dumps, signals_response
+from app.services.gpt_analysis import LLM_BATCH_SIZE, LLM_MAX_INFLIGHT, analyze_tokens_async
 
 # --- EVM/Dex (opcional) ---
-from app.services.dex_api import get_token_profiles
-from app.utils.filters import (
-    evaluate_token,       # pode anexar __eval__ ou retornar dict; tratamos os dois casos
-    is_recent,
-    has_good_volume,
-    has_official_links,
-    has_active_buyers,
-    has_clean_description,
-)
+from app.services.dex_ingester import DEX_INGESTER
 
 # --- Solana ---
 from app.services.solscan_client import SolscanClient
@@ -22,12 +22,24 @@ from app.utils.solana_normalizer import (
     normalize_solscan_meta_to_snapshot,
     merge_birdeye_into_snapshot,
 )
-from app.services.birdeye_client import (
-    BirdeyeClient,
-    BirdeyeAuthOrPlanError,
+from app.services.birdeye_client import BirdeyeClient
+from app.services.rate_limiter import bulk_priority
+from app.services.watchlist import WATCHLIST
+from app.services.snapshot_history import SNAPSHOT_WRITER
+from app.routers.deps import get_solscan, get_birdeye, open_solscan, open_birdeye
+from app.services.solana_enrichment import (
+    ENRICH_CONCURRENCY,
+    enrich_mint_with_status,
+    enrich_mints,
+    fetch_birdeye_bundle,
+    iter_enriched,
 )
 
 router = APIRouter(prefix="/signals", tags=["signals"])
+log = get_logger(__name__)
+
+# Prazo padrão de /signals em ms quando o cliente não manda ?deadline_ms= (0 = sem prazo)
+SIGNALS_DEADLINE_MS = int(os.getenv("SIGNALS_DEADLINE_MS", "0"))
 
 # ------------------------------
 # Helpers locais
@@ -70,53 +82,169 @@ def _evm_eval_info(token: Dict[str, Any], evaluation: Optional[Dict[str, Any]])
             return {"status": evaluation.get("status", "ok"), "failed": evaluation.get("failed", [])}
     return {"status": "ok", "failed": []}
 
-def _snapshot_to_signal_solana(snapshot: Dict[str, Any], *, chain_id: int = 101) -> Signal:
-    links = normalize_links(snapshot.get("links") or [])
-    classification = snapshot.get("classification")  # "high_potential" | "watchlist" | "discard" ...
-    flags = list(snapshot.get("flags") or [])
-    status = "ok" if classification in ("high_potential", "watchlist") else "partial"
+def _deadline_budget(deadline_ms: Optional[int]) -> Optional[float]:
+    ms = deadline_ms or SIGNALS_DEADLINE_MS
+    return ms / 1000.0 if ms and ms > 0 else None
 
+# Marca, na saída do enrich_mints, mint que não terminou dentro do prazo
+_DEADLINE_PENDING = object()
+
+def _deadline_signal(mint: str) -> Signal:
+    """Placeholder de mint cortado pelo prazo do request (status partial)."""
     return Signal(
-        tokenAddress = str(snapshot.get("tokenAddress") or ""),
-        chainId      = int(chain_id),
-
-        url         = snapshot.get("solscanUrl") or snapshot.get("dexscreenerUrl") or snapshot.get("birdeyeUrl") or snapshot.get("dextoolsUrl"),
-        icon        = None,
-        header      = snapshot.get("header") or snapshot.get("symbol") or snapshot.get("name"),
-        description = snapshot.get("description"),
-        links       = [{"type": l["type"], "url": l["url"]} for l in links],
-
-        status = status,
-        failed = flags,
-
-        # Extras aceitos pelo modelo
-        ageMinutes   = snapshot.get("ageMinutes"),
-        liquidityUSD = snapshot.get("liquidityUSD"),
-        mcapUSD      = snapshot.get("mcapUSD"),
-        fdvUSD       = snapshot.get("fdvUSD"),
-        volumeUSD_5m = snapshot.get("volumeUSD_5m"),
-        volumeUSD_1h = snapshot.get("volumeUSD_1h"),
-        volumeUSD_24h= snapshot.get("volumeUSD_24h"),
-        score_local  = snapshot.get("score_local"),
-        classification = classification,
-        flags = flags,
+        tokenAddress=mint,
+        chainId=101,
+        status="partial",
+        failed=["Prazo do request esgotado antes de concluir (deadline_ms)"],
     )
 
+def _snapshot_to_signal_solana(snapshot: Dict[str, Any], *, chain_id: int = 101) -> Signal:
+    # Snapshot produzido pelo nosso pipeline: caminho sem revalidação (mapa em signal_model)
+    return Signal.from_solana_snapshot(snapshot, chain_id=chain_id)
+
+# ------------------------------
+# Streaming (NDJSON / SSE)
+# ------------------------------
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def _format_event(event: str, data: Dict[str, Any], fmt: str) -> str:
+    payload = dumps(data)
+    if fmt == "sse":
+        return f"event: {event}\ndata: {payload}\n\n"
+    return dumps({"event": event, "data": data}) + "\n"
+
+
+def _decision_patch(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "tokenAddress": item.get("tokenAddress"),
+        "decision": item.get("decision"),
+        "confidence": item.get("confidence"),
+        "rationale": item.get("rationale"),
+    }
+
+
+async def _stream_solana_signals(
+    request: Request,
+    mint_list: List[str],
+    *,
+    analyze: bool,
+    concurrency: int,
+    fmt: str,
+    deadline_s: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """
+    Emite cada Signal assim que o enriquecimento do mint termina ("signal") e, com
+    analyze=true, os veredictos do LLM como patches por lote ("decision").
+    Termina com um evento "done" com as contagens.
+
+    Os clientes são abertos aqui dentro: o corpo do StreamingResponse roda depois
+    que a rota retornou (e depois do teardown das dependências). Pelo mesmo motivo o
+    prazo (deadline_s) é aberto aqui; mints cortados saem como "signal" com status partial.
+    """
+    queue: "asyncio.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = asyncio.Queue()
+    counts = {"requested": len(mint_list), "signals": 0, "failed": 0, "decisions": 0}
+    if deadline_s is not None:
+        counts["partial"] = 0
+    llm_sem = asyncio.Semaphore(max(1, LLM_MAX_INFLIGHT))
+
+    async def _analyze_batch(batch: List[Dict[str, Any]]) -> None:
+        async with llm_sem:
+            try:
+                llm_out = await analyze_tokens_async(batch)
+            except Exception as e:
+                log.warning("Falha na análise LLM", stage="llm", route="stream", error=str(e))
+                return
+        for item in llm_out or []:
+            if item.get("tokenAddress"):
+                await queue.put(("decision", _decision_patch(item)))
+
+    async def _produce() -> None:
+        llm_tasks: List[asyncio.Task] = []
+        pending: List[Dict[str, Any]] = []
+        seen: set = set()
+        try:
+            with deadline_scope(deadline_s):
+                async with open_solscan(request) as sol, open_birdeye(request) as be:
+                    with bulk_priority():
+                        async for _, mint, snap in iter_enriched(sol, be, mint_list, concurrency=concurrency):
+                            seen.add(mint)
+                            if not snap:
+                                counts["failed"] += 1
+                                continue
+                            try:
+                                sig = _snapshot_to_signal_solana(snap, chain_id=101)
+                            except Exception as e:
+                                log.warning("Falha ao processar mint", mint=mint, stage="signal", error=str(e))
+                                counts["failed"] += 1
+                                continue
+                            await queue.put(("signal", sig.model_dump(mode="json")))
+                            if analyze:
+                                pending.append(snap)
+                                if len(pending) >= LLM_BATCH_SIZE:
+                                    llm_tasks.append(asyncio.ensure_future(_analyze_batch(pending)))
+                                    pending = []
+                for mint in mint_list:
+                    if mint not in seen:
+                        counts["partial"] = counts.get("partial", 0) + 1
+                        await queue.put(("signal", _deadline_signal(mint).model_dump(mode="json")))
+                if analyze and pending:
+                    llm_tasks.append(asyncio.ensure_future(_analyze_batch(pending)))
+                await asyncio.gather(*llm_tasks)
+        finally:
+            for t in llm_tasks:
+                t.cancel()
+            await queue.put(None)
+
+    producer = asyncio.ensure_future(_produce())
+    try:
+        while True:
+            ev = await queue.get()
+            if ev is None:
+                break
+            event, data = ev
+            if event == "signal":
+                counts["signals"] += 1
+            else:
+                counts["decisions"] += 1
+            yield _format_event(event, data, fmt)
+        if not producer.cancelled() and producer.exception() is not None:
+            e = producer.exception()
+            log.error("Falha no streaming", stage="stream", error=f"{type(e).__name__}: {e}")
+            yield _format_event("error", {"detail": f"{type(e).__name__}: {e}"}, fmt)
+        yield _format_event("done", counts, fmt)
+    finally:
+        # Cliente desconectou no meio: cancela enriquecimento e lotes do LLM
+        if not producer.done():
+            producer.cancel()
+
 # ------------------------------
 # /signals (principal)
 # ------------------------------
 @router.get("", response_model=List[Signal])   # /signals  (evita 307)
 @router.get("/", response_model=List[Signal])  # /signals/
 async def get_signals(
+    request: Request,
     analyze: bool = Query(False, description="Se true, qualifica com ChatGPT"),
     chain: str = Query("solana", description="solana | dex"),
     mints: Optional[str] = Query(None, description="Lista de mints separada por vírgula (quando chain=solana)"),
+    concurrency: int = Query(ENRICH_CONCURRENCY, ge=1, le=64, description="Mints enriquecidos em paralelo (chain=solana)"),
+    stream: Optional[str] = Query(None, description="ndjson | sse — emite cada Signal assim que fica pronto (chain=solana)"),
+    deadline_ms: Optional[int] = Query(None, ge=1, le=600_000, description="Prazo total do request em ms; o que não terminar a tempo volta como status=partial"),
 ):
     """
     - chain=solana (padrão): exige ?mints=<mint1,mint2,...>. Enriquecimento com Birdeye e normalização Solscan.
-    - chain=dex: usa get_token_profiles() + filtros locais.
+      Com ?stream=ndjson|sse a resposta sai em eventos: "signal" por mint (ordem de conclusão),
+      "decision" por token quando cada lote do LLM volta (analyze=true) e um "done" final.
+    - chain=dex: perfis do DexScreener já avaliados pelo ingester em background (DEX_INGESTER).
+    - deadline_ms (ou SIGNALS_DEADLINE_MS): timeouts, retries e o LLM ficam limitados ao tempo
+      restante; mints não concluídos voltam como placeholders status="partial" em vez de segurar a resposta.
     """
+    fmt = (stream or "").lower() or None
+    if fmt is not None and fmt not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Parâmetro 'stream' inválido. Use 'ndjson' ou 'sse'.")
     chain_lower = (chain or "solana").lower()
+    budget = _deadline_budget(deadline_ms)
 
     # ---------------- SOLANA ----------------
     if chain_lower in {"solana", "sol"}:
@@ -129,135 +257,125 @@ async def get_signals(
         if not mint_list:
             raise HTTPException(status_code=400, detail="Nenhum mint válido foi informado.")
 
-        snapshots: List[Dict[str, Any]] = []
-        signals: List[Signal] = []
+        if fmt is not None:
+            return StreamingResponse(
+                _stream_solana_signals(request, mint_list, analyze=analyze, concurrency=concurrency, fmt=fmt,
+                                       deadline_s=budget),
+                media_type=STREAM_MEDIA_TYPES[fmt],
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
 
-        async with SolscanClient() as sol, BirdeyeClient() as be:
-            print(f"🔍 Total mints recebidos: {len(mint_list)}")
-            for mint in mint_list:
+        with deadline_scope(budget):
+            snapshots: List[Dict[str, Any]] = []
+            signals: List[Signal] = []
+
+            async with open_solscan(request) as sol, open_birdeye(request) as be:
+                log.info("Mints recebidos", chain="solana", count=len(mint_list))
+                # Fan-out em lote: cede a vez às rotas interativas na fila do rate limiter
+                with bulk_priority():
+                    enriched = await enrich_mints(sol, be, mint_list, concurrency=concurrency,
+                                                  pending=_DEADLINE_PENDING)
+
+            # Mantém a ordem de entrada; mints que falharam vêm como None
+            for mint, snap in zip(mint_list, enriched):
+                if snap is _DEADLINE_PENDING:
+                    signals.append(_deadline_signal(mint))
+                    continue
+                if not snap:
+                    continue
                 try:
-                    meta = await sol.token_meta(mint)
-                    if not meta:
-                        print(f"❌ Sem meta na Solscan para {mint}")
-                        continue
-
-                    snap = normalize_solscan_meta_to_snapshot(meta, mint)
-
-                    overview, used_fallback = await be.overview_with_fallback(mint)
-                    try:
-                        volume = await be.token_volume_points(mint, interval="5m", limit=12)
-                    except BirdeyeAuthOrPlanError:
-                        volume = {"data": {"points": []}}
-                    try:
-                        trades5m = await be.token_trades_recent(mint, limit=100)
-                    except BirdeyeAuthOrPlanError:
-                        trades5m = {"data": {}}
-
-                    snap = merge_birdeye_into_snapshot(snap, overview, volume, trades5m)
-                    snap["birdeyeFallbackFromOverview"] = used_fallback
-                    snapshots.append(snap)
-
                     sig = _snapshot_to_signal_solana(snap, chain_id=101)
-                    signals.append(sig)
-                    print(f"✅ SELECIONADO (SOL): {sig.header} — status={sig.status} — flags={sig.failed}")
-
                 except Exception as e:
-                    print(f"⚠️ Falha ao processar mint {mint}: {e}")
-
-        # Análise opcional GPT em lote
-        if analyze and snapshots:
-            try:
-                llm_out = analyze_tokens(snapshots)
-                llm_map: Dict[str, Any] = {}
-                for item in llm_out or []:
-                    addr = item.get("tokenAddress")
-                    if addr:
-                        llm_map[addr] = item
-
-                for i, sig in enumerate(signals):
-                    item = llm_map.get(sig.tokenAddress, {})
-                    signals[i].decision   = item.get("decision")
-                    signals[i].confidence = item.get("confidence")
-                    signals[i].rationale  = item.get("rationale")
-            except Exception as e:
-                print("⚠️ Falha na análise LLM (solana):", e)
+                    log.warning("Falha ao processar mint", mint=mint, stage="signal", error=str(e))
+                    continue
+                snapshots.append(snap)
+                signals.append(sig)
+                log.sample("Selecionado", chain="solana", mint=mint, header=sig.header, status=sig.status, flags=sig.failed)
+
+            # Análise opcional GPT em lote
+            if analyze and snapshots:
+                try:
+                    with stage("gpt"):
+                        llm_out = await analyze_tokens_async(snapshots)
+                    llm_map: Dict[str, Any] = {}
+                    for item in llm_out or []:
+                        addr = item.get("tokenAddress")
+                        if addr:
+                            llm_map[addr] = item
+
+                    for i, sig in enumerate(signals):
+                        item = llm_map.get(sig.tokenAddress, {})
+                        signals[i].decision   = item.get("decision")
+                        signals[i].confidence = item.get("confidence")
+                        signals[i].rationale  = item.get("rationale")
+                except Exception as e:
+                    log.warning("Falha na análise LLM", stage="llm", route="solana", error=str(e))
 
-        if not signals:
-            print("⚠️ Nenhum token promissor encontrado (solana).")
-            raise HTTPException(status_code=404, detail="Nada foi encontrado (solana).")
-        return signals
+            if not signals:
+                log.info("Nenhum token promissor encontrado", chain="solana")
+                raise HTTPException(status_code=404, detail="Nada foi encontrado (solana).")
+            return signals_response(signals)
 
     # ---------------- DEX (EVM/DexScreener) ----------------
     elif chain_lower == "dex":
-        raw_data = get_token_profiles()
-        results: List[Signal] = []
-        approved_tokens: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []  # (token, evaluation)
-
-        print(f"🔍 Total tokens recebidos (dex): {len(raw_data)}")
-
-        for token in raw_data:
-            evaluation = evaluate_token(token)
-            if not evaluation:
-                name = token.get("name") or token.get("symbol") or token.get("header") or token.get("tokenAddress") or "sem nome"
-                erros = []
-                if not is_recent(token): erros.append("idade")
-                if not has_good_volume(token): erros.append("volume")
-                if not has_official_links(token): erros.append("links")
-                if not has_active_buyers(token): erros.append("compradores")
-                if not has_clean_description(token): erros.append("descrição")
-                print(f"❌ DESCARTADO: {name} — FALHOU EM: {', '.join(erros)}")
-                continue
-
-            ev_info = _evm_eval_info(token, evaluation)
-            print(f"✅ SELECIONADO (DEX): {(token.get('name') or token.get('symbol') or token.get('header') or 'sem nome')} — "
-                  f"STATUS: {ev_info['status']} — FALHOU EM: {ev_info['failed']}")
-            approved_tokens.append((token, evaluation))
-
-        if not approved_tokens:
-            print("⚠️ Nenhum token promissor encontrado após aplicar os filtros (dex).")
-            raise HTTPException(status_code=404, detail="Nada foi encontrado com os filtros aplicados (dex).")
-
-        # 🔎 Análise opcional com LLM
-        llm_map: Dict[str, Any] = {}
-        if analyze:
+        with deadline_scope(budget):
             try:
-                llm_out = analyze_tokens([t for (t, _) in approved_tokens])
-                for item in llm_out or []:
-                    addr = item.get("tokenAddress")
-                    if addr:
-                        llm_map[addr] = item
+                with stage("dex_ingest"):
+                    await DEX_INGESTER.ensure_fresh()
             except Exception as e:
-                print("⚠️ Falha na análise LLM (dex):", e)
-
-        # Monta payload final
-        for token, evaluation in approved_tokens:
-            addr = token.get("tokenAddress") or token.get("address") or ""
-            llm = llm_map.get(addr, {}) if analyze else {}
-            ev_info = _evm_eval_info(token, evaluation)
-
-            results.append(Signal(
-                tokenAddress = addr,
-                url          = token.get("url"),
-                icon         = token.get("icon"),
-                header       = token.get("header") or token.get("name") or token.get("symbol"),
-                description  = token.get("description"),
-                chainId      = normalize_chain_id(token.get("chainId") or token.get("chain")),
-                links        = normalize_links(token.get("links", [])),
-                status       = ev_info["status"],
-                failed       = ev_info["failed"],
-                decision     = llm.get("decision"),
-                confidence   = llm.get("confidence"),
-                rationale    = llm.get("rationale"),
-            ))
-
-            print("🔬 DEBUG TOKEN (DEX):", {
-                "address": addr,
-                "decision": llm.get("decision"),
-                "confidence": llm.get("confidence"),
-                "rationale": llm.get("rationale"),
-            })
-
-        return results
+                log.warning("Falha ao buscar perfis do DexScreener", stage="dex_ingest", error=str(e))
+            # Só perfis novos passam pelo screener (no ingester); aqui lemos o estado
+            approved_tokens: List[Tuple[Dict[str, Any], Dict[str, Any]]] = [(t, t) for t in DEX_INGESTER.current()]
+            results: List[Signal] = []
+
+            if not approved_tokens:
+                log.info("Nenhum token promissor encontrado", chain="dex")
+                raise HTTPException(status_code=404, detail="Nada foi encontrado com os filtros aplicados (dex).")
+
+            # 🔎 Análise opcional com LLM
+            llm_map: Dict[str, Any] = {}
+            if analyze:
+                try:
+                    with stage("gpt"):
+                        # Cópias: o LLM mescla o veredito nos dicts, e estes são o estado do ingester
+                        llm_out = await analyze_tokens_async([dict(t) for (t, _) in approved_tokens])
+                    for item in llm_out or []:
+                        addr = item.get("tokenAddress")
+                        if addr:
+                            llm_map[addr] = item
+                except Exception as e:
+                    log.warning("Falha na análise LLM", stage="llm", route="dex", error=str(e))
+
+            # Monta payload final
+            for token, evaluation in approved_tokens:
+                addr = token.get("tokenAddress") or token.get("address") or ""
+                llm = llm_map.get(addr, {}) if analyze else {}
+                ev_info = _evm_eval_info(token, evaluation)
+
+                results.append(Signal(
+                    tokenAddress = addr,
+                    url          = token.get("url"),
+                    icon         = token.get("icon"),
+                    header       = token.get("header") or token.get("name") or token.get("symbol"),
+                    description  = token.get("description"),
+                    chainId      = normalize_chain_id(token.get("chainId") or token.get("chain")),
+                    links        = normalize_links(token.get("links", [])),
+                    status       = ev_info["status"],
+                    failed       = ev_info["failed"],
+                    decision     = llm.get("decision"),
+                    confidence   = llm.get("confidence"),
+                    rationale    = llm.get("rationale"),
+                ))
+
+                log.sample(
+                    "Token (dex)",
+                    mint=addr,
+                    decision=llm.get("decision"),
+                    confidence=llm.get("confidence"),
+                    rationale=llm.get("rationale"),
+                )
+
+            return signals_response(results)
 
     else:
         raise HTTPException(status_code=400, detail="Parâmetro 'chain' inválido. Use 'solana' ou 'dex'.")
@@ -266,49 +384,54 @@ async def get_signals(
 # Solscan: meta e snapshot normalizado
 # ------------------------------
 @router.get("/solana/meta/{mint}")
-async def solana_meta(mint: str):
+async def solana_meta(mint: str, cli: SolscanClient = Depends(get_solscan)):
     """
     Retorna metadados do token via Solscan.
     """
-    async with SolscanClient() as cli:
+    with stage("solscan"):
         data = await cli.token_meta(mint)
-        if not data:
-            raise HTTPException(404, "Sem dados da Solscan")
-        return data
+    if not data:
+        raise HTTPException(404, "Sem dados da Solscan")
+    return data
 
 @router.get("/solana/snapshot/{mint}")
-async def solana_snapshot(mint: str):
+async def solana_snapshot(mint: str, cli: SolscanClient = Depends(get_solscan)):
     """
     Devolve um 'snapshot' NORMALIZADO (apenas Solscan).
     """
-    async with SolscanClient() as cli:
+    with stage("solscan"):
         meta = await cli.token_meta(mint)
-        if not meta:
-            raise HTTPException(404, "Sem meta da Solscan")
-        snapshot = normalize_solscan_meta_to_snapshot(meta, mint)
-        return snapshot
+    if not meta:
+        raise HTTPException(404, "Sem meta da Solscan")
+    snapshot = normalize_solscan_meta_to_snapshot(meta, mint)
+    return snapshot_to_dict(snapshot)
 
 # ------------------------------
 # GPT: análise de um único mint (snapshot simples)
 # ------------------------------
 @router.get("/solana/analyze/{mint}")
-async def solana_analyze(mint: str):
-    async with SolscanClient() as cli:
+async def solana_analyze(
+    mint: str,
+    cli: SolscanClient = Depends(get_solscan),
+    debug: bool = Query(False, description="Inclui _timings (ms por etapa) no corpo"),
+):
+    with stage("solscan"):
         meta = await cli.token_meta(mint)
-        if not meta:
-            raise HTTPException(status_code=404, detail="Sem meta da Solscan")
+    if not meta:
+        raise HTTPException(status_code=404, detail="Sem meta da Solscan")
 
-        snapshot = normalize_solscan_meta_to_snapshot(meta, mint)
+    snapshot = normalize_solscan_meta_to_snapshot(meta, mint)
 
     try:
-        llm_out = analyze_tokens([snapshot])  # lista
+        with stage("gpt"):
+            llm_out = await analyze_tokens_async([snapshot])  # lista
         llm_item = llm_out[0] if isinstance(llm_out, list) and llm_out else {}
     except Exception as e:
-        print("⚠️ Falha na análise LLM (single):", e)
+        log.warning("Falha na análise LLM", stage="llm", route="single", mint=mint, error=str(e))
         llm_item = {}
 
-    return {
-        "snapshot": snapshot,
+    return with_timings({
+        "snapshot": snapshot_to_dict(snapshot),
         "analysis": {
             "decision": llm_item.get("decision"),
             "confidence": llm_item.get("confidence"),
@@ -316,107 +439,101 @@ async def solana_analyze(mint: str):
             "scores": llm_item.get("scores"),
             "flags": llm_item.get("flags"),
         }
-    }
+    }, debug)
 
 # ------------------------------
 # Snapshot ENRICHED (Solscan + Birdeye)
 # ------------------------------
 @router.get("/solana/snapshot_enriched/{mint}")
-async def solana_snapshot_enriched(mint: str):
+async def solana_snapshot_enriched(
+    mint: str,
+    request: Request,
+    debug: bool = Query(False, description="Inclui _timings (ms por etapa) no corpo"),
+):
     """
     1) Solscan meta -> snapshot normalizado (tolerante ao plano)
-    2) Birdeye overview (com fallback) + volume points (5m) + trades recentes
-    3) merge_birdeye_into_snapshot -> score_local/flags/classification
+    2) Birdeye overview (com fallback) + volume points (5m) + trades recentes, em paralelo
+    3) merge_birdeye_into_snapshot -> score_local/flags/classification (+ birdeyeStatus)
+
+    Mints da watchlist saem direto da memória (campo "freshness"), sem abrir clientes nem ir ao
+    upstream; o refresher usa o mesmo pipeline (enrich_mint_with_status), então o corpo é igual.
     """
+    with stage("watchlist"):
+        cached = WATCHLIST.get(mint)
+    if cached is not None:
+        return with_timings(cached, debug)
 
-    snapshot = {}
-    birdeye_status = {"overview": None, "volume": None, "trades": None}
+    async with open_solscan(request) as sol, open_birdeye(request) as be:
+        snapshot = await enrich_mint_with_status(sol, be, mint)
+    SNAPSHOT_WRITER.record(snapshot)
+    return with_timings(snapshot_to_dict(snapshot), debug)
 
-    async with SolscanClient() as sol, BirdeyeClient() as be:
-        # --- Solscan ---
-        try:
-            meta = await sol.token_meta(mint)
-            snapshot = normalize_solscan_meta_to_snapshot(meta or {}, mint)
-            if not meta:
-                snapshot["solscanLimitedPlan"] = True
-        except Exception as e:
-            print(f"⚠️ Solscan meta falhou: {e}")
-            snapshot = normalize_solscan_meta_to_snapshot({}, mint)
-            snapshot["solscanError"] = str(e)
-
-        # --- Birdeye: overview + fallback ---
-        try:
-            overview, used_fallback = await be.overview_with_fallback(mint)
-            snapshot["birdeyeFallbackFromOverview"] = used_fallback
-            birdeye_status["overview"] = "fallback" if used_fallback else "ok"
-        except BirdeyeAuthOrPlanError as e:
-            overview = {}
-            birdeye_status["overview"] = f"unauthorized: {str(e)}"
-        except Exception as e:
-            overview = {}
-            birdeye_status["overview"] = f"error: {type(e).__name__}"
-
-        # --- Volume points ---
-        try:
-            volume = await be.token_volume_points(mint, interval="5m", limit=12)
-            birdeye_status["volume"] = "ok"
-        except BirdeyeAuthOrPlanError:
-            volume = {"data": {"points": []}}
-            birdeye_status["volume"] = "unauthorized"
-        except Exception as e:
-            volume = {"data": {"points": []}}
-            birdeye_status["volume"] = f"error: {type(e).__name__}"
-
-        # --- Trades recentes ---
-        try:
-            trades5m = await be.token_trades_recent(mint, limit=100)
-            birdeye_status["trades"] = "ok"
-        except BirdeyeAuthOrPlanError:
-            trades5m = {"data": {}}
-            birdeye_status["trades"] = "unauthorized"
-        except Exception as e:
-            trades5m = {"data": {}}
-            birdeye_status["trades"] = f"error: {type(e).__name__}"
 
-        # --- Merge final ---
-        snapshot = merge_birdeye_into_snapshot(snapshot, overview, volume, trades5m)
-        snapshot["birdeyeStatus"] = birdeye_status
 
-    return snapshot
+# ------------------------------
+# Histórico de snapshots (SQLite)
+# ------------------------------
+def _history_store():
+    store = SNAPSHOT_WRITER.store
+    if store is None:
+        raise HTTPException(status_code=503, detail="Histórico de snapshots indisponível.")
+    return store
+
+@router.get("/solana/latest")
+async def solana_latest(
+    mints: str = Query(..., description="Lista de mints separada por vírgula"),
+):
+    """Último snapshot gravado de cada mint (mints sem histórico ficam de fora)."""
+    mint_list = [m.strip() for m in mints.split(",") if m.strip()]
+    if not mint_list:
+        raise HTTPException(status_code=400, detail="Nenhum mint válido foi informado.")
+    return await _history_store().alatest_many(mint_list)
+
+@router.get("/solana/history/{mint}")
+async def solana_history(
+    mint: str,
+    since: Optional[float] = Query(None, description="Epoch (s) inicial; padrão: tudo"),
+    until: Optional[float] = Query(None, description="Epoch (s) final; padrão: agora"),
+    limit: int = Query(1000, ge=1, le=10_000),
+):
+    """Série temporal do mint (score, flags, classificação, liquidez, volumes, pressão); com mais de `limit` pontos, ficam os mais recentes."""
+    return await _history_store().ahistory(mint, since, until, limit)
 
 # ------------------------------
 # GPT: análise sobre o enriched
 # ------------------------------
 @router.get("/solana/analyze_enriched/{mint}")
-async def solana_analyze_enriched(mint: str):
-    async with SolscanClient() as sol, BirdeyeClient() as be:
-        # Meta tolerante
-        try:
+async def solana_analyze_enriched(
+    mint: str,
+    sol: SolscanClient = Depends(get_solscan),
+    be: BirdeyeClient = Depends(get_birdeye),
+    debug: bool = Query(False, description="Inclui _timings (ms por etapa) no corpo"),
+):
+    """
+    Solscan -> Birdeye (overview/volume/trades em paralelo) -> score local -> GPT.
+    O header Server-Timing traz o tempo de cada etapa; ?debug=true repete no corpo (_timings).
+    """
+    # Meta tolerante
+    try:
+        with stage("solscan"):
             meta = await sol.token_meta(mint)
-        except Exception as e:
-            print(f"⚠️ Solscan meta falhou: {e}")
-            meta = {}
+    except Exception as e:
+        log.warning("Solscan meta falhou", mint=mint, stage="solscan", error=str(e))
+        meta = {}
 
-        snap = normalize_solscan_meta_to_snapshot(meta or {}, mint)
+    snap = normalize_solscan_meta_to_snapshot(meta or {}, mint)
 
-        overview, used_fallback = await be.overview_with_fallback(mint)
-        try:
-            volume = await be.token_volume_points(mint, interval="5m", limit=12)
-        except BirdeyeAuthOrPlanError:
-            volume = {"data": {"points": []}}
-        try:
-            trades5m = await be.token_trades_recent(mint, limit=100)
-        except BirdeyeAuthOrPlanError:
-            trades5m = {"data": {}}
+    overview, used_fallback, volume, trades5m = await fetch_birdeye_bundle(be, mint)
 
-        snap = merge_birdeye_into_snapshot(snap, overview, volume, trades5m)
-        snap["birdeyeFallbackFromOverview"] = used_fallback
+    snap = merge_birdeye_into_snapshot(snap, overview, volume, trades5m)
+    snap["birdeyeFallbackFromOverview"] = used_fallback
 
     try:
-        llm_out = analyze_tokens([snap])
+        with stage("gpt"):
+            llm_out = await analyze_tokens_async([snap])
         llm_item = llm_out[0] if isinstance(llm_out, list) and llm_out else {}
     except Exception as e:
-        print("⚠️ Falha na análise LLM (enriched):", e)
+        log.warning("Falha na análise LLM", stage="llm", route="enriched", mint=mint, error=str(e))
         llm_item = {}
 
-    return {"snapshot": snap, "analysis": llm_item}
+    return with_timings({"snapshot": snapshot_to_dict(snap), "analysis": llm_item}, debug)
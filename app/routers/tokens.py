@@ -1,13 +1,17 @@
-from fastapi import APIRouter
-from app.services.CoinGeckoService import CoinGeckoService
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException, Query, Request
 from app.models.signal_model import Signal
+from app.routers.deps import open_coingecko
+from app.services.CoinGeckoService import COINGECKO_BATCH_MAX
+from app.core.log import get_logger
+
+log = get_logger(__name__)
 
 router = APIRouter(prefix="/token", tags=["tokens"])
 
-@router.get("/{token_address}", response_model=Signal)
-async def get_token_data(token_address: str):
-    coingecko_data = CoinGeckoService.get_token_data_from_coingecko(token_address)
-    
+
+def _coingecko_signal(token_address: str, coingecko_data: Dict[str, Any]) -> Signal:
     if not coingecko_data:
         return Signal(
             tokenAddress=token_address,
@@ -16,22 +20,44 @@ async def get_token_data(token_address: str):
             failed=["Erro ao buscar dados da CoinGecko"]
         )
 
-    snap = {
-        "tokenAddress": token_address,
-        "priceUSD": coingecko_data.get("priceUSD"),
-        "mcapUSD": coingecko_data.get("mcapUSD"),
-        "volumeUSD_24h": coingecko_data.get("volumeUSD_24h"),
-        "birdeyeUrl": coingecko_data.get("url"),
-        "icon": coingecko_data.get("icon"),
-        "links": [{"type": "coingecko", "url": coingecko_data.get("url")}] if coingecko_data.get("url") else [],
-        "name": coingecko_data.get("name"),
-        "symbol": coingecko_data.get("symbol"),
-        "header": coingecko_data.get("symbol") or coingecko_data.get("name"),
-        "description": None,
-        "flags": [],
-        "classification": None,
-        "score_local": None,
-    }
-
-    signal = Signal.from_solana_snapshot(snap, chain_id=101)
-    return signal
\ No newline at end of file
+    # Dados da CoinGecko (não é snapshot Solana): monta o Signal direto
+    url = coingecko_data.get("url")
+    return Signal(
+        tokenAddress  = token_address,
+        chainId       = 101,
+        url           = url,
+        header        = coingecko_data.get("symbol") or coingecko_data.get("name"),
+        links         = [{"type": "coingecko", "url": url}] if url else [],
+        name          = coingecko_data.get("name"),
+        symbol        = coingecko_data.get("symbol"),
+        priceUSD      = coingecko_data.get("priceUSD"),
+        mcapUSD       = coingecko_data.get("mcapUSD"),
+        volumeUSD_24h = coingecko_data.get("volumeUSD_24h"),
+        volumeH24     = coingecko_data.get("volumeUSD_24h"),
+    )
+
+
+@router.get("", response_model=List[Signal])
+async def get_tokens_data(
+    request: Request,
+    ids: str = Query(..., description="Ids CoinGecko separados por vírgula (resolvidos em lote)"),
+):
+    id_list = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not id_list:
+        raise HTTPException(status_code=400, detail="Nenhum id válido foi informado.")
+    if len(id_list) > COINGECKO_BATCH_MAX * 5:
+        raise HTTPException(status_code=400, detail=f"Máximo de {COINGECKO_BATCH_MAX * 5} ids por chamada.")
+    async with open_coingecko(request) as cg:
+        try:
+            data = await cg.coins_data(id_list)
+        except Exception as e:
+            log.warning("Erro ao buscar dados da CoinGecko", stage="coingecko", batch=len(id_list), error=str(e))
+            data = {}
+    return [_coingecko_signal(i, data.get(i, {})) for i in id_list]
+
+
+@router.get("/{token_address}", response_model=Signal)
+async def get_token_data(token_address: str, request: Request):
+    async with open_coingecko(request) as cg:
+        coingecko_data = await cg.get_token_data_from_coingecko(token_address)
+    return _coingecko_signal(token_address, coingecko_data)
@@ -0,0 +1,43 @@
+# app/routers/watchlist.py
+from fastapi import APIRouter, HTTPException
+
+from app.services.watchlist import WATCHLIST, WatchlistFullError
+
+router = APIRouter(prefix="/watchlist", tags=["watchlist"])
+
+
+@router.get("")
+async def list_watchlist():
+    """Mints vigiados + frescor do último snapshot de cada um."""
+    return {"stats": WATCHLIST.stats(), "mints": WATCHLIST.status()}
+
+
+@router.post("/{mint}", status_code=201)
+async def add_to_watchlist(mint: str):
+    """Passa a reenriquecer o mint em background (a primeira coleta sai na próxima volta do refresher)."""
+    mint = mint.strip()
+    if not mint:
+        raise HTTPException(status_code=400, detail="Mint inválido.")
+    try:
+        added = WATCHLIST.add(mint)
+    except WatchlistFullError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"mint": mint, "added": added, "size": len(WATCHLIST)}
+
+
+@router.delete("/{mint}")
+async def remove_from_watchlist(mint: str):
+    if not WATCHLIST.remove(mint):
+        raise HTTPException(status_code=404, detail="Mint não está na watchlist.")
+    return {"mint": mint, "removed": True, "size": len(WATCHLIST)}
+
+
+@router.get("/{mint}")
+async def watchlist_snapshot(mint: str):
+    """Último snapshot em memória (com 'freshness'); não consulta upstream."""
+    if mint not in WATCHLIST:
+        raise HTTPException(status_code=404, detail="Mint não está na watchlist.")
+    snap = WATCHLIST.get(mint, max_age=0)
+    if snap is None:
+        raise HTTPException(status_code=503, detail="Snapshot ainda não coletado.")
+    return snap
@@ -1,44 +1,220 @@
-import requests
-import time
+# app/services/CoinGeckoService.py
+import os
+import json
+import asyncio
+import random
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.metrics import UPSTREAM_RETRIES
+from app.services.http_pool import new_async_client, timed_get
+from app.services.rate_limiter import AsyncTokenBucket, retry_after_seconds
+from app.services.response_cache import TTLCache
+from app.services.singleflight import SingleFlight
+from app.core.log import get_logger
+
+log = get_logger(__name__)
+
+COINGECKO_BASE_URL = os.getenv("COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3").rstrip("/")
+COINGECKO_API_KEY = os.getenv("COINGECKO_API_KEY", "").strip()   # chave demo (x-cg-demo-api-key)
+COINGECKO_TIMEOUT = float(os.getenv("COINGECKO_TIMEOUT", "10"))
+COINGECKO_MAX_RETRIES = int(os.getenv("COINGECKO_MAX_RETRIES", "3"))
+COINGECKO_PLATFORM = os.getenv("COINGECKO_PLATFORM", "solana")
+
+# Itens por chamada nos endpoints em lote (ids=... / contract_addresses=...)
+COINGECKO_BATCH_MAX = int(os.getenv("COINGECKO_BATCH_MAX", "100"))
+
+# Plano público: ~30 req/min. Um bucket por processo, dividido por todas as rotas
+COINGECKO_RPS = float(os.getenv("COINGECKO_RPS", "0.5"))
+COINGECKO_BURST = float(os.getenv("COINGECKO_BURST", "5"))
+COINGECKO_LIMITER = AsyncTokenBucket(COINGECKO_RPS, COINGECKO_BURST)
+
+# Cache por token (id ou contrato): lotes reaproveitam o que já está em memória
+COINGECKO_CACHE_TTL = float(os.getenv("COINGECKO_CACHE_TTL", "60"))
+COINGECKO_CACHE_MAX_BYTES = int(os.getenv("COINGECKO_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+COINGECKO_CACHE = TTLCache(COINGECKO_CACHE_MAX_BYTES)
+
+# Só o cliente compartilhado (lifespan) coalesce entre rotas; ver BirdeyeClient
+COINGECKO_FLIGHTS = SingleFlight()
+
+RETRIABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CoinGeckoError(Exception):
+    pass
+
+
+def _market_to_data(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Item do /coins/markets -> dict usado pela rota /token."""
+    coin_id = item.get("id")
+    return {
+        "priceUSD": item.get("current_price"),
+        "mcapUSD": item.get("market_cap"),
+        "volumeUSD_24h": item.get("total_volume"),
+        "icon": item.get("image"),
+        "url": f"https://www.coingecko.com/en/coins/{coin_id}",
+        "name": item.get("name"),
+        "symbol": item.get("symbol"),
+    }
+
+
+def _price_to_data(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Item do /simple/token_price -> mesmos nomes de campo."""
+    return {
+        "priceUSD": item.get("usd"),
+        "mcapUSD": item.get("usd_market_cap"),
+        "volumeUSD_24h": item.get("usd_24h_vol"),
+    }
+
 
 class CoinGeckoService:
-    COINGECKO_API_URL = "https://api.coingecko.com/api/v3/coins"
+    """
+    Cliente CoinGecko assíncrono:
+    - Pool keep-alive (instância compartilhada via lifespan em app/main.py)
+    - Token bucket do processo (COINGECKO_RPS); 429 pausa o bucket (Retry-After) em vez de dormir
+    - Cache TTL por token; lotes pedem ao upstream só o que falta, numa chamada por bloco
+    - Single-flight: blocos idênticos em voo viram um request
+    """
+
+    def __init__(self, base_url: str = COINGECKO_BASE_URL, api_key: str = COINGECKO_API_KEY,
+                 timeout: float = COINGECKO_TIMEOUT, shared: bool = False):
+        self._base = base_url.rstrip("/")
+        self._headers = {"accept": "application/json"}
+        if api_key:
+            self._headers["x-cg-demo-api-key"] = api_key
+        self._timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._flights = COINGECKO_FLIGHTS if shared else SingleFlight()
+
+    async def __aenter__(self):
+        await self._ensure_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
 
-    @staticmethod
-    def get_token_data_from_coingecko(token_address: str):
+    async def aclose(self):
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def _ensure_client(self):
+        if self._client is None:
+            self._client = new_async_client(timeout=self._timeout, headers=self._headers)
+
+    async def _request(self, path: str, params: Dict[str, Any]) -> Any:
+        await self._ensure_client()
+        url = f"{self._base}{path}"
+        backoff = 1.0
+
+        for _ in range(COINGECKO_MAX_RETRIES):
+            await COINGECKO_LIMITER.acquire()
+            r = await timed_get(self._client, "coingecko", path, url, params=params)
+            s = r.status_code
+
+            if s == 200:
+                try:
+                    return r.json()
+                except Exception as e:
+                    raise CoinGeckoError(f"JSON inválido em {path}: {e}")
+
+            if s == 429:
+                wait = retry_after_seconds(r.headers)
+                COINGECKO_LIMITER.pause_for(wait if wait is not None else backoff)
+                UPSTREAM_RETRIES.inc("coingecko", path, s)
+                backoff = min(backoff * 2, 8.0)
+                continue
+
+            if s in RETRIABLE_STATUS:
+                UPSTREAM_RETRIES.inc("coingecko", path, s)
+                await asyncio.sleep(backoff + random.uniform(0.0, 0.25))
+                backoff = min(backoff * 2, 8.0)
+                continue
+
+            raise CoinGeckoError(f"{path} -> {s}: {r.text[:300]}")
+
+        raise CoinGeckoError(f"{path} -> retries esgotados")
+
+    async def _batched(
+        self,
+        namespace: str,
+        keys: List[str],
+        fetch_chunk,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve `keys` com cache por chave. As que faltam vão ao upstream em blocos de
+        COINGECKO_BATCH_MAX via fetch_chunk(bloco) -> {chave: dados}. Chaves que o upstream
+        não conhece ficam em cache como {} (não martelamos ids inválidos).
+        """
+        out: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for k in dict.fromkeys(keys):
+            cached = COINGECKO_CACHE.get((namespace, k))
+            if cached is None:
+                missing.append(k)
+            elif cached:
+                out[k] = cached
+
+        chunks = [missing[i:i + COINGECKO_BATCH_MAX] for i in range(0, len(missing), COINGECKO_BATCH_MAX)]
+        results = await asyncio.gather(
+            *(self._flights.do((namespace, tuple(c)), lambda c=c: fetch_chunk(c)) for c in chunks),
+            return_exceptions=True,
+        )
+        for chunk, res in zip(chunks, results):
+            if isinstance(res, BaseException):
+                # Bloco que falhou fica de fora (sem cache negativo); os outros seguem
+                log.warning("Bloco da CoinGecko falhou", stage="coingecko", batch=len(chunk), error=str(res))
+                continue
+            for k in chunk:
+                data = res.get(k) or {}
+                COINGECKO_CACHE.set((namespace, k), data, len(json.dumps(data, default=str)), COINGECKO_CACHE_TTL)
+                if data:
+                    out[k] = data
+        return out
+
+    # --- Endpoints em lote ---
+    async def coins_data(self, coin_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Preço/mcap/volume/imagem de vários ids CoinGecko (/coins/markets?ids=a,b,...)."""
+        async def fetch(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+            items = await self._request("/coins/markets", {
+                "vs_currency": "usd",
+                "ids": ",".join(chunk),
+                "per_page": len(chunk),
+            })
+            return {it["id"]: _market_to_data(it) for it in items or [] if isinstance(it, dict) and it.get("id")}
+
+        return await self._batched("markets", [c for c in coin_ids if c], fetch)
+
+    async def token_prices(self, addresses: List[str], platform: str = COINGECKO_PLATFORM) -> Dict[str, Dict[str, Any]]:
+        """Preço/mcap/volume 24h de vários contratos (/simple/token_price/{platform})."""
+        async def fetch(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+            raw = await self._request(f"/simple/token_price/{platform}", {
+                "contract_addresses": ",".join(chunk),
+                "vs_currencies": "usd",
+                "include_market_cap": "true",
+                "include_24hr_vol": "true",
+            })
+            # EVM volta em minúsculas; Solana mantém o case — casamos pelos dois
+            exact = set(chunk)
+            by_lower = {a.lower(): a for a in chunk}
+            out: Dict[str, Dict[str, Any]] = {}
+            for addr, item in (raw or {}).items():
+                orig = addr if addr in exact else by_lower.get(addr.lower())
+                if orig and isinstance(item, dict):
+                    out[orig] = _price_to_data(item)
+            return out
+
+        return await self._batched(f"price:{platform}", [a for a in addresses if a], fetch)
+
+    # --- Um token ---
+    async def get_token_data_from_coingecko(self, token_address: str) -> Dict[str, Any]:
+        """Dados de um id CoinGecko ({} se inválido, desconhecido ou upstream indisponível)."""
         if not token_address or not isinstance(token_address, str):
-            print(f"Erro: token_address inválido: {token_address}")
+            log.warning("token_address inválido", stage="coingecko", token=repr(token_address))
             return {}
-
         try:
-            response = requests.get(f"{CoinGeckoService.COINGECKO_API_URL}/{token_address}")
-            print(f"Status Code: {response.status_code}")
-            print(f"Response: {response.text}")
-            
-            if response.status_code == 429:
-                print("Erro HTTP 429: Limite de requisições atingido. Aguardando 1 segundo...")
-                time.sleep(1)
-                return {}
-            
-            if response.status_code != 200:
-                print(f"Erro HTTP {response.status_code}: {response.text}")
-                return {}
-
-            token_data = response.json()
-            data = {
-                "priceUSD": token_data.get("market_data", {}).get("current_price", {}).get("usd", None),
-                "mcapUSD": token_data.get("market_data", {}).get("market_cap", {}).get("usd", None),
-                "volumeUSD_24h": token_data.get("market_data", {}).get("total_volume", {}).get("usd", None),
-                "icon": token_data.get("image", {}).get("large", None),
-                "url": f"https://www.coingecko.com/en/coins/{token_address}",
-                "name": token_data.get("name"),
-                "symbol": token_data.get("symbol"),
-            }
-            time.sleep(0.2)
-            return data
-
+            return (await self.coins_data([token_address])).get(token_address, {})
         except Exception as e:
-            print(f"Erro ao buscar dados da CoinGecko: {e}")
-            import traceback
-            traceback.print_exc()
-            return {}
\ No newline at end of file
+            log.warning("Erro ao buscar dados da CoinGecko", stage="coingecko", token=token_address, error=str(e))
+            return {}
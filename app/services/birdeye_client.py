@@ -1,9 +1,17 @@
 import os
 import asyncio
 import random
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import httpx
 
+from app.core import deadline
+from app.core.metrics import FALLBACKS, UPSTREAM_RETRIES
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.http_pool import new_async_client, timed_get
+from app.services.rate_limiter import EndpointRateLimiter, parse_kv_floats, retry_after_seconds
+from app.services.response_cache import TTLCache, cache_key
+from app.services.singleflight import SingleFlight
+
 # Configurações globais
 BIRDEYE_BASE_URL = os.getenv("BIRDEYE_BASE_URL", "https://public-api.birdeye.so").rstrip("/")
 BIRDEYE_API_KEY = os.getenv("BIRDEYE_API_KEY", "").strip()
@@ -14,6 +22,52 @@ HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "5"))
 
 RETRIABLE_STATUS = {429, 500, 502, 503, 504}
 
+# Tamanho máximo de list_address por chamada nos endpoints em lote
+MULTI_PRICE_MAX = int(os.getenv("BIRDEYE_MULTI_PRICE_MAX", "100"))
+MARKET_DATA_MULTIPLE_MAX = int(os.getenv("BIRDEYE_MARKET_DATA_MULTIPLE_MAX", "20"))
+
+# Rate limit do plano (req/s da conta). Ex.: Standard=1, Starter=15, Premium=50
+BIRDEYE_RPS = float(os.getenv("BIRDEYE_RPS", "15"))
+BIRDEYE_BURST = float(os.getenv("BIRDEYE_BURST", "0")) or None
+# Limites/pesos por endpoint: "/defi/price=5,/defi/token_overview=2"
+BIRDEYE_ENDPOINT_RPS = parse_kv_floats(os.getenv("BIRDEYE_ENDPOINT_RPS", ""))
+BIRDEYE_ENDPOINT_WEIGHTS = parse_kv_floats(os.getenv("BIRDEYE_ENDPOINT_WEIGHTS", ""))
+
+# Um limiter por processo: todas as instâncias/rotas dividem a mesma quota
+BIRDEYE_LIMITER = EndpointRateLimiter(
+    BIRDEYE_RPS,
+    BIRDEYE_BURST,
+    endpoint_rps=BIRDEYE_ENDPOINT_RPS,
+    endpoint_weights=BIRDEYE_ENDPOINT_WEIGHTS,
+)
+
+# Cache de respostas (TTL em segundos por endpoint; 0 = sem cache)
+DEFAULT_CACHE_TTLS = {
+    "/defi/token_overview": 30.0,
+    "/defi/price": 10.0,
+    "/defi/token_pair": 60.0,
+    "/defi/history/market-trades": 15.0,
+    "/defi/token_trades_recent": 3.0,
+}
+BIRDEYE_CACHE_TTLS = {**DEFAULT_CACHE_TTLS, **parse_kv_floats(os.getenv("BIRDEYE_CACHE_TTLS", ""))}
+# Janela stale-while-revalidate = TTL * fator (0 desliga o SWR)
+BIRDEYE_CACHE_SWR_FACTOR = float(os.getenv("BIRDEYE_CACHE_SWR_FACTOR", "1.0"))
+BIRDEYE_CACHE_MAX_BYTES = int(os.getenv("BIRDEYE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Compartilhado por todas as instâncias do cliente (ex.: /links seguido de /snapshot_enriched)
+BIRDEYE_CACHE = TTLCache(BIRDEYE_CACHE_MAX_BYTES)
+
+# Requisições idênticas em voo viram uma só (rajadas do mesmo mint em várias rotas).
+# Só o cliente compartilhado (lifespan) usa este; clientes por request coalescem entre si
+BIRDEYE_FLIGHTS = SingleFlight()
+
+# Circuit breaker por endpoint: N falhas seguidas (5xx/rede) abrem o circuito por X s;
+# 401/403 ficam memorizados (plano sem acesso) e o cliente pula direto para o fallback
+BIRDEYE_CB_FAILURES = int(os.getenv("BIRDEYE_CB_FAILURES", "5"))
+BIRDEYE_CB_OPEN_SECONDS = float(os.getenv("BIRDEYE_CB_OPEN_SECONDS", "30"))
+BIRDEYE_PLAN_DENIED_TTL = float(os.getenv("BIRDEYE_PLAN_DENIED_TTL", "3600"))
+BIRDEYE_BREAKER = CircuitBreaker(BIRDEYE_CB_FAILURES, BIRDEYE_CB_OPEN_SECONDS, BIRDEYE_PLAN_DENIED_TTL)
+
 # Exceções personalizadas
 class BirdeyeError(Exception):
     pass
@@ -21,19 +75,29 @@ class BirdeyeError(Exception):
 class BirdeyeAuthOrPlanError(BirdeyeError):
     """Erro 401 ou 403 (plano insuficiente ou chave inválida)"""
 
+class BirdeyeCircuitOpenError(BirdeyeError):
+    """Circuito do endpoint aberto (falhas seguidas): falha na hora, sem ir ao upstream"""
+
 class BirdeyeClient:
     """
     Cliente Birdeye com:
     - Headers com API key
-    - Retry com backoff exponencial
+    - Rate limit por token bucket (quota do plano, prioridade interativo > bulk)
+    - Retry com backoff exponencial (429 honra Retry-After e pausa o bucket inteiro)
+    - Cache TTL/LRU por endpoint com stale-while-revalidate (SWR só no cliente `shared`)
+    - Single-flight: chamadas idênticas concorrentes compartilham um único request
+      (entre rotas só no cliente `shared`; um cliente por request não empresta o pool a outro)
     - Fallback de overview -> price
+    - Circuit breaker por endpoint (falha rápida) e memória de endpoints negados pelo plano
     - Suporte a uso com ou sem 'async with'
+    - Pool de conexões keep-alive/HTTP2 (instância compartilhada via lifespan em app/main.py)
     """
 
     def __init__(self,
                  base_url: str = BIRDEYE_BASE_URL,
                  api_key: str = BIRDEYE_API_KEY,
-                 timeout: float = HTTP_TIMEOUT):
+                 timeout: float = HTTP_TIMEOUT,
+                 shared: bool = False):
         if not api_key and not BIRDEYE_DRY_RUN:
             raise ValueError("BIRDEYE_API_KEY não definido")
         
@@ -41,50 +105,114 @@ class BirdeyeClient:
         self._headers = {"X-API-KEY": api_key, "accept": "application/json"}
         self._timeout = timeout
         self._client: Optional[httpx.AsyncClient] = None
+        self._closed = False
+        # Cliente de processo (lifespan): vive mais que qualquer request que pegue carona
+        self._shared = shared
+        self._flights = BIRDEYE_FLIGHTS if shared else SingleFlight()
 
     async def __aenter__(self):
-        self._client = httpx.AsyncClient(timeout=self._timeout, headers=self._headers)
+        self._closed = False
+        await self._ensure_client()
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
         await self.aclose()
 
     async def aclose(self):
+        self._closed = True
         if self._client:
             await self._client.aclose()
             self._client = None
 
     async def _ensure_client(self):
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=self._timeout, headers=self._headers)
+            self._client = new_async_client(timeout=self._timeout, headers=self._headers)
 
     async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         if BIRDEYE_DRY_RUN:
             return {"data": {}, "dry_run": True}
 
+        key = cache_key(path, params)
+
+        def fetch():
+            return self._flights.do(key, lambda: self._request(path, params))
+
+        ttl = BIRDEYE_CACHE_TTLS.get(path, 0.0)
+        if ttl <= 0:
+            data, _ = await fetch()
+            return data
+
+        # Só o cliente compartilhado serve stale: o refresh em background de um cliente
+        # por request rodaria depois do aclose() e falharia sempre
+        return await BIRDEYE_CACHE.get_or_fetch(key, fetch, ttl, ttl * BIRDEYE_CACHE_SWR_FACTOR,
+                                                revalidate=self._shared)
+
+    async def _request(self, path: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], int]:
+        """
+        GET com rate limit + retries. Retorna (json, tamanho do corpo em bytes).
+        Com prazo no request (app.core.deadline), timeout, espera no limiter e backoff
+        ficam limitados ao tempo restante; estourou -> DeadlineExceeded.
+        """
+        if self._closed:
+            # Ex.: retry em voo depois que o cliente por-request já foi fechado
+            raise BirdeyeError(f"{path} -> cliente fechado")
+        if BIRDEYE_BREAKER.is_denied(path):
+            raise BirdeyeAuthOrPlanError(f"{path} -> sem acesso no plano (memorizado)")
         await self._ensure_client()
         url = f"{self._base}{path}"
         backoff = 0.5
 
         for _ in range(HTTP_MAX_RETRIES):
-            r = await self._client.get(url, params=params or {})
+            deadline.check(path)
+            if not BIRDEYE_BREAKER.allow(path):
+                raise BirdeyeCircuitOpenError(
+                    f"{path} -> circuito aberto (nova tentativa em {BIRDEYE_BREAKER.retry_in(path):.0f}s)"
+                )
+            await deadline.wait(BIRDEYE_LIMITER.acquire(path), path)
+            try:
+                r = await timed_get(self._client, "birdeye", path, url, params=params or {},
+                                    timeout=deadline.cap(self._timeout, path))
+            except httpx.TransportError as e:
+                if isinstance(e, httpx.TimeoutException) and deadline.expired():
+                    # Timeout encurtado pelo prazo do request: não é falha do endpoint
+                    raise deadline.DeadlineExceeded(f"{path} -> prazo do request esgotado") from e
+                BIRDEYE_BREAKER.record_failure(path)
+                raise
             s = r.status_code
+            BIRDEYE_LIMITER.observe_headers(r.headers, path)
 
             if s == 200:
+                BIRDEYE_BREAKER.record_success(path)
                 try:
-                    return r.json()
+                    return r.json(), len(r.content)
                 except Exception as e:
                     raise BirdeyeError(f"JSON inválido em {path}: {e}. body[:300]={r.text[:300]}")
 
             if s in (401, 403):
+                # Endpoint respondeu (não é falha do circuito), mas o plano não cobre: memoriza
+                BIRDEYE_BREAKER.record_success(path)
+                BIRDEYE_BREAKER.mark_denied(path)
                 raise BirdeyeAuthOrPlanError(f"{path} -> {s}: {r.text[:300]}")
 
+            if s == 429:
+                # Pausa o bucket (todas as requisições esperam juntas) em vez de cada uma dormir sozinha
+                wait = retry_after_seconds(r.headers)
+                BIRDEYE_LIMITER.pause_for(wait if wait is not None else backoff, path)
+                # 429 não diz nada da saúde do endpoint: se esta era a sonda, o retry pode sondar de novo
+                BIRDEYE_BREAKER.release_probe(path)
+                UPSTREAM_RETRIES.inc("birdeye", path, s)
+                backoff = min(backoff * 2, 4.0)
+                continue
+
             if s in RETRIABLE_STATUS:
+                BIRDEYE_BREAKER.record_failure(path)
                 jitter = random.uniform(0.0, 0.25)
-                await asyncio.sleep(backoff + jitter)
+                UPSTREAM_RETRIES.inc("birdeye", path, s)
+                await deadline.sleep(backoff + jitter, path)
                 backoff = min(backoff * 2, 4.0)
                 continue
 
+            BIRDEYE_BREAKER.record_success(path)
             raise BirdeyeError(f"{path} -> {s}: {r.text[:300]}")
 
         raise BirdeyeError(f"{path} -> retries esgotados")
@@ -116,6 +244,61 @@ class BirdeyeClient:
     async def token_pairs(self, mint: str, chain: str = "solana") -> Dict[str, Any]:
         return await self._get("/defi/token_pair", {"address": mint, "chain": chain})
 
+    # --- Endpoints em lote (várias addresses por chamada) ---
+    async def _get_chunked(self, path: str, mints: List[str], chunk: int, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Divide `mints` em blocos de até `chunk` e junta os 'data' ({address: item}).
+        401/403 em qualquer bloco propaga (plano sem acesso ao endpoint); outros erros
+        só deixam de fora os mints do bloco que falhou.
+        """
+        unique = list(dict.fromkeys(m for m in mints if m))
+        blocks = [unique[i:i + chunk] for i in range(0, len(unique), max(1, chunk))]
+        results = await asyncio.gather(
+            *(self._get(path, {**params, "list_address": ",".join(b)}) for b in blocks),
+            return_exceptions=True,
+        )
+        merged: Dict[str, Any] = {}
+        for res in results:
+            if isinstance(res, BirdeyeAuthOrPlanError):
+                raise res
+            if isinstance(res, BaseException):
+                continue
+            data = (res or {}).get("data") or {}
+            if isinstance(data, dict):
+                merged.update({k: v for k, v in data.items() if isinstance(v, dict)})
+        return {"data": merged}
+
+    async def multi_price(self, mints: List[str], include_liquidity: bool = True, chain: str = "solana") -> Dict[str, Any]:
+        return await self._get_chunked("/defi/multi_price", mints, MULTI_PRICE_MAX, {
+            "chain": chain,
+            "include_liquidity": "true" if include_liquidity else "false",
+        })
+
+    async def token_market_data_multiple(self, mints: List[str], chain: str = "solana") -> Dict[str, Any]:
+        return await self._get_chunked("/defi/v3/token/market-data/multiple", mints, MARKET_DATA_MULTIPLE_MAX, {
+            "chain": chain,
+        })
+
+    async def overview_many_with_fallback(self, mints: List[str], chain: str = "solana") -> Dict[str, Tuple[Dict[str, Any], bool]]:
+        """
+        Versão em lote do overview_with_fallback.
+        Retorna {mint: (payload no formato {"data": {...}}, usou_fallback)}.
+        Market data em lote -> (401/403) multi_price -> (401/403) {}.
+        Mints ausentes do retorno devem cair no caminho por-mint.
+        """
+        if BIRDEYE_DRY_RUN:
+            return {}
+        try:
+            data = (await self.token_market_data_multiple(mints, chain=chain))["data"]
+            return {m: ({"data": data[m]}, False) for m in mints if m in data}
+        except BirdeyeAuthOrPlanError:
+            FALLBACKS.inc("birdeye", "market_data_to_multi_price")
+        try:
+            data = (await self.multi_price(mints, include_liquidity=True, chain=chain))["data"]
+            return {m: ({"data": data[m]}, True) for m in mints if m in data}
+        except BirdeyeAuthOrPlanError:
+            return {}
+
     # --- Helper com fallback seguro ---
     async def overview_with_fallback(self, mint: str, chain: str = "solana") -> Tuple[Dict[str, Any], bool]:
         """
@@ -124,7 +307,9 @@ class BirdeyeClient:
         try:
             data = await self.token_overview(mint, chain=chain)
             return data, False
-        except BirdeyeAuthOrPlanError:
+        except (BirdeyeAuthOrPlanError, BirdeyeCircuitOpenError):
+            # Plano sem overview (memorizado após o 1º 401/403) ou overview fora do ar
+            FALLBACKS.inc("birdeye", "overview_to_price")
             try:
                 data = await self.price(mint, include_liquidity=True, chain=chain)
                 return data, True
@@ -0,0 +1,142 @@
+# app/services/circuit_breaker.py
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _Endpoint:
+    __slots__ = ("state", "failures", "opened_at", "probe_at", "denied_until", "trips", "rejected")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0           # falhas consecutivas
+        self.opened_at = 0.0
+        self.probe_at: Optional[float] = None  # half-open: quando a sonda saiu
+        self.denied_until = 0.0     # plano sem acesso memorizado até aqui
+        self.trips = 0
+        self.rejected = 0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por endpoint (chave = path) + memória de "plano sem acesso".
+
+    - closed: tudo passa; `failure_threshold` falhas seguidas (5xx, rede) -> open
+    - open: `allow` recusa na hora (sem rede, sem retry) por `open_seconds`
+    - half_open: uma única sonda passa; sucesso -> closed, falha -> open de novo.
+      Sonda que some sem reportar (ex.: cancelada) libera outra após `open_seconds`;
+      sonda sem veredito (429 = limite do plano, não saúde do endpoint) chama `release_probe`.
+
+    401/403 não abrem o circuito: o endpoint fica marcado como negado pelo plano por
+    `denied_ttl` segundos e o cliente vai direto ao fallback (`is_denied`). Passado o
+    TTL, uma chamada real confere se o plano mudou.
+
+    Não é thread-safe (uso dentro do event loop).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        open_seconds: float = 30.0,
+        denied_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.open_seconds = float(open_seconds)
+        self.denied_ttl = float(denied_ttl)
+        self._clock = clock
+        self._endpoints: Dict[Hashable, _Endpoint] = {}
+
+    def _ep(self, key: Hashable) -> _Endpoint:
+        ep = self._endpoints.get(key)
+        if ep is None:
+            ep = self._endpoints[key] = _Endpoint()
+        return ep
+
+    # --- Plano ---
+    def is_denied(self, key: Hashable) -> bool:
+        ep = self._endpoints.get(key)
+        return ep is not None and ep.denied_until > self._clock()
+
+    def mark_denied(self, key: Hashable) -> None:
+        self._ep(key).denied_until = self._clock() + self.denied_ttl
+
+    # --- Circuito ---
+    def allow(self, key: Hashable) -> bool:
+        """True se a chamada pode ir ao upstream agora (e reserva a sonda no half-open)."""
+        ep = self._endpoints.get(key)
+        if ep is None or ep.state == CLOSED:
+            return True
+        now = self._clock()
+        if ep.state == OPEN:
+            if now - ep.opened_at < self.open_seconds:
+                ep.rejected += 1
+                return False
+            ep.state = HALF_OPEN
+            ep.probe_at = None
+        # half-open: só uma sonda por vez
+        if ep.probe_at is not None and now - ep.probe_at < self.open_seconds:
+            ep.rejected += 1
+            return False
+        ep.probe_at = now
+        return True
+
+    def retry_in(self, key: Hashable) -> float:
+        """Segundos até o circuito aceitar uma sonda (0 se já aceita)."""
+        ep = self._endpoints.get(key)
+        if ep is None or ep.state == CLOSED:
+            return 0.0
+        since = ep.probe_at if ep.state == HALF_OPEN and ep.probe_at is not None else ep.opened_at
+        return max(0.0, self.open_seconds - (self._clock() - since))
+
+    def record_success(self, key: Hashable) -> None:
+        ep = self._endpoints.get(key)
+        if ep is None:
+            return
+        ep.state = CLOSED
+        ep.failures = 0
+        ep.probe_at = None
+
+    def release_probe(self, key: Hashable) -> None:
+        """Sonda voltou sem veredito (ex.: 429): libera a vaga para a próxima tentativa."""
+        ep = self._endpoints.get(key)
+        if ep is not None and ep.state == HALF_OPEN:
+            ep.probe_at = None
+
+    def record_failure(self, key: Hashable) -> None:
+        ep = self._ep(key)
+        ep.failures += 1
+        if ep.state == HALF_OPEN or (ep.state == CLOSED and ep.failures >= self.failure_threshold):
+            ep.state = OPEN
+            ep.opened_at = self._clock()
+            ep.probe_at = None
+            ep.trips += 1
+
+    def state(self, key: Hashable) -> str:
+        ep = self._endpoints.get(key)
+        if ep is None:
+            return CLOSED
+        if ep.state == OPEN and self._clock() - ep.opened_at >= self.open_seconds:
+            return HALF_OPEN  # próxima chamada vira a sonda
+        return ep.state
+
+    def reset(self) -> None:
+        self._endpoints.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        out: Dict[str, Any] = {}
+        for key, ep in self._endpoints.items():
+            out[str(key)] = {
+                "state": self.state(key),
+                "consecutive_failures": ep.failures,
+                "retry_in_s": round(self.retry_in(key), 1),
+                "trips": ep.trips,
+                "rejected": ep.rejected,
+                "plan_denied": ep.denied_until > now,
+                "plan_denied_for_s": round(max(0.0, ep.denied_until - now), 1),
+            }
+        return out
@@ -1,32 +1,58 @@
-import requests
-
-def get_token_profiles():
-    url = "https://api.dexscreener.com/token-profiles/latest/v1"
-    headers = {"Accept": "*/*", "User-Agent": "Mozilla/5.0"}
-
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-
-        if response.status_code != 200:
-            print("Erro HTTP:", response.status_code)
-            return []
-
-        tokens = response.json()
-
-        result = []
-        for token in tokens:
-            result.append({
-                "tokenAddress": token.get("tokenAddress"),
-                "url": token.get("url"),
-                "icon": token.get("icon"),
-                "header": token.get("header"),
-                "description": token.get("description"),
-                "chainId": token.get("chainId"),
-                "links": token.get("links", [])
-            })
-
-        return result
-
-    except Exception as e:
-        print("Erro ao buscar tokens:", e)
-        return []
+# app/services/dex_api.py
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import httpx
+
+from app.services.http_pool import timed_get
+
+DEX_PROFILES_URL = os.getenv("DEX_PROFILES_URL", "https://api.dexscreener.com/token-profiles/latest/v1")
+DEX_TIMEOUT = float(os.getenv("DEX_TIMEOUT", "10"))
+DEX_HEADERS = {"Accept": "*/*", "User-Agent": "Mozilla/5.0"}
+
+
+class ProfilesPage(NamedTuple):
+    status: int                          # 200, 304 (não mudou) ou código de erro
+    profiles: List[Dict[str, Any]]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: bytes
+
+
+def normalize_profile(token: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "tokenAddress": token.get("tokenAddress"),
+        "url": token.get("url"),
+        "icon": token.get("icon"),
+        "header": token.get("header"),
+        "description": token.get("description"),
+        "chainId": token.get("chainId"),
+        "links": token.get("links", []),
+    }
+
+
+async def fetch_token_profiles(
+    client: httpx.AsyncClient,
+    *,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> ProfilesPage:
+    """
+    GET token-profiles/latest/v1 (assíncrono). Com etag/last_modified manda
+    If-None-Match/If-Modified-Since; 304 volta com profiles vazio.
+    """
+    headers = dict(DEX_HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    r = await timed_get(client, "dexscreener", "/token-profiles/latest/v1", DEX_PROFILES_URL, headers=headers)
+    new_etag = r.headers.get("etag") or etag
+    new_lm = r.headers.get("last-modified") or last_modified
+    if r.status_code != 200:
+        return ProfilesPage(r.status_code, [], new_etag, new_lm, b"")
+
+    data = r.json()
+    profiles = [normalize_profile(t) for t in data if isinstance(t, dict)] if isinstance(data, list) else []
+    return ProfilesPage(200, profiles, new_etag, new_lm, r.content)
@@ -0,0 +1,240 @@
+# app/services/dex_ingester.py
+import os
+import time
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.services.dex_api import DEX_TIMEOUT, fetch_token_profiles
+from app.services.http_pool import new_async_client
+from app.utils.filters import BLACKLIST, screen_tokens
+from app.core.log import get_logger
+
+log = get_logger(__name__)
+
+# Feed de perfis do DexScreener (chain=dex) consumido em background
+DEX_INGEST_ENABLED = os.getenv("DEX_INGEST_ENABLED", "true").lower() == "true"
+DEX_POLL_SECONDS = float(os.getenv("DEX_POLL_SECONDS", "30"))
+# Estado mais velho que isso (ingester parado/falhando) -> a rota busca sob demanda
+DEX_MAX_STALENESS = float(os.getenv("DEX_MAX_STALENESS", str(DEX_POLL_SECONDS * 4)))
+# Tamanho máximo do seen-set (os mais antigos saem primeiro)
+DEX_SEEN_MAX = int(os.getenv("DEX_SEEN_MAX", "10000"))
+
+Key = Tuple[str, str]  # (chainId, tokenAddress)
+
+
+def _key(token: Dict[str, Any]) -> Key:
+    return (str(token.get("chainId") or "").lower(), str(token.get("tokenAddress") or ""))
+
+
+def _digest(token: Dict[str, Any]) -> str:
+    # Conteúdo do perfil (descrição, links, ...): mudou -> reavalia
+    content = {k: v for k, v in token.items() if k != "__eval__"}
+    raw = json.dumps(content, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class _Memo:
+    __slots__ = ("digest", "version", "token", "approved")
+
+    def __init__(self, digest: str, version: int, token: Dict[str, Any], approved: bool):
+        self.digest = digest
+        self.version = version  # BLACKLIST.version usada na avaliação
+        self.token = token      # perfil com __eval__ (rejeitado também: reavaliável)
+        self.approved = approved
+
+
+def _log_rejected(token: Dict[str, Any], result: Dict[str, Any]) -> None:
+    name = token.get("name") or token.get("symbol") or token.get("header") or token.get("tokenAddress") or "sem nome"
+    erros = result["failed"] + result["unknown"]
+    log.sample("Descartado", mint=token.get("tokenAddress"), stage="screen", name=name, failed=erros)
+
+
+class DexIngester:
+    """
+    Poll assíncrono do token-profiles/latest/v1 + estado em memória para /signals?chain=dex.
+
+    - Requisições condicionais (If-None-Match/If-Modified-Since) quando o upstream manda
+      ETag/Last-Modified; sem eles, um hash do corpo detecta feed inalterado.
+    - Seen-set por (chainId, tokenAddress) + hash do conteúdo do perfil: só perfis novos
+      ou alterados passam pelo screener (screen_tokens, em lote); o resultado fica
+      memorizado com a versão da blacklist. Blacklist recarregada -> os perfis do último
+      feed são reavaliados (current() já não devolve os que passaram a ser proibidos).
+    - A rota lê current(): aprovados do último feed, na ordem do feed.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEX_POLL_SECONDS,
+        max_staleness: float = DEX_MAX_STALENESS,
+        seen_max: int = DEX_SEEN_MAX,
+    ):
+        self.interval = max(1.0, float(interval))
+        self.max_staleness = max_staleness
+        self.seen_max = seen_max
+        self._seen: "OrderedDict[Key, _Memo]" = OrderedDict()
+        self._latest: List[Key] = []
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._digest: Optional[str] = None
+        self._updated_at: Optional[float] = None   # monotonic do último poll bem-sucedido
+        self._lock = asyncio.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.not_modified = 0
+        self.evaluated = 0
+        self.errors = 0
+
+    # --- estado ---
+    def _remember(self, key: Key, digest: str, version: int, token: Dict[str, Any], approved: bool) -> None:
+        self._seen[key] = _Memo(digest, version, token, approved)
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.seen_max:
+            self._seen.popitem(last=False)
+
+    def _screen(self, fresh: Dict[Key, Tuple[str, Dict[str, Any]]]) -> None:
+        tokens = [token for (_, token) in fresh.values()]
+        results = screen_tokens(tokens)
+        version = BLACKLIST.version
+        for (key, (digest, token)), result in zip(fresh.items(), results):
+            token["__eval__"] = result
+            approved = result["status"] != "rejected"
+            if not approved:
+                _log_rejected(token, result)
+            self._remember(key, digest, version, token, approved)
+        self.evaluated += len(fresh)
+
+    def _rescreen_stale(self) -> None:
+        """Blacklist mudou desde a avaliação: reavalia os perfis do último feed."""
+        BLACKLIST.maybe_reload()
+        version = BLACKLIST.version
+        stale: Dict[Key, Tuple[str, Dict[str, Any]]] = {}
+        for key in self._latest:
+            memo = self._seen.get(key)
+            if memo is not None and memo.version != version:
+                stale[key] = (memo.digest, memo.token)
+        if stale:
+            self._screen(stale)
+
+    def ingest(self, profiles: List[Dict[str, Any]]) -> int:
+        """
+        Aplica um feed: avalia (em lote) só os perfis novos, com conteúdo diferente do
+        memorizado ou avaliados com outra versão da blacklist. Retorna quantos foram avaliados.
+        """
+        BLACKLIST.maybe_reload()
+        version = BLACKLIST.version
+        latest: List[Key] = []
+        fresh: Dict[Key, Tuple[str, Dict[str, Any]]] = {}
+        for token in profiles:
+            key = _key(token)
+            if not key[1]:
+                continue
+            latest.append(key)
+            if key in fresh:
+                continue
+            digest = _digest(token)
+            memo = self._seen.get(key)
+            if memo is not None and memo.digest == digest and memo.version == version:
+                self._seen.move_to_end(key)
+            else:
+                fresh[key] = (digest, token)
+
+        self._screen(fresh)
+        self._latest = latest
+        self._updated_at = time.monotonic()
+        return len(fresh)
+
+    def current(self) -> List[Dict[str, Any]]:
+        """Tokens aprovados do último feed (com __eval__), na ordem do feed."""
+        self._rescreen_stale()
+        memos = (self._seen.get(k) for k in self._latest)
+        return [m.token for m in memos if m is not None and m.approved]
+
+    def is_fresh(self) -> bool:
+        return self._updated_at is not None and time.monotonic() - self._updated_at <= self.max_staleness
+
+    # --- upstream ---
+    async def poll_once(self, client: httpx.AsyncClient) -> int:
+        """Um GET condicional do feed. Retorna quantos perfis novos foram avaliados."""
+        page = await fetch_token_profiles(client, etag=self._etag, last_modified=self._last_modified)
+        self.polls += 1
+        self._etag, self._last_modified = page.etag, page.last_modified
+        if page.status == 304:
+            self.not_modified += 1
+            self._updated_at = time.monotonic()
+            return 0
+        if page.status != 200:
+            raise RuntimeError(f"DexScreener HTTP {page.status}")
+
+        digest = hashlib.blake2b(page.body, digest_size=16).hexdigest()
+        if digest == self._digest:
+            self.not_modified += 1
+            self._updated_at = time.monotonic()
+            return 0
+        self._digest = digest
+        return self.ingest(page.profiles)
+
+    async def ensure_fresh(self) -> None:
+        """Garante estado recente: sem poll recente, busca agora (um poll por vez)."""
+        if self.is_fresh():
+            return
+        async with self._lock:
+            if self.is_fresh():  # outro request já buscou enquanto esperávamos
+                return
+            if self._client is not None:
+                await self.poll_once(self._client)
+                return
+            async with new_async_client(timeout=DEX_TIMEOUT) as client:
+                await self.poll_once(client)
+
+    async def run(self) -> None:
+        self._client = new_async_client(timeout=DEX_TIMEOUT)
+        try:
+            while True:
+                try:
+                    async with self._lock:
+                        await self.poll_once(self._client)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.errors += 1
+                    log.warning("Falha no poll do DexScreener", stage="dex_ingest", error=str(e))
+                await asyncio.sleep(self.interval)
+        finally:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "poll_seconds": self.interval,
+            "polls": self.polls,
+            "not_modified": self.not_modified,
+            "evaluated": self.evaluated,
+            "errors": self.errors,
+            "seen": len(self._seen),
+            "latest": len(self._latest),
+            "approved": len(self.current()),
+            "ageSeconds": round(time.monotonic() - self._updated_at, 3) if self._updated_at else None,
+        }
+
+
+DEX_INGESTER = DexIngester()
@@ -2,16 +2,33 @@
 import os
 import re
 import json
-from typing import List, Dict, Any
+import time
+import asyncio
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
+from app.services.verdict_cache import get_verdict_cache, verdict_key
+from app.core import deadline
+from app.core.metrics import STAGE_LLM, UPSTREAM_INFLIGHT, UPSTREAM_SECONDS
+from app.core.log import get_logger
+
 # Carrega .env localmente (não usado no Render, mas útil em dev)
 load_dotenv()
 
+log = get_logger(__name__)
+
 ESSENTIAL_FIELDS = [
     "tokenAddress", "url", "header", "description", "chainId", "links",
 ]
 
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "8"))
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "4"))      # lotes simultâneos no caminho async
+LLM_BATCH_TIMEOUT = float(os.getenv("LLM_BATCH_TIMEOUT", "30"))  # segundos por lote
+
+_ASYNC_CLIENT = None
+
 def _get_openai_client():
     """Cria o client só quando necessário e via variável de ambiente."""
     from openai import OpenAI
@@ -23,6 +40,20 @@ def _get_openai_client():
         )
     return OpenAI(api_key=api_key)
 
+def _get_async_openai_client():
+    """AsyncOpenAI criado uma única vez e reaproveitado (pool de conexões do SDK)."""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        from openai import AsyncOpenAI
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError(
+                "OPENAI_API_KEY não definida. "
+                "Defina no .env (dev) ou nas Environment Variables do Render."
+            )
+        _ASYNC_CLIENT = AsyncOpenAI(api_key=api_key)
+    return _ASYNC_CLIENT
+
 def _compact_token(token: Dict[str, Any]) -> Dict[str, Any]:
     out = {k: token.get(k) for k in ESSENTIAL_FIELDS if k in token}
     out["chainId"] = str(out.get("chainId", "")).lower()
@@ -98,56 +129,212 @@ def _parse_llm_json(text: str):
 
     raise ValueError("Não foi possível extrair JSON válido da resposta do LLM.")
 
+def _batch_messages(batch: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    user_msg = USER_TEMPLATE.format(compact_json=json.dumps(batch, ensure_ascii=False))
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_msg},
+    ]
+
+def _parse_batch_output(text: str) -> List[Dict[str, Any]]:
+    parsed = _parse_llm_json(text)
+    if not isinstance(parsed, list):
+        raise ValueError("Formato de resposta inesperado (esperado lista JSON).")
+    return parsed
+
+def _fallback_items(batch: List[Dict[str, Any]], rationale: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "tokenAddress": t.get("tokenAddress"),
+            "decision": "observar",
+            "confidence": 35,
+            "rationale": rationale,
+        }
+        for t in batch
+    ]
+
+def _merge_results(tokens: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Junta os campos do GPT com os tokens originais."""
+    result_map = {r.get("tokenAddress"): r for r in results if r and r.get("tokenAddress")}
+    for t in tokens:
+        r = result_map.get(t.get("tokenAddress"))
+        if r:
+            t.update(r)
+    return tokens
+
+def _prompt_fingerprint() -> str:
+    """Muda o prompt ou o modelo -> muda a chave do cache de veredictos."""
+    raw = f"{OPENAI_MODEL}\n{SYSTEM_PROMPT}\n{USER_TEMPLATE}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+def _cache_plan(tokens: List[Dict[str, Any]], compacted: List[Dict[str, Any]]):
+    fp = _prompt_fingerprint()
+    return [(verdict_key(c, fp), t) for t, c in zip(tokens, compacted)]
+
+def _pending_and_cached(
+    compacted: List[Dict[str, Any]],
+    plan: List[Tuple[str, Dict[str, Any]]],
+    hits: List[Optional[Dict[str, Any]]],
+):
+    """Separa o que já tem veredicto válido do que precisa ir ao LLM."""
+    results: List[Dict[str, Any]] = [h for h in hits if h]
+    pending = [(c, key, t) for c, (key, t), h in zip(compacted, plan, hits) if not h]
+    return results, pending
+
+def _cache_entries(items: List[Dict[str, Any]], pending_batch) -> List[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    by_addr = {c.get("tokenAddress"): (key, t) for c, key, t in pending_batch}
+    entries = []
+    for item in items:
+        ref = by_addr.get((item or {}).get("tokenAddress"))
+        if ref:
+            entries.append((ref[0], ref[1], item))
+    return entries
+
+def _observe_llm(started: float, outcome: str) -> None:
+    # Por lote: etapa "llm" + latência do upstream openai com o desfecho como status
+    dt = time.perf_counter() - started
+    STAGE_LLM.observe(dt)
+    UPSTREAM_SECONDS.observe(dt, "openai", "chat.completions", outcome)
+
 def analyze_tokens(tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Recebe tokens e adiciona análise do GPT diretamente neles."""
+    """
+    Recebe tokens e adiciona análise do GPT diretamente neles.
+    Versão síncrona (bloqueia): em rotas async use analyze_tokens_async.
+    Tokens com veredicto em cache (e sem mudança material) não vão ao LLM.
+    """
     if not tokens:
         return []
 
-    client = _get_openai_client()
     compacted = [_compact_token(t) for t in tokens]
-    BATCH = 8
-    results: List[Dict[str, Any]] = []
+    cache = get_verdict_cache()
+    plan = _cache_plan(tokens, compacted)
+    hits = cache.lookup_many(plan) if cache else [None] * len(plan)
+    results, pending = _pending_and_cached(compacted, plan, hits)
+    if not pending:
+        return _merge_results(tokens, results)
 
-    for i in range(0, len(compacted), BATCH):
-        batch = compacted[i:i + BATCH]
-        user_msg = USER_TEMPLATE.format(compact_json=json.dumps(batch, ensure_ascii=False))
+    client = _get_openai_client()
+
+    for i in range(0, len(pending), LLM_BATCH_SIZE):
+        pending_batch = pending[i:i + LLM_BATCH_SIZE]
+        batch = [c for c, _, _ in pending_batch]
+        messages = _batch_messages(batch)
+        text = None
+        started = time.perf_counter()
+        outcome = "error"
 
         try:
             response = client.chat.completions.create(
-                model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+                model=OPENAI_MODEL,
                 temperature=0.2,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_msg},
-                ],
+                messages=messages,
+            )
+            text = (response.choices[0].message.content or "").strip()
+            items = _parse_batch_output(text)
+            outcome = "ok"
+            results.extend(items)
+            if cache:
+                cache.save_many(_cache_entries(items, pending_batch))
+
+        except Exception as e:
+            log.error(
+                "Falha no lote do LLM",
+                stage="llm",
+                batch=len(batch),
+                error=str(e),
+                input=messages[1]["content"][:1500],
+                raw_output=text[:1000] if text is not None else None,
             )
+            results.extend(_fallback_items(batch, "Falha ao interpretar saída do LLM; usar avaliação local."))
+        finally:
+            _observe_llm(started, outcome)
+
+    return _merge_results(tokens, results)
 
+async def _analyze_batch_async(
+    client,
+    batch: List[Dict[str, Any]],
+    sem: asyncio.Semaphore,
+    timeout: float,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Retorna (itens, ok). ok=False => itens de fallback (não vão para o cache)."""
+    text: Optional[str] = None
+    async with sem:
+        inflight = UPSTREAM_INFLIGHT.labels("openai")
+        inflight.inc()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            # Prazo do request (se houver) encurta o timeout; já esgotado -> fallback local direto
+            timeout = deadline.cap(timeout, "openai")
+            response = await asyncio.wait_for(
+                client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    temperature=0.2,
+                    messages=_batch_messages(batch),
+                ),
+                timeout=timeout,
+            )
             text = (response.choices[0].message.content or "").strip()
-            parsed = _parse_llm_json(text)
+            items = _parse_batch_output(text)
+            outcome = "ok"
+            return items, True
+
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            log.warning("Lote do LLM excedeu o tempo limite", stage="llm", batch=len(batch), timeout_s=timeout)
+            return _fallback_items(batch, "LLM excedeu o tempo limite; usar avaliação local."), False
+        except Exception as e:
+            log.error(
+                "Falha no lote do LLM",
+                stage="llm",
+                batch=len(batch),
+                error=str(e),
+                raw_output=text[:1000] if text is not None else None,
+            )
+            return _fallback_items(batch, "Falha ao interpretar saída do LLM; usar avaliação local."), False
+        finally:
+            inflight.dec()
+            _observe_llm(started, outcome)
+
+async def analyze_tokens_async(
+    tokens: List[Dict[str, Any]],
+    *,
+    max_inflight: int = LLM_MAX_INFLIGHT,
+    batch_timeout: float = LLM_BATCH_TIMEOUT,
+) -> List[Dict[str, Any]]:
+    """
+    Igual ao analyze_tokens, mas sem bloquear o event loop: usa AsyncOpenAI e envia os
+    lotes em paralelo (no máximo `max_inflight` ao mesmo tempo, `batch_timeout` por lote).
+    """
+    if not tokens:
+        return []
+
+    compacted = [_compact_token(t) for t in tokens]
+    cache = get_verdict_cache()
+    plan = _cache_plan(tokens, compacted)
+    hits = await cache.alookup_many(plan) if cache else [None] * len(plan)
+    results, pending = _pending_and_cached(compacted, plan, hits)
+    if not pending:
+        return _merge_results(tokens, results)
+
+    client = _get_async_openai_client()
+    sem = asyncio.Semaphore(max(1, max_inflight))
+    pending_batches = [pending[i:i + LLM_BATCH_SIZE] for i in range(0, len(pending), LLM_BATCH_SIZE)]
 
-            if isinstance(parsed, list):
-                results.extend(parsed)
-            else:
-                raise ValueError("Formato de resposta inesperado (esperado lista JSON).")
+    outs = await asyncio.gather(*(
+        _analyze_batch_async(client, [c for c, _, _ in pb], sem, batch_timeout) for pb in pending_batches
+    ))
 
+    to_cache = []
+    for pb, (items, ok) in zip(pending_batches, outs):
+        results.extend(items)
+        if ok:
+            to_cache.extend(_cache_entries(items, pb))
+    if cache and to_cache:
+        try:
+            await cache.asave_many(to_cache)
         except Exception as e:
-            print("[GPT ERROR]", str(e))
-            print("[GPT INPUT]", user_msg[:1500])
-            if 'text' in locals():
-                print("[GPT RAW OUTPUT]", repr(text[:1000]))
-            for t in batch:
-                results.append({
-                    "tokenAddress": t.get("tokenAddress"),
-                    "decision": "observar",
-                    "confidence": 35,
-                    "rationale": "Falha ao interpretar saída do LLM; usar avaliação local."
-                })
-
-    # Junta os campos do GPT com os tokens originais
-    result_map = {r.get("tokenAddress"): r for r in results if r and r.get("tokenAddress")}
-    for t in tokens:
-        r = result_map.get(t.get("tokenAddress"))
-        if r:
-            t.update(r)
+            log.warning("Falha ao gravar veredictos em cache", stage="verdict_cache", error=str(e))
 
-    return tokens
+    return _merge_results(tokens, results)
@@ -0,0 +1,56 @@
+# app/services/http_pool.py
+import os
+import time
+import importlib.util
+from typing import Dict, Optional
+import httpx
+
+from app.core.metrics import UPSTREAM_INFLIGHT, UPSTREAM_SECONDS
+
+# Pool de conexões compartilhado (vive o tempo todo da aplicação, ver app/main.py)
+HTTP_SHARED_CLIENTS = os.getenv("HTTP_SHARED_CLIENTS", "true").lower() == "true"
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+# HTTP/2 só se o pacote 'h2' estiver instalado (pip install "httpx[http2]")
+HTTP2_ENABLED = (
+    os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+    and importlib.util.find_spec("h2") is not None
+)
+
+
+def new_async_client(*, timeout: float, headers: Optional[Dict[str, str]] = None) -> httpx.AsyncClient:
+    """
+    Cria um httpx.AsyncClient com limites de pool, keep-alive e HTTP/2 (multiplexing)
+    quando disponível. Use uma instância por upstream e reaproveite-a.
+    """
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        timeout=timeout,
+        headers=headers or {},
+        limits=limits,
+        http2=HTTP2_ENABLED,
+    )
+
+
+async def timed_get(client: httpx.AsyncClient, upstream: str, endpoint: str, url: str, **kwargs) -> httpx.Response:
+    """
+    client.get instrumentado: latência por (upstream, endpoint, status) e gauge de
+    requests em voo (ver app/core/metrics.py). Erro de rede/timeout vira status="error".
+    """
+    inflight = UPSTREAM_INFLIGHT.labels(upstream)
+    inflight.inc()
+    started = time.perf_counter()
+    status: object = "error"
+    try:
+        r = await client.get(url, **kwargs)
+        status = r.status_code
+        return r
+    finally:
+        inflight.dec()
+        UPSTREAM_SECONDS.observe(time.perf_counter() - started, upstream, endpoint, status)
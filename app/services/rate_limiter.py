@@ -0,0 +1,218 @@
+# app/services/rate_limiter.py
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Mapping, Optional
+
+# Prioridades: menor = atende primeiro
+PRIORITY_INTERACTIVE = 0   # rotas de um único mint
+PRIORITY_BULK = 10         # fan-outs do /signals
+
+_priority: ContextVar[int] = ContextVar("upstream_priority", default=PRIORITY_INTERACTIVE)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Define a prioridade das chamadas upstream feitas dentro do bloco (propaga p/ tasks filhas)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def bulk_priority():
+    return request_priority(PRIORITY_BULK)
+
+
+def raise_priority(priority: int) -> None:
+    """Sobe (nunca desce) a prioridade no contexto atual; ex.: chamada coalescida que ganhou um chamador interativo."""
+    if priority < _priority.get():
+        _priority.set(priority)
+
+
+def parse_kv_floats(raw: str) -> Dict[str, float]:
+    """Converte "/a=2,/b=0.5" em {"/a": 2.0, "/b": 0.5} (formato das variáveis de ambiente)."""
+    out: Dict[str, float] = {}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        k, v = part.split("=", 1)
+        try:
+            out[k.strip()] = float(v)
+        except ValueError:
+            continue
+    return out
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """Lê Retry-After (segundos ou data HTTP). None se ausente/inválido."""
+    raw = headers.get("retry-after")
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(raw).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket assíncrono com fila de prioridade.
+    - `rate` tokens/s repostos continuamente, até `capacity` (burst)
+    - `acquire(cost)` espera a vez: prioridade menor sai primeiro, FIFO dentro da mesma prioridade
+    - `pause_for(s)` congela o bucket (ex.: Retry-After / quota zerada no upstream)
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = max(1e-6, float(rate))
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: List[list] = []   # [priority, seq, cost, future]
+        self._seq = itertools.count()
+        self._pump_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    # --- estado ---
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for w in self._waiters if not w[3].done())
+
+    def pause_for(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        # Após a pausa o upstream reabre a janela; não deixamos acumular burst "fantasma"
+        self._refill(now)
+        self._tokens = min(self._tokens, 0.0)
+        self._kick()
+
+    # --- aquisição ---
+    async def acquire(self, cost: float = 1.0, priority: Optional[int] = None) -> None:
+        prio = current_priority() if priority is None else priority
+        loop = asyncio.get_running_loop()
+
+        # Caminho rápido: ninguém na fila, sem pausa e com saldo
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and now >= self._paused_until and self._tokens >= cost:
+            self._tokens -= cost
+            return
+
+        fut = loop.create_future()
+        heapq.heappush(self._waiters, [prio, next(self._seq), float(cost), fut])
+        self._kick()
+        await fut  # cancelamento: o pump descarta futures já canceladas
+
+    def _kick(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._pump_task is None or self._pump_task.done() or self._pump_task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._pump_task = loop.create_task(self._pump())
+        elif self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _pump(self) -> None:
+        while True:
+            while self._waiters and self._waiters[0][3].done():
+                heapq.heappop(self._waiters)
+            if not self._waiters:
+                return
+
+            now = time.monotonic()
+            self._refill(now)
+            cost = min(self._waiters[0][2], self.capacity)
+
+            if now < self._paused_until:
+                wait = self._paused_until - now
+            elif self._tokens >= cost:
+                _, _, _, fut = heapq.heappop(self._waiters)
+                self._tokens -= cost
+                fut.set_result(None)
+                continue
+            else:
+                wait = (cost - self._tokens) / self.rate
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+
+class EndpointRateLimiter:
+    """
+    Limiter por plano: um bucket global (RPS da conta) + buckets próprios para endpoints
+    com limite específico. Cada endpoint pode ter um peso (tokens consumidos por chamada).
+    """
+
+    def __init__(
+        self,
+        rps: float,
+        burst: Optional[float] = None,
+        endpoint_rps: Optional[Dict[str, float]] = None,
+        endpoint_weights: Optional[Dict[str, float]] = None,
+    ):
+        self.global_bucket = AsyncTokenBucket(rps, burst)
+        self.buckets: Dict[str, AsyncTokenBucket] = {
+            path: AsyncTokenBucket(r) for path, r in (endpoint_rps or {}).items()
+        }
+        self.weights: Dict[str, float] = dict(endpoint_weights or {})
+
+    async def acquire(self, path: str, priority: Optional[int] = None) -> None:
+        weight = self.weights.get(path, 1.0)
+        bucket = self.buckets.get(path)
+        if bucket is not None:
+            await bucket.acquire(1.0, priority)
+        await self.global_bucket.acquire(weight, priority)
+
+    def pause_for(self, seconds: float, path: Optional[str] = None) -> None:
+        bucket = self.buckets.get(path) if path else None
+        (bucket or self.global_bucket).pause_for(seconds)
+
+    def observe_headers(self, headers: Mapping[str, str], path: Optional[str] = None) -> None:
+        """
+        Honra x-ratelimit-remaining/x-ratelimit-reset: se a quota zerou, pausa até o reset.
+        O reset pode vir em segundos relativos ou epoch.
+        """
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is None:
+            return
+        try:
+            if float(remaining) > 0:
+                return
+            reset = float(headers.get("x-ratelimit-reset") or 1.0)
+        except ValueError:
+            return
+        if reset > 1e9:
+            reset = reset - time.time()
+        self.pause_for(min(max(reset, 0.0), 60.0), path)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "rps": self.global_bucket.rate,
+            "queued": self.global_bucket.queued,
+            "endpoints": {p: {"rps": b.rate, "queued": b.queued} for p, b in self.buckets.items()},
+        }
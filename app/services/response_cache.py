@@ -0,0 +1,145 @@
+# app/services/response_cache.py
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+from app.core import deadline
+
+# fetch() devolve (valor, tamanho_aproximado_em_bytes)
+Fetcher = Callable[[], Awaitable[Tuple[Any, int]]]
+
+
+def cache_key(path: str, params: Optional[Mapping[str, Any]] = None) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    """Chave estável: (path, params ordenados e convertidos p/ str)."""
+    items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return path, items
+
+
+class _Entry:
+    __slots__ = ("value", "size", "fresh_until", "stale_until")
+
+    def __init__(self, value: Any, size: int, fresh_until: float, stale_until: float):
+        self.value = value
+        self.size = size
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class TTLCache:
+    """
+    Cache em memória com:
+    - TTL por entrada (definido por quem chama, ex.: por endpoint)
+    - LRU limitado por orçamento de bytes
+    - stale-while-revalidate: dentro da janela 'stale' devolve o valor antigo
+      e dispara um refresh em background (um por chave)
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.refresh_errors = 0
+
+    # --- armazenamento ---
+    def _drop(self, key: Hashable) -> None:
+        e = self._data.pop(key, None)
+        if e is not None:
+            self._bytes -= e.size
+
+    def set(self, key: Hashable, value: Any, size: int, ttl: float, stale_ttl: float = 0.0) -> None:
+        size = max(1, int(size))
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        now = time.monotonic()
+        self._data[key] = _Entry(value, size, now + ttl, now + ttl + max(0.0, stale_ttl))
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._data:
+            old_key, old = self._data.popitem(last=False)
+            self._bytes -= old.size
+            self.evictions += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Só devolve valores frescos (sem SWR)."""
+        e = self._data.get(key)
+        if e is None or time.monotonic() >= e.fresh_until:
+            return None
+        self._data.move_to_end(key)
+        return e.value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    # --- leitura com fetch ---
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Fetcher,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        revalidate: bool = True,
+    ) -> Any:
+        """
+        revalidate=False: `fetch` não sobrevive a quem chama (ex.: cliente fechado no fim
+        do request), então não dá para refrescar em background — valor stale conta como miss.
+        """
+        e = self._data.get(key)
+        now = time.monotonic()
+
+        if e is not None:
+            if now < e.fresh_until:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return e.value
+            if now >= e.stale_until:
+                self._drop(key)
+            elif revalidate:
+                self.stale_hits += 1
+                self._data.move_to_end(key)
+                self._schedule_refresh(key, fetch, ttl, stale_ttl)
+                return e.value
+
+        self.misses += 1
+        value, size = await fetch()
+        self.set(key, value, size, ttl, stale_ttl)
+        return value
+
+    def _schedule_refresh(self, key: Hashable, fetch: Fetcher, ttl: float, stale_ttl: float) -> None:
+        if key in self._refreshing:
+            return
+
+        async def _refresh():
+            try:
+                value, size = await fetch()
+                self.set(key, value, size, ttl, stale_ttl)
+            except Exception:
+                # Mantém o valor antigo até expirar a janela stale
+                self.refresh_errors += 1
+            finally:
+                self._refreshing.pop(key, None)
+
+        # O refresh não é do request que o disparou: roda sem o prazo dele
+        self._refreshing[key] = asyncio.get_running_loop().create_task(
+            _refresh(), context=deadline.detached_context()
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "refresh_errors": self.refresh_errors,
+        }
@@ -0,0 +1,97 @@
+# app/services/singleflight.py
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.core import deadline
+from app.core.timing import detach_timings
+from app.services.rate_limiter import current_priority, raise_priority
+
+
+class _Call:
+    __slots__ = ("task", "context", "waiters", "abandoned")
+
+    def __init__(self, task: asyncio.Task, context: contextvars.Context):
+        self.task = task
+        self.context = context
+        self.waiters = 0
+        self.abandoned = False
+
+
+def _flight_context() -> contextvars.Context:
+    # Cópia do contexto de quem dispara, sem o Server-Timing daquele request
+    ctx = contextvars.copy_context()
+    ctx.run(detach_timings)
+    return ctx
+
+
+def _join(at: Optional[float], priority: int) -> None:
+    # Roda no contexto da chamada: prazo do chamador mais paciente, prioridade do mais urgente
+    deadline.widen(at)
+    raise_priority(priority)
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    # Evita "Task exception was never retrieved" quando todos os chamadores já saíram
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """
+    Coalesce chamadas idênticas em voo: chamadores concorrentes com a mesma chave
+    aguardam UMA única execução de `fn` e recebem o mesmo resultado (ou exceção).
+
+    - Cancelar um chamador não cancela a chamada compartilhada enquanto houver outros
+      esperando; se todos desistirem, a chamada upstream é cancelada.
+    - Terminada a chamada, a chave é liberada (não é cache).
+    - A chamada roda numa cópia do contexto de quem chegou primeiro, sem o
+      Server-Timing daquele request (a chamada é de todos). Quem entra depois estende
+      o prazo da chamada até o próprio (sem prazo vence) e sobe a prioridade upstream
+      se for mais urgente; vale a partir do próximo retry/acquire.
+      Cada chamador espera no máximo até o próprio prazo (DeadlineExceeded) e isso
+      conta como desistência.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None or call.abandoned or call.task.get_loop() is not asyncio.get_running_loop():
+            ctx = _flight_context()
+            task = asyncio.get_running_loop().create_task(fn(), context=ctx)
+            call = _Call(task, ctx)
+            self._calls[key] = call
+            self.started += 1
+
+            def _release(t: asyncio.Task, key=key, call=call) -> None:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                _consume_exception(t)
+
+            task.add_done_callback(_release)
+        else:
+            self.coalesced += 1
+            # Chamada suspensa (quem roda agora é este chamador): dá para mexer no contexto dela
+            call.context.run(_join, deadline.current(), current_priority())
+
+        call.waiters += 1
+        try:
+            return await deadline.wait(asyncio.shield(call.task))
+        except (asyncio.CancelledError, deadline.DeadlineExceeded):
+            if call.waiters == 1 and not call.task.done():
+                call.abandoned = True
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"started": self.started, "coalesced": self.coalesced, "in_flight": self.in_flight}
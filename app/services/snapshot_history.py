@@ -0,0 +1,153 @@
+# app/services/snapshot_history.py
+import os
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.database.db import DB_PATH, SnapshotStore
+from app.core.log import get_logger
+
+log = get_logger(__name__)
+
+# Histórico de snapshots enriquecidos (SQLite), gravado em lote fora do caminho do request
+SNAPSHOT_HISTORY = os.getenv("SNAPSHOT_HISTORY", "true").lower() == "true"
+SNAPSHOT_HISTORY_BATCH = int(os.getenv("SNAPSHOT_HISTORY_BATCH", "500"))
+SNAPSHOT_HISTORY_FLUSH_SECONDS = float(os.getenv("SNAPSHOT_HISTORY_FLUSH_SECONDS", "0.5"))
+SNAPSHOT_HISTORY_QUEUE = int(os.getenv("SNAPSHOT_HISTORY_QUEUE", "20000"))
+SNAPSHOT_HISTORY_RETENTION_DAYS = float(os.getenv("SNAPSHOT_HISTORY_RETENTION_DAYS", "7"))
+
+
+class SnapshotWriter:
+    """
+    Escritor assíncrono: `record()` só enfileira (O(1), sem I/O); uma task drena a fila
+    em lotes de até `batch_size` (ou a cada `flush_interval`) e grava com executemany
+    numa thread. Fila cheia descarta (histórico é best-effort, o request não espera).
+    """
+
+    def __init__(
+        self,
+        store_factory=lambda: SnapshotStore(DB_PATH),
+        batch_size: int = SNAPSHOT_HISTORY_BATCH,
+        flush_interval: float = SNAPSHOT_HISTORY_FLUSH_SECONDS,
+        max_queue: int = SNAPSHOT_HISTORY_QUEUE,
+        retention_days: float = SNAPSHOT_HISTORY_RETENTION_DAYS,
+    ):
+        self._store_factory = store_factory
+        self._store: Optional[SnapshotStore] = None
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.retention_days = retention_days
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_purge = float("-inf")  # 1º lote já expurga (não depende do uptime)
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+    @property
+    def store(self) -> Optional[SnapshotStore]:
+        if self._store is None:
+            try:
+                self._store = self._store_factory()
+            except Exception as e:
+                log.warning("Histórico de snapshots indisponível", stage="snapshot_history", path=DB_PATH, error=str(e))
+                return None
+        return self._store
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def record(self, snapshot: Dict[str, Any], ts: Optional[float] = None) -> bool:
+        """Enfileira o snapshot; False se o escritor não está rodando ou a fila está cheia."""
+        if not self.running or not snapshot or not snapshot.get("tokenAddress"):
+            return False
+        if self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+            return False
+        self._queue.put_nowait((snapshot["tokenAddress"], ts if ts is not None else time.time(), snapshot))
+        return True
+
+    def record_many(self, snapshots: List[Optional[Dict[str, Any]]]) -> None:
+        ts = time.time()
+        for snap in snapshots:
+            if snap:
+                self.record(snap, ts)
+
+    async def _drain(self, first) -> Tuple[List[tuple], bool]:
+        """Junta até batch_size itens (ou até flush_interval). Retorna (lote, achou_sentinela)."""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _flush(self, batch: List[tuple]) -> None:
+        store = self.store
+        if store is None:
+            self.dropped += len(batch)
+            return
+        try:
+            self.written += await asyncio.to_thread(store.put_many, batch)
+        except Exception as e:
+            self.write_errors += 1
+            log.error("Falha ao gravar snapshots", stage="snapshot_history", batch=len(batch), error=str(e))
+        if self.retention_days and time.monotonic() - self._last_purge > 3600:
+            self._last_purge = time.monotonic()
+            try:
+                await asyncio.to_thread(store.purge_older_than, time.time() - self.retention_days * 86_400)
+            except Exception as e:
+                log.warning("Falha ao expurgar histórico", stage="snapshot_history", error=str(e))
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch, stop = await self._drain(first)
+            await self._flush(batch)
+            if stop:
+                return
+
+    def start(self) -> None:
+        if self.running:
+            return
+        # +1 de folga para a sentinela de parada
+        self._queue = asyncio.Queue(maxsize=self.max_queue + 1)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Grava o que ainda estiver na fila e encerra a task."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        await self._queue.put(None)
+        try:
+            await task
+        except Exception as e:
+            log.error("Escritor de snapshots terminou com erro", stage="snapshot_history", error=str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+        }
+
+
+SNAPSHOT_WRITER = SnapshotWriter()
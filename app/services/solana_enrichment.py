@@ -0,0 +1,305 @@
+# app/services/solana_enrichment.py
+import os
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.services.solscan_client import SolscanClient
+from app.services.birdeye_client import BirdeyeClient, BirdeyeAuthOrPlanError
+from app.services.snapshot_history import SNAPSHOT_WRITER
+from app.utils.solana_normalizer import (
+    normalize_solscan_meta_to_snapshot,
+    merge_birdeye_into_snapshot,
+)
+from app.utils.rolling_volume import WINDOW_POINTS, VolumeWindow
+from app.core import deadline
+from app.core.log import get_logger
+from app.core.metrics import STAGE_ENRICH, STAGE_MERGE, STAGE_NORMALIZE
+from app.core.timing import stage, timed
+
+log = get_logger(__name__)
+
+# Quantos mints são enriquecidos em paralelo (fan-out limitado)
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "8"))
+
+
+OverviewResult = Tuple[Dict[str, Any], bool]
+
+# Overview/price do /signals via endpoints em lote (multi-address) antes do fallback por mint
+ENRICH_BATCH_OVERVIEW = os.getenv("ENRICH_BATCH_OVERVIEW", "true").lower() == "true"
+
+
+async def _overview_for(
+    be: BirdeyeClient,
+    mint: str,
+    batch: Optional["asyncio.Future[Dict[str, OverviewResult]]"] = None,
+) -> OverviewResult:
+    """Usa o resultado do lote quando ele trouxe o mint; senão, overview_with_fallback por mint."""
+    if batch is not None:
+        try:
+            found = (await asyncio.shield(batch)).get(mint)
+        except Exception:
+            found = None
+        if found is not None:
+            return found
+    return await be.overview_with_fallback(mint)
+
+
+async def fetch_birdeye_bundle(
+    be: BirdeyeClient,
+    mint: str,
+    *,
+    overview_batch: Optional["asyncio.Future[Dict[str, OverviewResult]]"] = None,
+    volume_limit: int = WINDOW_POINTS,
+) -> Tuple[Dict[str, Any], bool, Dict[str, Any], Dict[str, Any]]:
+    """
+    Dispara overview (com fallback), volume points (5m) e trades recentes em paralelo.
+    Retorna: (overview, usou_fallback, volume, trades5m)
+    `volume_limit`: quantos pontos de 5m pedir (menos que 12 na busca incremental).
+
+    Semântica igual à versão sequencial:
+    - erro no overview propaga (o mint falha)
+    - 401/403 em volume/trades vira payload vazio; outros erros propagam
+    """
+    ov_res, vol_res, tr_res = await asyncio.gather(
+        timed("birdeye_overview", _overview_for(be, mint, overview_batch)),
+        timed("birdeye_volume", be.token_volume_points(mint, interval="5m", limit=volume_limit)),
+        timed("birdeye_trades", be.token_trades_recent(mint, limit=100)),
+        return_exceptions=True,
+    )
+
+    if isinstance(ov_res, BaseException):
+        raise ov_res
+    overview, used_fallback = ov_res
+
+    if isinstance(vol_res, BirdeyeAuthOrPlanError):
+        volume = {"data": {"points": []}}
+    elif isinstance(vol_res, BaseException):
+        raise vol_res
+    else:
+        volume = vol_res
+
+    if isinstance(tr_res, BirdeyeAuthOrPlanError):
+        trades5m = {"data": {}}
+    elif isinstance(tr_res, BaseException):
+        raise tr_res
+    else:
+        trades5m = tr_res
+
+    return overview, used_fallback, volume, trades5m
+
+
+async def enrich_mint(
+    sol: SolscanClient,
+    be: BirdeyeClient,
+    mint: str,
+    *,
+    overview_batch: Optional["asyncio.Future[Dict[str, OverviewResult]]"] = None,
+    volume_window: Optional[VolumeWindow] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Solscan meta -> snapshot normalizado -> merge Birdeye (score/flags/classificação).
+    Retorna None se a Solscan não devolver meta para o mint.
+
+    Com `volume_window` (mints vigiados), só os pontos de 5m novos são pedidos ao
+    Birdeye; a janela guarda o resto e entrega as somas 5m/15m/1h prontas.
+    """
+    with stage("solscan"):
+        meta = await sol.token_meta(mint)
+    if not meta:
+        log.sample("Sem meta na Solscan", mint=mint, stage="solscan")
+        return None
+
+    t0 = time.perf_counter()
+    snap = normalize_solscan_meta_to_snapshot(meta, mint)
+    STAGE_NORMALIZE.observe(time.perf_counter() - t0)
+    volume_limit = WINDOW_POINTS
+    if volume_window is not None:
+        volume_limit = volume_window.points_needed()
+        if volume_limit >= volume_window.capacity:
+            volume_window.clear()  # janela inteira velha: recomeça
+    overview, used_fallback, volume, trades5m = await fetch_birdeye_bundle(
+        be, mint, overview_batch=overview_batch, volume_limit=volume_limit
+    )
+    if volume_window is not None:
+        volume_window.extend(((volume or {}).get("data") or {}).get("points") or [])
+
+    t0 = time.perf_counter()
+    snap = merge_birdeye_into_snapshot(snap, overview, volume, trades5m, window=volume_window)
+    STAGE_MERGE.observe(time.perf_counter() - t0)
+    snap["birdeyeFallbackFromOverview"] = used_fallback
+    return snap
+
+
+def _birdeye_error_status(e: BaseException) -> str:
+    return "unauthorized" if isinstance(e, BirdeyeAuthOrPlanError) else f"error: {type(e).__name__}"
+
+
+async def enrich_mint_with_status(
+    sol: SolscanClient,
+    be: BirdeyeClient,
+    mint: str,
+    *,
+    overview_batch: Optional["asyncio.Future[Dict[str, OverviewResult]]"] = None,
+    volume_window: Optional[VolumeWindow] = None,
+) -> Dict[str, Any]:
+    """
+    Pipeline da rota /solana/snapshot_enriched (e da watchlist, que serve a mesma resposta).
+    Diferente do enrich_mint, nunca falha por upstream:
+    - sem meta na Solscan -> snapshot só com o Birdeye e solscanLimitedPlan=True;
+      erro na Solscan -> solscanError
+    - cada chamada Birdeye reporta em birdeyeStatus (ok/fallback/unauthorized/error);
+      as que falharam entram vazias no merge
+    """
+    try:
+        with stage("solscan"):
+            meta = await sol.token_meta(mint)
+        snapshot = normalize_solscan_meta_to_snapshot(meta or {}, mint)
+        if not meta:
+            snapshot["solscanLimitedPlan"] = True
+    except Exception as e:
+        log.warning("Solscan meta falhou", mint=mint, stage="solscan", error=str(e))
+        snapshot = normalize_solscan_meta_to_snapshot({}, mint)
+        snapshot["solscanError"] = str(e)
+
+    volume_limit = WINDOW_POINTS
+    if volume_window is not None:
+        volume_limit = volume_window.points_needed()
+        if volume_limit >= volume_window.capacity:
+            volume_window.clear()
+    ov_res, vol_res, tr_res = await asyncio.gather(
+        timed("birdeye_overview", _overview_for(be, mint, overview_batch)),
+        timed("birdeye_volume", be.token_volume_points(mint, interval="5m", limit=volume_limit)),
+        timed("birdeye_trades", be.token_trades_recent(mint, limit=100)),
+        return_exceptions=True,
+    )
+    status: Dict[str, Any] = {}
+
+    if isinstance(ov_res, BaseException):
+        overview = {}
+        status["overview"] = (f"unauthorized: {ov_res}" if isinstance(ov_res, BirdeyeAuthOrPlanError)
+                              else _birdeye_error_status(ov_res))
+    else:
+        overview, used_fallback = ov_res
+        snapshot["birdeyeFallbackFromOverview"] = used_fallback
+        status["overview"] = "fallback" if used_fallback else "ok"
+
+    if isinstance(vol_res, BaseException):
+        volume = {"data": {"points": []}}
+        status["volume"] = _birdeye_error_status(vol_res)
+    else:
+        volume = vol_res
+        status["volume"] = "ok"
+        if volume_window is not None:
+            volume_window.extend(((volume or {}).get("data") or {}).get("points") or [])
+
+    if isinstance(tr_res, BaseException):
+        trades5m = {"data": {}}
+        status["trades"] = _birdeye_error_status(tr_res)
+    else:
+        trades5m = tr_res
+        status["trades"] = "ok"
+
+    t0 = time.perf_counter()
+    snapshot = merge_birdeye_into_snapshot(snapshot, overview, volume, trades5m, window=volume_window)
+    STAGE_MERGE.observe(time.perf_counter() - t0)
+    snapshot["birdeyeStatus"] = status
+    return snapshot
+
+
+def start_overview_batch(be: BirdeyeClient, mints: List[str], enabled: bool):
+    """Overview/price de todos os `mints` em lote, em background (None se desligado ou 1 mint só)."""
+    if not enabled or len(mints) <= 1:
+        return None
+    batch = asyncio.ensure_future(be.overview_many_with_fallback(mints))
+    batch.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return batch
+
+
+async def enrich_mints(
+    sol: SolscanClient,
+    be: BirdeyeClient,
+    mints: List[str],
+    *,
+    concurrency: int = ENRICH_CONCURRENCY,
+    batch_overview: bool = ENRICH_BATCH_OVERVIEW,
+    volume_windows: Optional[Dict[str, VolumeWindow]] = None,
+    pending: Any = None,
+) -> List[Any]:
+    """
+    Enriquece vários mints em paralelo, com no máximo `concurrency` em voo.
+    A saída segue a ordem de entrada; mints que falharam (ou sem meta) viram None.
+    Com prazo no request (app.core.deadline), mints não concluídos a tempo ficam com
+    `pending` (padrão None, igual a falha) para a rota marcá-los como parciais.
+
+    Com `batch_overview`, o estágio overview/price sai em poucas chamadas multi-address
+    (rodando junto com as metas da Solscan); mints fora do lote usam o caminho por mint.
+    """
+    out: List[Any] = [pending] * len(mints)
+    async for idx, _, snap in iter_enriched(
+        sol, be, mints, concurrency=concurrency, batch_overview=batch_overview, volume_windows=volume_windows
+    ):
+        out[idx] = snap
+    return out
+
+
+async def iter_enriched(
+    sol: SolscanClient,
+    be: BirdeyeClient,
+    mints: List[str],
+    *,
+    concurrency: int = ENRICH_CONCURRENCY,
+    batch_overview: bool = ENRICH_BATCH_OVERVIEW,
+    volume_windows: Optional[Dict[str, VolumeWindow]] = None,
+) -> AsyncIterator[Tuple[int, str, Optional[Dict[str, Any]]]]:
+    """
+    Mesmo pipeline do enrich_mints, mas entrega (índice, mint, snapshot|None) na ordem
+    em que cada mint fica pronto (para respostas em streaming).
+    Fechar o iterador cancela o que ainda estiver em voo.
+    Com prazo no request, para de entregar quando ele acaba: mints cortados pelo
+    prazo (em voo ou ainda na fila) não aparecem na saída.
+    Cada snapshot pronto é enfileirado no histórico (SNAPSHOT_WRITER), sem bloquear.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+    batch = start_overview_batch(be, mints, batch_overview)
+
+    async def _one(idx: int, mint: str) -> Tuple[int, str, Optional[Dict[str, Any]]]:
+        async with sem:
+            started = time.perf_counter()
+            try:
+                deadline.check(mint)
+                window = volume_windows.get(mint) if volume_windows is not None else None
+                snap = await enrich_mint(sol, be, mint, overview_batch=batch, volume_window=window)
+            except deadline.DeadlineExceeded:
+                raise
+            except Exception as e:
+                log.warning("Falha ao processar mint", mint=mint, stage="enrich", error=str(e))
+                return idx, mint, None
+            elapsed = time.perf_counter() - started
+            STAGE_ENRICH.observe(elapsed)
+            log.sample("Mint enriquecido", mint=mint, stage="enrich", ok=bool(snap),
+                       duration_ms=round(elapsed * 1000, 2))
+            if snap:
+                SNAPSHOT_WRITER.record(snap)
+            return idx, mint, snap
+
+    tasks = [asyncio.ensure_future(_one(i, m)) for i, m in enumerate(mints)]
+    try:
+        for fut in asyncio.as_completed(tasks, timeout=deadline.remaining()):
+            try:
+                res = await fut
+            except deadline.DeadlineExceeded:
+                continue
+            yield res
+    except asyncio.TimeoutError:
+        # Prazo do request acabou com mints ainda em voo: entrega só o que ficou pronto
+        cut = sum(1 for t in tasks if not t.done())
+        log.warning("Prazo esgotado no enriquecimento", stage="enrich", pending=cut, total=len(tasks))
+    finally:
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+            elif not t.cancelled():
+                t.exception()  # cortados pelo prazo: evita "exception was never retrieved"
+        if batch is not None and not batch.done():
+            batch.cancel()
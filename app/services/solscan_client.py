@@ -1,13 +1,62 @@
 # app/services/solscan_client.py
 import os
+import time
 from typing import Optional, Tuple, Dict, Any
 import httpx
 
+from app.database.db import DB_PATH, TokenMetaStore
+from app.core.metrics import FALLBACKS, SOLSCAN_META_SECONDS
+from app.core import deadline
+from app.services.http_pool import new_async_client, timed_get
+from app.services.singleflight import SingleFlight
+from app.core.log import get_logger
+
+log = get_logger(__name__)
+
 SOLSCAN_API_KEY = os.getenv("SOLSCAN_API_KEY", "")
 SOLSCAN_BASE = os.getenv("SOLSCAN_BASE", "https://pro-api.solscan.io").rstrip("/")
 DRY_RUN = os.getenv("DRY_RUN", "true").lower() == "true"
 TIMEOUT = float(os.getenv("TIMEOUT", "15"))
 
+# token_meta concorrente para o mesmo mint -> um único request upstream
+# (entre rotas só no cliente compartilhado; ver BirdeyeClient)
+SOLSCAN_FLIGHTS = SingleFlight()
+
+# Cache persistente de meta (muda quase nunca): ~1 fetch por mint por dia
+SOLSCAN_META_CACHE = os.getenv("SOLSCAN_META_CACHE", "true").lower() == "true"
+SOLSCAN_META_TTL = float(os.getenv("SOLSCAN_META_TTL", "86400"))
+SOLSCAN_META_NEGATIVE_TTL = float(os.getenv("SOLSCAN_META_NEGATIVE_TTL", "3600"))
+# De quanto em quanto tempo reavaliar a versão da API memorizada (ex.: upgrade de plano)
+SOLSCAN_VERSION_RECHECK = float(os.getenv("SOLSCAN_VERSION_RECHECK", "21600"))
+
+_META_STORE: Optional[TokenMetaStore] = None
+_META_VERSION: Dict[str, Tuple[str, float]] = {}   # api key -> (versão | "none", quando)
+
+
+def _meta_store() -> Optional[TokenMetaStore]:
+    global _META_STORE, SOLSCAN_META_CACHE
+    if not SOLSCAN_META_CACHE:
+        return None
+    if _META_STORE is None:
+        try:
+            _META_STORE = TokenMetaStore(DB_PATH, ttl=SOLSCAN_META_TTL, negative_ttl=SOLSCAN_META_NEGATIVE_TTL)
+        except Exception as e:
+            log.warning("Cache de meta desabilitado", stage="meta_cache", path=DB_PATH, error=str(e))
+            SOLSCAN_META_CACHE = False
+            return None
+    return _META_STORE
+
+
+def _preferred_meta_version() -> Optional[str]:
+    entry = _META_VERSION.get(SOLSCAN_API_KEY)
+    if entry and time.time() - entry[1] < SOLSCAN_VERSION_RECHECK:
+        return entry[0]
+    return None
+
+
+def _remember_meta_version(version: str) -> None:
+    _META_VERSION[SOLSCAN_API_KEY] = (version, time.time())
+
 def _unwrap(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Se vier no formato {"success":true,"data":{...}}, retorna só o 'data'."""
     if isinstance(payload, dict) and isinstance(payload.get("data"), dict):
@@ -15,12 +64,14 @@ def _unwrap(payload: Dict[str, Any]) -> Dict[str, Any]:
     return payload if isinstance(payload, dict) else {}
 
 class SolscanClient:
-    def __init__(self, timeout: Optional[float] = None):
+    def __init__(self, timeout: Optional[float] = None, shared: bool = False):
         headers = {"token": SOLSCAN_API_KEY} if SOLSCAN_API_KEY else {}
-        self._client: Optional[httpx.AsyncClient] = httpx.AsyncClient(
-            timeout=timeout or TIMEOUT,
+        self._timeout = timeout or TIMEOUT
+        self._client: Optional[httpx.AsyncClient] = new_async_client(
+            timeout=self._timeout,
             headers=headers
         )
+        self._flights = SOLSCAN_FLIGHTS if shared else SingleFlight()
 
     async def __aenter__(self):
         return self
@@ -36,8 +87,15 @@ class SolscanClient:
     async def _get_json(self, url: str, params: dict) -> Tuple[int, Dict[str, Any]]:
         if self._client is None:
             headers = {"token": SOLSCAN_API_KEY} if SOLSCAN_API_KEY else {}
-            self._client = httpx.AsyncClient(timeout=TIMEOUT, headers=headers)
-        r = await self._client.get(url, params=params)
+            self._client = new_async_client(timeout=self._timeout, headers=headers)
+        endpoint = url[len(SOLSCAN_BASE):] if url.startswith(SOLSCAN_BASE) else url
+        try:
+            r = await timed_get(self._client, "solscan", endpoint, url, params=params,
+                                timeout=deadline.cap(self._timeout, endpoint))
+        except httpx.TimeoutException as e:
+            if deadline.expired():
+                raise deadline.DeadlineExceeded(f"{endpoint} -> prazo do request esgotado") from e
+            raise
         status = r.status_code
         try:
             data = r.json() if r.text else {}
@@ -49,6 +107,43 @@ class SolscanClient:
         """
         Retorna SEMPRE um dict “plano” (sem wrapper) com meta do token.
         Se sua chave não tiver acesso (401/404), devolve {} em modo não-estrito.
+        Chamadas concorrentes para o mesmo mint compartilham o mesmo request.
+        Meta vem do cache persistente (SQLite) quando válido; ver SOLSCAN_META_TTL.
+        """
+        if DRY_RUN:
+            meta, _ = await self._fetch_token_meta_ex(mint, strict=strict)
+            return meta
+
+        store = _meta_store()
+        if store is not None and not strict:
+            try:
+                cached = await store.aget(mint)
+            except Exception as e:
+                log.warning("Cache de meta indisponível", mint=mint, stage="meta_cache", error=str(e))
+                cached = None
+            if cached is not None:
+                return cached
+
+        return await self._flights.do(
+            ("token_meta", mint, strict),
+            lambda: self._fetch_and_store_meta(mint, strict=strict),
+        )
+
+    async def _fetch_and_store_meta(self, mint: str, *, strict: bool = False) -> Dict[str, Any]:
+        meta, definitive = await self._fetch_token_meta_ex(mint, strict=strict)
+        store = _meta_store()
+        if store is not None and definitive:
+            try:
+                await store.aput(mint, meta)
+            except Exception as e:
+                log.warning("Falha ao gravar cache de meta", mint=mint, stage="meta_cache", error=str(e))
+        return meta
+
+    async def _fetch_token_meta_ex(self, mint: str, *, strict: bool = False) -> Tuple[Dict[str, Any], bool]:
+        """
+        Retorna (meta, definitivo). 'definitivo' = resposta que pode ir para o cache
+        (200, ou 404 numa versão com acesso); 5xx/timeouts não são cacheados.
+        401/403 é da chave, não do mint: memorizado por versão (_remember_meta_version).
         """
         if DRY_RUN:
             return {
@@ -59,27 +154,52 @@ class SolscanClient:
                 "created_time": 1723500000,
                 "mint_authority": None,
                 "freeze_authority": None,
-            }
-
-        # Tentativa v2.0
-        url_v2 = f"{SOLSCAN_BASE}/v2.0/token/meta"
-        status, raw = await self._get_json(url_v2, {"address": mint})
-        if status == 200:
-            return _unwrap(raw)
-        if status in (401, 404):
+            }, True
+
+        preferred = _preferred_meta_version()
+        if preferred == "none":
+            # Chave sem acesso a nenhuma versão (memorizado até o recheck): nem vai à rede
             if strict:
-                msg = (raw.get("error_message") if isinstance(raw, dict) else None) or str(status)
-                raise RuntimeError(f"Solscan v2.0 {status}: {msg}")
+                raise RuntimeError("Solscan: chave sem acesso ao token meta (memorizado)")
+            return {}, False
+
+        started = time.perf_counter()
+        path = "v1"
+        status = None
+        # Tentativa v2.0 (pulada se já sabemos que a chave só tem acesso à v1.0)
+        if preferred != "v1":
+            url_v2 = f"{SOLSCAN_BASE}/v2.0/token/meta"
+            status, raw = await self._get_json(url_v2, {"address": mint})
+            if status == 200:
+                _remember_meta_version("v2")
+                SOLSCAN_META_SECONDS.observe(time.perf_counter() - started, "v2")
+                return _unwrap(raw), True
+            if status in (401, 403):
+                # Chave sem acesso à v2.0: não paga mais esse round trip
+                _remember_meta_version("v1")
+            if status in (401, 404):
+                if strict:
+                    msg = (raw.get("error_message") if isinstance(raw, dict) else None) or str(status)
+                    raise RuntimeError(f"Solscan v2.0 {status}: {msg}")
+
+            path = "v2_then_v1"
+            FALLBACKS.inc("solscan", "meta_v2_to_v1")
 
         # Fallback v1.0
         url_v1 = f"{SOLSCAN_BASE}/v1.0/token/meta"
-        status2, raw2 = await self._get_json(url_v1, {"tokenAddress": mint})
+        try:
+            status2, raw2 = await self._get_json(url_v1, {"tokenAddress": mint})
+        finally:
+            SOLSCAN_META_SECONDS.observe(time.perf_counter() - started, path)
         if status2 == 200:
-            return _unwrap(raw2)
+            return _unwrap(raw2), True
+        if status2 in (401, 403) and status in (None, 401, 403):
+            # Nenhuma versão aceita a chave: memoriza para a chave, não como meta vazio do mint
+            _remember_meta_version("none")
         if status2 in (401, 404):
             if strict:
                 msg = (raw2.get("error_message") if isinstance(raw2, dict) else None) or str(status2)
                 raise RuntimeError(f"Solscan v1.0 {status2}: {msg}")
 
         # Sem acesso a nenhum meta -> retorna vazio (para o normalizer lidar)
-        return {}
+        return {}, status2 == 404 or status == 404
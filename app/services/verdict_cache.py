@@ -0,0 +1,124 @@
+# app/services/verdict_cache.py
+import os
+import json
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.database.db import DB_PATH, VerdictStore
+from app.core.log import get_logger
+
+log = get_logger(__name__)
+
+# Cache persistente de decisões do LLM (evita reenviar tokens que não mudaram)
+LLM_VERDICT_CACHE = os.getenv("LLM_VERDICT_CACHE", "true").lower() == "true"
+LLM_VERDICT_TTL = float(os.getenv("LLM_VERDICT_TTL", "21600"))
+# Materialidade: variação relativa a partir da qual o veredicto antigo não vale mais
+LLM_MATERIAL_LIQ_DELTA = float(os.getenv("LLM_MATERIAL_LIQ_DELTA", "0.25"))
+LLM_MATERIAL_VOL_DELTA = float(os.getenv("LLM_MATERIAL_VOL_DELTA", "0.5"))
+LLM_MATERIAL_FLAGS = os.getenv("LLM_MATERIAL_FLAGS", "true").lower() == "true"
+
+
+def verdict_key(compact: Dict[str, Any], fingerprint: str) -> str:
+    """Hash estável do payload compacto + impressão digital do prompt/modelo."""
+    raw = json.dumps(compact, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(f"{fingerprint}\n{raw}".encode("utf-8")).hexdigest()
+
+
+def _to_float(x) -> Optional[float]:
+    try:
+        return float(x) if x is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def token_metrics(token: Dict[str, Any]) -> Tuple[Optional[float], Optional[float], List[str]]:
+    """(liquidez, volume, flags) em formato Solana (snapshot) ou DexScreener (liquidity.usd / volume.h24)."""
+    liq = token.get("liquidityUSD")
+    if liq is None:
+        liq = (token.get("liquidity") or {}).get("usd") if isinstance(token.get("liquidity"), dict) else None
+    vol = token.get("volumeUSD_24h")
+    if vol is None:
+        vol = token.get("volumeUSD_1h")
+    if vol is None and isinstance(token.get("volume"), dict):
+        vol = token["volume"].get("h24")
+    flags = sorted(str(f) for f in (token.get("flags") or []))
+    return _to_float(liq), _to_float(vol), flags
+
+
+def _moved(old: Optional[float], new: Optional[float], delta: float) -> bool:
+    if old is None and new is None:
+        return False
+    if old is None or new is None:
+        return True
+    base = max(abs(old), 1e-9)
+    return abs(new - old) / base > delta
+
+
+def is_material_change(cached: Dict[str, Any], token: Dict[str, Any]) -> bool:
+    liq, vol, flags = token_metrics(token)
+    if _moved(cached.get("liquidity"), liq, LLM_MATERIAL_LIQ_DELTA):
+        return True
+    if _moved(cached.get("volume"), vol, LLM_MATERIAL_VOL_DELTA):
+        return True
+    if LLM_MATERIAL_FLAGS and sorted(cached.get("flags") or []) != flags:
+        return True
+    return False
+
+
+class VerdictCache:
+    """Camada sobre o VerdictStore: TTL + regras de materialidade + contadores."""
+
+    def __init__(self, store: VerdictStore):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.material_misses = 0
+
+    def lookup_many(self, entries: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        """entries = [(key, token)] -> veredicto reaproveitável ou None, na mesma ordem."""
+        out: List[Optional[Dict[str, Any]]] = []
+        for key, token in entries:
+            cached = self.store.get(key)
+            if cached is None:
+                self.misses += 1
+                out.append(None)
+            elif is_material_change(cached, token):
+                self.material_misses += 1
+                out.append(None)
+            else:
+                self.hits += 1
+                out.append(dict(cached["verdict"]))
+        return out
+
+    def save_many(self, entries: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> None:
+        """entries = [(key, token, verdict)]"""
+        for key, token, verdict in entries:
+            liq, vol, flags = token_metrics(token)
+            self.store.put(key, token.get("tokenAddress"), verdict, liq, vol, flags)
+
+    async def alookup_many(self, entries):
+        return await asyncio.to_thread(self.lookup_many, entries)
+
+    async def asave_many(self, entries) -> None:
+        await asyncio.to_thread(self.save_many, entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "material_misses": self.material_misses}
+
+
+_CACHE: Optional[VerdictCache] = None
+
+
+def get_verdict_cache() -> Optional[VerdictCache]:
+    global _CACHE, LLM_VERDICT_CACHE
+    if not LLM_VERDICT_CACHE:
+        return None
+    if _CACHE is None:
+        try:
+            _CACHE = VerdictCache(VerdictStore(DB_PATH, ttl=LLM_VERDICT_TTL))
+        except Exception as e:
+            log.warning("Cache de veredictos desabilitado", stage="verdict_cache", path=DB_PATH, error=str(e))
+            LLM_VERDICT_CACHE = False
+            return None
+    return _CACHE
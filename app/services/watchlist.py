@@ -0,0 +1,253 @@
+# app/services/watchlist.py
+import os
+import time
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+
+from app.services.solscan_client import SolscanClient
+from app.services.birdeye_client import BirdeyeClient
+from app.services.rate_limiter import bulk_priority
+from app.services.snapshot_history import SNAPSHOT_WRITER
+from app.services.solana_enrichment import (
+    ENRICH_BATCH_OVERVIEW,
+    ENRICH_CONCURRENCY,
+    enrich_mint_with_status,
+    start_overview_batch,
+)
+from app.models.snapshot import snapshot_to_dict
+from app.utils.rolling_volume import VolumeWindow
+from app.core.log import get_logger
+
+log = get_logger(__name__)
+
+# Mints vigiados são reenriquecidos em background; leituras saem da memória.
+WATCHLIST_ENABLED = os.getenv("WATCHLIST_ENABLED", "true").lower() == "true"
+WATCHLIST_REFRESH_SECONDS = float(os.getenv("WATCHLIST_REFRESH_SECONDS", "30"))
+WATCHLIST_MAX_MINTS = int(os.getenv("WATCHLIST_MAX_MINTS", "500"))
+# Snapshot mais velho que isso não é servido (refresher parado/falhando) -> rota busca ao vivo
+WATCHLIST_MAX_STALENESS = float(os.getenv("WATCHLIST_MAX_STALENESS", str(WATCHLIST_REFRESH_SECONDS * 4)))
+# Mints vigiados desde o boot (separados por vírgula)
+WATCHLIST_MINTS = [m.strip() for m in os.getenv("WATCHLIST_MINTS", "").split(",") if m.strip()]
+
+
+class WatchlistFullError(Exception):
+    pass
+
+
+class _Entry:
+    __slots__ = ("snapshot", "updated_at", "last_attempt", "last_error", "added_at", "window")
+
+    def __init__(self):
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.updated_at: Optional[float] = None   # epoch do último snapshot bom
+        self.last_attempt: Optional[float] = None  # monotonic da última tentativa
+        self.last_error: Optional[str] = None
+        self.added_at = time.time()
+        self.window = VolumeWindow()  # pontos de 5m: refresh busca só os novos
+
+
+class Watchlist:
+    """
+    Store em memória do último snapshot enriquecido por mint + refresher asyncio.
+
+    - Cada mint é reenriquecido a cada `interval` segundos pelo mesmo pipeline da rota
+      /solana/snapshot_enriched (enrich_mint_with_status): mesmo corpo, com birdeyeStatus,
+      e mints sem meta na Solscan também são servidos (solscanLimitedPlan).
+    - Mints recém-adicionados entram na próxima volta imediatamente (sem esperar o intervalo).
+    - Falha num refresh (exceção ou overview do Birdeye com erro) mantém o snapshot anterior
+      e registra o erro; sem snapshot anterior, guarda o que veio, como a rota ao vivo faria.
+    - Volume: cada mint tem uma VolumeWindow; o refresh pede só os pontos de 5m novos.
+    Carga upstream cresce com o tamanho da watchlist, não com o número de leitores.
+    """
+
+    def __init__(
+        self,
+        interval: float = WATCHLIST_REFRESH_SECONDS,
+        max_mints: int = WATCHLIST_MAX_MINTS,
+        max_staleness: float = WATCHLIST_MAX_STALENESS,
+        concurrency: int = ENRICH_CONCURRENCY,
+    ):
+        self.interval = max(1.0, float(interval))
+        self.max_mints = max_mints
+        self.max_staleness = max_staleness
+        self.concurrency = concurrency
+        self._entries: Dict[str, _Entry] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    # --- gerenciamento ---
+    def __contains__(self, mint: str) -> bool:
+        return mint in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def mints(self) -> List[str]:
+        return list(self._entries)
+
+    def add(self, mint: str) -> bool:
+        """True se o mint foi adicionado agora; False se já estava na lista."""
+        if mint in self._entries:
+            return False
+        if len(self._entries) >= self.max_mints:
+            raise WatchlistFullError(f"watchlist cheia ({self.max_mints} mints)")
+        self._entries[mint] = _Entry()
+        if self._wake is not None:
+            self._wake.set()
+        return True
+
+    def remove(self, mint: str) -> bool:
+        return self._entries.pop(mint, None) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    # --- leitura ---
+    def _freshness(self, e: _Entry) -> Dict[str, Any]:
+        return {
+            "source": "watchlist",
+            "updatedAt": e.updated_at,
+            "ageSeconds": round(time.time() - e.updated_at, 3) if e.updated_at else None,
+            "refreshSeconds": self.interval,
+            "lastError": e.last_error,
+        }
+
+    def get(self, mint: str, *, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Último snapshot do mint (cópia rasa) com o campo "freshness".
+        None se o mint não é vigiado, ainda não tem snapshot ou está velho demais.
+        """
+        e = self._entries.get(mint)
+        if e is None or e.snapshot is None:
+            return None
+        limit = self.max_staleness if max_age is None else max_age
+        if limit and time.time() - e.updated_at > limit:
+            return None
+        snap = snapshot_to_dict(e.snapshot)
+        snap["freshness"] = self._freshness(e)
+        return snap
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {"mint": m, "hasSnapshot": e.snapshot is not None, "addedAt": e.added_at, **self._freshness(e)}
+            for m, e in self._entries.items()
+        ]
+
+    # --- refresh ---
+    def _due(self, now: float) -> List[str]:
+        return [
+            m for m, e in self._entries.items()
+            if e.last_attempt is None or now - e.last_attempt >= self.interval
+        ]
+
+    def _next_due_in(self, now: float) -> float:
+        waits = [
+            0.0 if e.last_attempt is None else self.interval - (now - e.last_attempt)
+            for e in self._entries.values()
+        ]
+        return max(0.0, min(waits)) if waits else self.interval
+
+    async def refresh_once(self, sol: SolscanClient, be: BirdeyeClient, mints: Optional[List[str]] = None) -> int:
+        """Reenriquece `mints` (padrão: os vencidos). Retorna quantos snapshots foram atualizados."""
+        mints = self._due(time.monotonic()) if mints is None else mints
+        if not mints:
+            return 0
+        started = time.monotonic()
+        for m in mints:
+            if m in self._entries:
+                self._entries[m].last_attempt = started
+        windows = {m: self._entries[m].window for m in mints if m in self._entries}
+        sem = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def _one(mint: str) -> Dict[str, Any]:
+            async with sem:
+                return await enrich_mint_with_status(sol, be, mint, overview_batch=batch,
+                                                     volume_window=windows.get(mint))
+
+        with bulk_priority():
+            batch = start_overview_batch(be, mints, ENRICH_BATCH_OVERVIEW)
+            try:
+                snaps = await asyncio.gather(*(_one(m) for m in mints), return_exceptions=True)
+            finally:
+                if batch is not None and not batch.done():
+                    batch.cancel()
+
+        updated = 0
+        now = time.time()
+        for mint, snap in zip(mints, snaps):
+            e = self._entries.get(mint)
+            if e is None:  # removido durante o refresh
+                continue
+            if isinstance(snap, BaseException):
+                log.warning("Falha ao processar mint", mint=mint, stage="watchlist", error=str(snap))
+                e.last_error = "enrich_failed"
+                self.refresh_errors += 1
+                continue
+            overview = snap["birdeyeStatus"]["overview"]
+            if overview.startswith("error") and e.snapshot is not None:
+                e.last_error = f"birdeye_overview {overview}"
+                self.refresh_errors += 1
+                continue
+            SNAPSHOT_WRITER.record(snap)
+            e.snapshot = snap
+            e.updated_at = now
+            e.last_error = None
+            updated += 1
+        self.refreshes += 1
+        return updated
+
+    async def run(self, sol: Optional[SolscanClient] = None, be: Optional[BirdeyeClient] = None) -> None:
+        """Loop do refresher. Sem clientes compartilhados, abre os próprios (um par por vida do loop)."""
+        self._wake = asyncio.Event()
+        async with AsyncExitStack() as stack:
+            if sol is None:
+                sol = await stack.enter_async_context(SolscanClient())
+            if be is None:
+                try:
+                    be = await stack.enter_async_context(BirdeyeClient())
+                except ValueError as e:
+                    log.warning("Watchlist sem refresher (Birdeye indisponível)", stage="watchlist", error=str(e))
+                    return
+            while True:
+                self._wake.clear()
+                try:
+                    await self.refresh_once(sol, be)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.refresh_errors += 1
+                    log.warning("Falha no refresh da watchlist", stage="watchlist", error=str(e))
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self._next_due_in(time.monotonic()))
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self, sol: Optional[SolscanClient] = None, be: Optional[BirdeyeClient] = None) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(sol, be))
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        self._wake = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mints": len(self._entries),
+            "with_snapshot": sum(1 for e in self._entries.values() if e.snapshot is not None),
+            "refresh_seconds": self.interval,
+            "running": self._task is not None and not self._task.done(),
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+WATCHLIST = Watchlist()
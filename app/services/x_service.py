@@ -3,6 +3,9 @@ import requests
 from typing import List, Optional
 from app.models.signal_model import Signal
 from app.services.grok_service import GrokService
+from app.core.log import get_logger
+
+log = get_logger(__name__)
 
 class XService:
     def __init__(self):
@@ -19,7 +22,7 @@ class XService:
             response.raise_for_status()
             return response.json().get("statuses", [])
         except Exception as e:
-            print(f"[XService] Erro ao buscar tweets: {e}")
+            log.warning("Erro ao buscar tweets", stage="x_service", error=str(e))
             return []
 
     async def analyze_tweet_sentiment(self, tweet_text: str) -> dict:
@@ -35,7 +38,7 @@ class XService:
             response = await self.grok.analyze(prompt)
             return response  # Assume que Grok retorna {"sentiment_score": float, "action": str}
         except Exception as e:
-            print(f"[XService] Erro ao analisar tweet: {e}")
+            log.warning("Erro ao analisar tweet", stage="x_service", error=str(e))
             return {"sentiment_score": 0.0, "action": "none"}
 
     async def monitor_kol_tweets(self, token_address: str, kols: List[str]) -> Optional[Signal]:
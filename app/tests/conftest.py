@@ -1,8 +1,13 @@
 # app/tests/conftest.py
+import os
 import sys
+import tempfile
 from pathlib import Path
 
 # /.../memebot-backend - cópia/app/tests/conftest.py -> root = /.../memebot-backend - cópia
 ROOT = Path(__file__).resolve().parents[2]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+# Caches persistentes (SQLite) dos testes ficam fora do repositório
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="memebot-tests-"), "memebot.db"))
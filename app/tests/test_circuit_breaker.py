@@ -0,0 +1,123 @@
+import httpx
+import pytest
+
+import app.services.birdeye_client as bc
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_estados_closed_open_half_open():
+    clock = FakeClock()
+    cb = CircuitBreaker(failure_threshold=2, open_seconds=10, denied_ttl=60, clock=clock)
+
+    assert cb.allow("/a")
+    cb.record_failure("/a")
+    assert cb.state("/a") == CLOSED
+    cb.record_failure("/a")
+    assert cb.state("/a") == OPEN
+    assert not cb.allow("/a")                 # falha rápida
+    assert cb.retry_in("/a") == 10
+
+    clock.now += 10
+    assert cb.state("/a") == HALF_OPEN
+    assert cb.allow("/a")                     # uma sonda...
+    assert not cb.allow("/a")                 # ...e só uma
+    cb.record_failure("/a")                   # sonda falhou -> abre de novo
+    assert cb.state("/a") == OPEN
+
+    clock.now += 10
+    assert cb.allow("/a")
+    cb.record_success("/a")
+    assert cb.state("/a") == CLOSED
+    assert cb.allow("/a") and cb.allow("/a")
+
+    stats = cb.stats()["/a"]
+    assert stats["trips"] == 2 and stats["rejected"] == 2
+
+    # Plano negado: memorizado até o TTL, sem mexer no circuito
+    cb.mark_denied("/b")
+    assert cb.is_denied("/b") and cb.state("/b") == CLOSED
+    clock.now += 61
+    assert not cb.is_denied("/b")
+
+
+@pytest.mark.asyncio
+async def test_overview_negado_vai_direto_ao_price(monkeypatch):
+    monkeypatch.setattr(bc, "BIRDEYE_DRY_RUN", False)
+    monkeypatch.setattr(bc, "BIRDEYE_BREAKER", CircuitBreaker(5, 30, 3600))
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path == "/defi/token_overview":
+            return httpx.Response(403, text="plano")
+        return httpx.Response(200, json={"data": {"value": 2.0}})
+
+    be = bc.BirdeyeClient(api_key="k")
+    be._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    async with be:
+        for mint in ("CbMintA", "CbMintB", "CbMintC"):
+            data, used_fallback = await be.overview_with_fallback(mint)
+            assert used_fallback and data["data"]["value"] == 2.0
+
+    # Só o primeiro mint paga o 403; os demais vão direto ao /defi/price
+    assert paths.count("/defi/token_overview") == 1
+    assert paths.count("/defi/price") == 3
+    assert bc.BIRDEYE_BREAKER.stats()["/defi/token_overview"]["plan_denied"] is True
+
+
+@pytest.mark.asyncio
+async def test_circuito_aberto_falha_rapido(monkeypatch):
+    monkeypatch.setattr(bc, "BIRDEYE_DRY_RUN", False)
+    monkeypatch.setattr(bc, "BIRDEYE_BREAKER", CircuitBreaker(1, 30, 3600))
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(503)
+
+    be = bc.BirdeyeClient(api_key="k")
+    be._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    async with be:
+        with pytest.raises(bc.BirdeyeCircuitOpenError):
+            await be.token_trades_recent("CbOutage1")
+        assert len(calls) == 1            # 503 abriu o circuito; o retry não foi à rede
+
+        with pytest.raises(bc.BirdeyeCircuitOpenError):
+            await be.token_trades_recent("CbOutage2")
+        assert len(calls) == 1
+
+    assert bc.BIRDEYE_BREAKER.state("/defi/token_trades_recent") == OPEN
+
+
+@pytest.mark.asyncio
+async def test_sonda_com_429_tenta_de_novo(monkeypatch):
+    clock = FakeClock()
+    cb = CircuitBreaker(1, 10, 3600, clock=clock)
+    monkeypatch.setattr(bc, "BIRDEYE_DRY_RUN", False)
+    monkeypatch.setattr(bc, "BIRDEYE_BREAKER", cb)
+    path = "/defi/token_trades_recent"
+    cb.record_failure(path)
+    clock.now += 10                       # half-open: a próxima chamada é a sonda
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"data": {"items": []}})
+
+    be = bc.BirdeyeClient(api_key="k")
+    be._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    async with be:
+        assert await be.token_trades_recent("CbProbe429") == {"data": {"items": []}}
+
+    assert len(calls) == 2
+    assert cb.state(path) == CLOSED
@@ -5,3 +5,60 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from app.services.CoinGeckoService import CoinGeckoService
+
+import httpx
+import pytest
+
+from app.services.CoinGeckoService import COINGECKO_CACHE
+
+
+def _market(coin_id):
+    return {"id": coin_id, "name": coin_id.title(), "symbol": coin_id[:3], "current_price": 1.5,
+            "market_cap": 1_000, "total_volume": 50, "image": f"https://img/{coin_id}.png"}
+
+
+def _service(handler):
+    svc = CoinGeckoService()
+    svc._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_lote_pede_so_o_que_falta_no_cache():
+    COINGECKO_CACHE.clear()
+    seen = []
+
+    def handler(request):
+        ids = request.url.params["ids"].split(",")
+        seen.append(ids)
+        return httpx.Response(200, json=[_market(i) for i in ids if i != "desconhecido"])
+
+    async with _service(handler) as cg:
+        first = await cg.coins_data(["bonk", "wif", "desconhecido"])
+        assert set(first) == {"bonk", "wif"}
+        assert first["bonk"]["priceUSD"] == 1.5 and first["bonk"]["url"].endswith("/coins/bonk")
+
+        # bonk/wif/desconhecido vêm do cache; só "popcat" vai ao upstream
+        second = await cg.coins_data(["bonk", "popcat", "desconhecido"])
+        assert set(second) == {"bonk", "popcat"}
+        assert await cg.get_token_data_from_coingecko("wif") == first["wif"]
+
+    assert seen == [["bonk", "wif", "desconhecido"], ["popcat"]]
+
+
+@pytest.mark.asyncio
+async def test_429_respeita_retry_after_e_tenta_de_novo():
+    COINGECKO_CACHE.clear()
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"retry-after": "0"})
+        return httpx.Response(200, json={"mintaaa": {"usd": 0.01, "usd_market_cap": 10, "usd_24h_vol": 2}})
+
+    async with _service(handler) as cg:
+        prices = await cg.token_prices(["mintAAA"])
+
+    assert prices == {"mintAAA": {"priceUSD": 0.01, "mcapUSD": 10, "volumeUSD_24h": 2}}
+    assert calls == ["/api/v3/simple/token_price/solana"] * 2
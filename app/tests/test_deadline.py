@@ -0,0 +1,167 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import app.services.birdeye_client as bc
+from app.core import deadline
+from app.main import app
+from app.routers import signals as sig_router
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.singleflight import SingleFlight
+from app.tests.test_signals_stream import FakeBirdeye, FakeSolscan, _patch_clients
+
+
+@pytest.mark.asyncio
+async def test_escopo_aninhado_nao_estende_e_cap_limita():
+    assert deadline.remaining() is None
+    assert deadline.cap(10.0) == 10.0
+
+    with deadline.deadline_scope(0.2):
+        outer = deadline.remaining()
+        with deadline.deadline_scope(60):
+            assert deadline.remaining() <= outer
+        assert deadline.cap(10.0) <= 0.2
+        with pytest.raises(deadline.DeadlineExceeded):
+            await deadline.sleep(0.5)          # não cabe: desiste sem dormir
+        with pytest.raises(deadline.DeadlineExceeded):
+            await deadline.wait(asyncio.sleep(5))
+        assert deadline.expired()
+        with pytest.raises(asyncio.TimeoutError):
+            deadline.cap(1.0)
+    assert deadline.remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_birdeye_para_retries_quando_o_prazo_acaba(monkeypatch):
+    monkeypatch.setattr(bc, "BIRDEYE_DRY_RUN", False)
+    monkeypatch.setattr(bc, "BIRDEYE_BREAKER", CircuitBreaker(100, 30, 3600))
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(503)
+
+    be = bc.BirdeyeClient(api_key="k")
+    be._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    started = time.perf_counter()
+    async with be:
+        with deadline.deadline_scope(0.3):
+            with pytest.raises(deadline.DeadlineExceeded):
+                await be.token_trades_recent("DlMint1")
+    # Sem prazo seriam 5 tentativas e ~7s de backoff
+    assert len(calls) == 1
+    assert time.perf_counter() - started < 0.3
+
+
+@pytest.mark.asyncio
+async def test_chamada_coalescida_nao_usa_prazo_do_primeiro_chamador(monkeypatch):
+    monkeypatch.setattr(bc, "BIRDEYE_DRY_RUN", False)
+    monkeypatch.setattr(bc, "BIRDEYE_BREAKER", CircuitBreaker(100, 30, 3600))
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"data": {"items": []}})
+
+    be = bc.BirdeyeClient(api_key="k")
+    be._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def apressado():
+        with deadline.deadline_scope(0.4):
+            return await be.token_trades_recent("DlMint2")
+
+    async with be:
+        a, b = await asyncio.gather(apressado(), be.token_trades_recent("DlMint2"), return_exceptions=True)
+
+    # A chega primeiro e estoura o próprio prazo; B (sem prazo) recebe o retry que deu certo
+    assert isinstance(a, deadline.DeadlineExceeded)
+    assert b == {"data": {"items": []}}
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_signals_com_prazo_nao_deixa_retry_upstream_rodando(monkeypatch):
+    monkeypatch.setattr(bc, "BIRDEYE_DRY_RUN", False)
+    monkeypatch.setattr(bc, "BIRDEYE_BREAKER", CircuitBreaker(100, 30, 3600))
+    monkeypatch.setattr(bc, "BIRDEYE_CACHE_TTLS", {})
+    monkeypatch.setattr(bc, "BIRDEYE_FLIGHTS", SingleFlight())
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(503)
+
+    # Cliente compartilhado (como no lifespan): sobrevive ao request, então nada fecha o retry por fora
+    be = bc.BirdeyeClient(api_key="k", shared=True)
+    be._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    @asynccontextmanager
+    async def shared_be(request):
+        yield be
+
+    @asynccontextmanager
+    async def fake_sol(request):
+        yield FakeSolscan()
+
+    monkeypatch.setattr(sig_router, "open_birdeye", shared_be)
+    monkeypatch.setattr(sig_router, "open_solscan", fake_sol)
+
+    async with be, httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        started = time.perf_counter()
+        await client.get("/signals", params={"mints": "DlMint3", "deadline_ms": 400})
+        elapsed = time.perf_counter() - started
+        seen = len(calls)
+        await asyncio.sleep(0.8)
+
+        # O backoff (>= 0.5s) não cabe no prazo: a chamada desiste já, sem esperar o chamador
+        assert elapsed < 0.35
+        assert seen >= 1
+        assert bc.BIRDEYE_FLIGHTS.in_flight == 0
+        assert len(calls) == seen
+
+
+def test_signals_devolve_parciais_no_prazo(monkeypatch):
+    _patch_clients(monkeypatch)
+
+    async def overview(self, mint, chain="solana"):
+        await asyncio.sleep(5 if mint == "travado" else 0.01)
+        return {"data": {"liquidity": 10_000, "market_cap": 100_000}}, False
+
+    monkeypatch.setattr(FakeBirdeye, "overview_with_fallback", overview)
+
+    started = time.perf_counter()
+    r = TestClient(app).get("/signals", params={"mints": "a,travado,b", "deadline_ms": 300})
+    elapsed = time.perf_counter() - started
+
+    assert r.status_code == 200
+    assert elapsed < 2
+    body = r.json()
+    assert [s["tokenAddress"] for s in body] == ["a", "travado", "b"]
+    assert body[1]["status"] == "partial"
+    assert "deadline_ms" in body[1]["failed"][0]
+    assert "deadline_ms" not in " ".join(body[0]["failed"] + body[2]["failed"])
+
+
+def test_stream_emite_placeholder_parcial(monkeypatch):
+    _patch_clients(monkeypatch)
+
+    async def overview(self, mint, chain="solana"):
+        await asyncio.sleep(5 if mint == "travado" else 0.01)
+        return {"data": {"liquidity": 10_000}}, False
+
+    monkeypatch.setattr(FakeBirdeye, "overview_with_fallback", overview)
+    monkeypatch.setattr(sig_router, "SIGNALS_DEADLINE_MS", 300)  # prazo padrão sem ?deadline_ms=
+
+    r = TestClient(app).get("/signals", params={"mints": "travado,a", "stream": "ndjson"})
+    events = [json.loads(line) for line in r.text.splitlines() if line]
+    cut = [e["data"] for e in events if e["event"] == "signal" and "deadline_ms" in " ".join(e["data"]["failed"])]
+    assert [c["tokenAddress"] for c in cut] == ["travado"]
+    assert cut[0]["status"] == "partial"
+    assert events[-1]["data"]["partial"] == 1
@@ -0,0 +1,124 @@
+import os
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import app.services.dex_ingester as dex_ingester
+from app.main import app
+from app.services.dex_ingester import DexIngester
+
+
+def _profile(addr, description="community token", chain="ethereum"):
+    return {
+        "tokenAddress": addr,
+        "chainId": chain,
+        "url": f"https://dexscreener.com/{chain}/{addr}",
+        "header": addr.upper(),
+        "description": description,
+        "links": [{"type": "twitter", "url": f"https://x.com/{addr}"}],
+    }
+
+
+class FakeFeed:
+    """Upstream com ETag: responde 304 quando o If-None-Match bate."""
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.version = 1
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        etag = f'"v{self.version}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        return httpx.Response(200, json=self.profiles, headers={"etag": etag})
+
+
+@pytest.mark.asyncio
+async def test_poll_condicional_avalia_so_perfis_novos(monkeypatch):
+    calls = []
+    real_screen = dex_ingester.screen_tokens
+
+    def screen(tokens):
+        tokens = list(tokens)
+        calls.extend(t["tokenAddress"] for t in tokens)
+        return real_screen(tokens)
+
+    monkeypatch.setattr(dex_ingester, "screen_tokens", screen)
+
+    feed = FakeFeed([_profile("a"), _profile("b", description="total scam")])
+    ing = DexIngester(interval=60)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(feed)) as client:
+        assert await ing.poll_once(client) == 2
+        assert [t["tokenAddress"] for t in ing.current()] == ["a"]
+        assert ing.current()[0]["__eval__"]["status"] == "partial"
+
+        # Mesmo ETag -> 304, nada reavaliado
+        assert await ing.poll_once(client) == 0
+        assert feed.requests[-1].headers["if-none-match"] == '"v1"'
+        assert ing.not_modified == 1
+
+        # Feed novo: só "c" é avaliado; "a"/"b" vêm do seen-set
+        feed.profiles = [_profile("c"), _profile("a"), _profile("b", description="total scam")]
+        feed.version = 2
+        assert await ing.poll_once(client) == 1
+
+        # Mesmo token com descrição nova: reavaliado e o dict memorizado é trocado
+        feed.profiles = [_profile("c", description="rug pull"), _profile("a", description="nova fase")]
+        feed.version = 3
+        assert await ing.poll_once(client) == 2
+
+    assert calls == ["a", "b", "c", "c", "a"]
+    assert [t["tokenAddress"] for t in ing.current()] == ["a"]
+    assert ing.current()[0]["description"] == "nova fase"
+
+
+def test_blacklist_recarregada_reavalia_o_ultimo_feed(tmp_path, monkeypatch):
+    from app.utils.filters import BLACKLIST
+
+    path = tmp_path / "blacklist.txt"
+    path.write_text("scam\n", encoding="utf-8")
+    monkeypatch.setattr(BLACKLIST, "path", str(path))
+    monkeypatch.setattr(BLACKLIST, "reload_seconds", 0)
+    monkeypatch.setattr(BLACKLIST, "_mtime", None)
+    patterns = list(BLACKLIST.patterns)
+    try:
+        ing = DexIngester(interval=60)
+        assert ing.ingest([_profile("a"), _profile("b", description="moon token")]) == 2
+        assert [t["tokenAddress"] for t in ing.current()] == ["a", "b"]
+
+        # Termo novo no arquivo: sem feed novo, current() já não devolve "b"
+        path.write_text("scam\nmoon\n", encoding="utf-8")
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        assert [t["tokenAddress"] for t in ing.current()] == ["a"]
+        assert ing.evaluated == 4
+        # Feed igual depois da troca: nada a reavaliar
+        assert ing.ingest([_profile("a"), _profile("b", description="moon token")]) == 0
+    finally:
+        BLACKLIST.set_patterns(patterns)
+
+
+def test_rota_dex_serve_do_estado_do_ingester(monkeypatch):
+    ing = DexIngester(interval=60)
+    ing.ingest([_profile("a"), _profile("b", chain="bsc")])
+    monkeypatch.setattr("app.routers.signals.DEX_INGESTER", ing)
+    monkeypatch.setattr(dex_ingester, "fetch_token_profiles", None)  # estado fresco: sem upstream
+
+    async def fake_llm(tokens):
+        for t in tokens:  # como o _merge_results: mescla o veredito no próprio dict
+            t.update({"decision": "observar", "confidence": 50.0})
+        return tokens
+
+    monkeypatch.setattr("app.routers.signals.analyze_tokens_async", fake_llm)
+
+    r = TestClient(app).get("/signals", params={"chain": "dex", "analyze": "true"})
+    assert r.status_code == 200
+    body = r.json()
+    assert [(s["tokenAddress"], s["chainId"]) for s in body] == [("a", 1), ("b", 56)]
+    assert body[0]["links"] == [{"type": "twitter", "url": "https://x.com/a"}]
+    assert body[0]["decision"] == "observar"
+    # Estado do ingester (compartilhado entre requests) não recebe o veredito
+    assert all("decision" not in t for t in ing.current())
@@ -0,0 +1,60 @@
+import os
+import re
+
+from app.utils.filters import BLACKLIST, Blacklist, evaluate_token, filter_tokens, screen_tokens
+
+# Regexes antigos (um por termo) — a alternação única deve concordar com todos
+OLD_PATTERNS = [
+    re.compile(r"\btest\b", re.I),
+    re.compile(r"\brug\b", re.I),
+    re.compile(r"\bscam\b", re.I),
+    re.compile(r"\bairdrop\b", re.I),
+    re.compile(r"\bpump\b", re.I),
+    re.compile(r"\bdev\s+is\s+gone\b", re.I),
+]
+
+
+def test_alternacao_unica_equivale_aos_regexes_antigos():
+    textos = [
+        "fair launch", "no RUG here", "testing token", "contest", "Dev  is gone!", "pumpkin season",
+        "free AIRDROP", "scammer", "rugpull", "pump.", "", "trustworthy",
+    ]
+    for t in textos:
+        antigo = any(p.search(t) for p in OLD_PATTERNS)
+        assert (BLACKLIST.search(t) is not None) == antigo, t
+
+
+def test_blacklist_recarrega_quando_o_arquivo_muda(tmp_path):
+    path = tmp_path / "blacklist.txt"
+    path.write_text("# comentário\nhoneypot\n", encoding="utf-8")
+    bl = Blacklist(path=str(path), reload_seconds=0)
+    assert bl.search("a honeypot token") == "honeypot"
+    assert bl.search("scam") is None
+
+    path.write_text("scam\n[inválido\n", encoding="utf-8")   # regex quebrada: mantém a lista
+    os.utime(path, (1, 1))
+    assert bl.maybe_reload() is False
+    assert bl.patterns == ["honeypot"]
+
+    path.write_text("scam\n", encoding="utf-8")
+    os.utime(path, (2, 2))
+    assert bl.search("pure scam") == "scam"
+    assert bl.search("a honeypot token") is None
+
+
+def test_screen_tokens_traz_todos_os_checks_numa_passada():
+    tokens = [
+        {"description": "community", "links": [{"type": "twitter", "url": "https://x.com/a"}],
+         "volume": {"h24": 5000}, "txns": {"h24": {"buys": 20, "sells": 5}}},
+        {"description": "rug incoming", "links": []},
+        {"description": "ok", "links": []},
+    ]
+    results = screen_tokens(tokens)
+    assert [r["status"] for r in results] == ["ok", "rejected", "rejected"]
+    assert results[0]["checks"]["compradores"] is True and results[0]["unknown"] == ["idade"]
+    assert results[1]["failed"] == ["links", "descricao"]
+
+    # filter_tokens/evaluate_token anexam o mesmo resultado (inclusive nos rejeitados)
+    assert filter_tokens(tokens) == [tokens[0]]
+    assert tokens[1]["__eval__"]["failed"] == ["links", "descricao"]
+    assert evaluate_token(tokens[2]) is None and tokens[2]["__eval__"]["status"] == "rejected"
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import time
+import pytest
+
+from app.services import gpt_analysis as ga
+
+pytestmark = pytest.mark.asyncio
+
+
+class _Msg:
+    def __init__(self, content):
+        self.message = type("M", (), {"content": content})()
+
+
+class FakeCompletions:
+    def __init__(self, delay=0.05, hang_on=None):
+        self.delay = delay
+        self.hang_on = hang_on
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, model, temperature, messages):
+        batch = json.loads(messages[1]["content"].split("Tokens:\n", 1)[1].split("\n\nResponda", 1)[0])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.hang_on and any(t["tokenAddress"] == self.hang_on for t in batch):
+                await asyncio.sleep(10)
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        out = [{"tokenAddress": t["tokenAddress"], "decision": "entrada", "confidence": 80, "rationale": "ok"}
+               for t in batch]
+        return type("R", (), {"choices": [_Msg(json.dumps(out))]})()
+
+
+def _fake_client(completions):
+    return type("C", (), {"chat": type("Chat", (), {"completions": completions})()})()
+
+
+async def test_lotes_em_paralelo_com_limite(monkeypatch):
+    comp = FakeCompletions(delay=0.05)
+    monkeypatch.setattr(ga, "get_verdict_cache", lambda: None)
+    monkeypatch.setattr(ga, "_get_async_openai_client", lambda: _fake_client(comp))
+    monkeypatch.setattr(ga, "LLM_BATCH_SIZE", 2)
+    tokens = [{"tokenAddress": f"t{i}", "chainId": 101} for i in range(8)]
+
+    t0 = time.monotonic()
+    out = await ga.analyze_tokens_async(tokens, max_inflight=2)
+    elapsed = time.monotonic() - t0
+
+    assert comp.max_in_flight == 2
+    assert elapsed < 0.19  # 4 lotes de 50ms, 2 por vez => ~100ms (sequencial seria ~200ms)
+    assert all(t["decision"] == "entrada" for t in out)
+
+
+async def test_timeout_por_lote_usa_fallback(monkeypatch):
+    comp = FakeCompletions(delay=0.0, hang_on="lento")
+    monkeypatch.setattr(ga, "get_verdict_cache", lambda: None)
+    monkeypatch.setattr(ga, "_get_async_openai_client", lambda: _fake_client(comp))
+    monkeypatch.setattr(ga, "LLM_BATCH_SIZE", 1)
+    tokens = [{"tokenAddress": "rapido"}, {"tokenAddress": "lento"}]
+
+    out = await ga.analyze_tokens_async(tokens, batch_timeout=0.05)
+    assert out[0]["decision"] == "entrada"
+    assert out[1]["decision"] == "observar" and out[1]["confidence"] == 35
+
+
+async def test_cache_de_veredictos_com_materialidade(tmp_path, monkeypatch):
+    from app.database.db import VerdictStore
+    from app.services.verdict_cache import VerdictCache
+
+    cache = VerdictCache(VerdictStore(str(tmp_path / "v.db")))
+    comp = FakeCompletions(delay=0.0)
+    calls = []
+    orig_create = comp.create
+
+    async def counting_create(**kw):
+        calls.append(1)
+        return await orig_create(**kw)
+
+    comp.create = counting_create
+    monkeypatch.setattr(ga, "get_verdict_cache", lambda: cache)
+    monkeypatch.setattr(ga, "_get_async_openai_client", lambda: _fake_client(comp))
+
+    def token(liq, flags=()):
+        return {"tokenAddress": "T", "header": "T", "liquidityUSD": liq, "flags": list(flags)}
+
+    await ga.analyze_tokens_async([token(10_000)])
+    assert len(calls) == 1
+
+    # Mesma entrada e liquidez dentro do limiar -> reaproveita
+    out = await ga.analyze_tokens_async([token(11_000)])
+    assert len(calls) == 1 and out[0]["decision"] == "entrada"
+
+    # Liquidez caiu muito ou flags mudaram -> volta ao LLM
+    await ga.analyze_tokens_async([token(2_000)])
+    await ga.analyze_tokens_async([token(10_000, ["low_holders"])])
+    assert len(calls) == 3
+    assert cache.stats()["material_misses"] == 2
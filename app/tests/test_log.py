@@ -0,0 +1,47 @@
+import io
+import json
+import logging
+import queue
+
+from app.core import log as log_mod
+from app.core.log import Logger, _DroppingQueueHandler, flush_logs, get_logger, setup_logging
+
+
+def _lines(stream):
+    flush_logs()  # para o listener: tudo que estava na fila já foi escrito
+    return [json.loads(l) for l in stream.getvalue().splitlines()]
+
+
+def test_linhas_json_com_campos_estruturados_e_amostragem():
+    stream = io.StringIO()
+    setup_logging(level="INFO", fmt="json", stream=stream)
+    try:
+        log = get_logger("app.services.teste")
+        log.info("enriquecido", mint="m1", stage="enrich", duration_ms=1.5)
+        log.sample("por token", mint="m2")          # DEBUG desligado: nada
+        log.debug("debug", mint="m3")
+        lines = _lines(stream)
+        assert len(lines) == 1
+        assert lines[0]["logger"] == "memebot.services.teste"
+        assert lines[0]["msg"] == "enriquecido" and lines[0]["level"] == "info"
+        assert (lines[0]["mint"], lines[0]["stage"], lines[0]["duration_ms"]) == ("m1", "enrich", 1.5)
+
+        stream = io.StringIO()
+        setup_logging(level="DEBUG", fmt="json", stream=stream)
+        log = get_logger("app.services.teste")
+        for i in range(50):
+            log.sample("por token", mint=f"m{i}")
+        Logger(logging.getLogger("memebot.services.teste"), sample_rate=0.0).sample("nunca")
+        assert len(_lines(stream)) == 50
+    finally:
+        setup_logging()
+
+
+def test_fila_cheia_descarta_sem_bloquear():
+    handler = _DroppingQueueHandler(queue.Queue(maxsize=1))
+    rec = logging.LogRecord("memebot.x", logging.INFO, __file__, 1, "msg %s", ("a",), None)
+    handler.handle(rec)
+    handler.handle(logging.LogRecord("memebot.x", logging.INFO, __file__, 1, "outra", None, None))
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().msg == "msg a"
+    assert "dropped" in log_mod.log_stats()
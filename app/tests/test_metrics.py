@@ -0,0 +1,85 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import app.services.birdeye_client as bc
+from app.core.metrics import (
+    FALLBACKS,
+    UPSTREAM_RETRIES,
+    UPSTREAM_SECONDS,
+    Counter,
+    Histogram,
+    _REGISTRY,
+    reset_metrics,
+)
+from app.main import app
+from app.services.circuit_breaker import CircuitBreaker
+
+
+def test_histograma_renderiza_buckets_cumulativos():
+    h = Histogram("t_hist_seconds", "teste", ("stage",), buckets=(0.1, 1.0))
+    c = Counter("t_total", "teste", ("kind",))
+    try:
+        cell = h.labels("score")
+        cell.observe(0.05)
+        cell.observe(0.5)
+        h.observe(5.0, "score")
+        c.inc("a")
+        c.labels("a").inc(2)
+
+        text = h.render() + c.render()
+        assert 't_hist_seconds_bucket{stage="score",le="0.1"} 1' in text
+        assert 't_hist_seconds_bucket{stage="score",le="1"} 2' in text
+        assert 't_hist_seconds_bucket{stage="score",le="+Inf"} 3' in text
+        assert 't_hist_seconds_sum{stage="score"} 5.55' in text
+        assert 't_hist_seconds_count{stage="score"} 3' in text
+        assert 't_total{kind="a"} 3' in text
+        assert h.count("score") == 3
+
+        # reset zera no lugar: a célula pré-resolvida continua valendo
+        reset_metrics()
+        cell.observe(0.05)
+        assert h.count("score") == 1
+    finally:
+        _REGISTRY.remove(h)
+        _REGISTRY.remove(c)
+
+
+def test_rota_metrics_usa_template_da_rota():
+    client = TestClient(app)
+    assert client.get("/health").status_code == 200
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert 'memebot_http_request_seconds_count{method="GET",route="/health",status="200"}' in r.text
+    assert "# TYPE memebot_upstream_request_seconds histogram" in r.text
+
+
+@pytest.mark.asyncio
+async def test_birdeye_conta_retry_e_fallback(monkeypatch):
+    monkeypatch.setattr(bc, "BIRDEYE_DRY_RUN", False)
+    monkeypatch.setattr(bc, "BIRDEYE_BREAKER", CircuitBreaker())
+    calls = {"price": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/defi/token_overview":
+            return httpx.Response(401, text="plano")
+        calls["price"] += 1
+        if calls["price"] == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"data": {"value": 1.0}})
+
+    before_fb = FALLBACKS.value("birdeye", "overview_to_price")
+    before_retry = UPSTREAM_RETRIES.value("birdeye", "/defi/price", 503)
+    before_ok = UPSTREAM_SECONDS.count("birdeye", "/defi/price", 200)
+
+    be = bc.BirdeyeClient(api_key="k")
+    be._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    async with be:
+        data, used_fallback = await be.overview_with_fallback("MetricsMint1111")
+
+    assert used_fallback is True
+    assert data["data"]["value"] == 1.0
+    assert FALLBACKS.value("birdeye", "overview_to_price") == before_fb + 1
+    assert UPSTREAM_RETRIES.value("birdeye", "/defi/price", 503) == before_retry + 1
+    assert UPSTREAM_SECONDS.count("birdeye", "/defi/price", 200) == before_ok + 1
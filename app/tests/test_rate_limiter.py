@@ -0,0 +1,62 @@
+import asyncio
+import time
+import pytest
+
+from app.services.rate_limiter import (
+    AsyncTokenBucket,
+    EndpointRateLimiter,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    parse_kv_floats,
+    retry_after_seconds,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_bucket_limita_taxa():
+    bucket = AsyncTokenBucket(rate=50, capacity=1)
+    t0 = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+    # 1 token de burst + 5 repostos a 50/s => ~0.1s
+    assert time.monotonic() - t0 >= 0.09
+
+
+async def test_prioridade_interativa_passa_na_frente():
+    bucket = AsyncTokenBucket(rate=20, capacity=1)
+    await bucket.acquire()  # esvazia o burst
+    order = []
+
+    async def worker(name, prio):
+        await bucket.acquire(priority=prio)
+        order.append(name)
+
+    tasks = [asyncio.create_task(worker(f"bulk{i}", PRIORITY_BULK)) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(worker("interativo", PRIORITY_INTERACTIVE)))
+    await asyncio.gather(*tasks)
+    assert order[0] == "interativo"
+
+
+async def test_cancelamento_nao_trava_fila():
+    bucket = AsyncTokenBucket(rate=20, capacity=1)
+    await bucket.acquire()
+    t = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    t.cancel()
+    await asyncio.wait_for(bucket.acquire(), timeout=1)
+
+
+async def test_headers_de_quota_pausam_o_bucket():
+    limiter = EndpointRateLimiter(rps=100)
+    limiter.observe_headers({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "0.1"})
+    t0 = time.monotonic()
+    await limiter.acquire("/defi/price")
+    assert time.monotonic() - t0 >= 0.09
+
+
+async def test_parsers():
+    assert parse_kv_floats("/a=2, /b=0.5,lixo") == {"/a": 2.0, "/b": 0.5}
+    assert retry_after_seconds({"retry-after": "3"}) == 3.0
+    assert retry_after_seconds({}) is None
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+
+from app.services.response_cache import TTLCache, cache_key
+
+pytestmark = pytest.mark.asyncio
+
+
+def _fetcher(calls, value="v", size=10):
+    async def fetch():
+        calls.append(1)
+        return value, size
+    return fetch
+
+
+async def test_hit_e_miss():
+    cache = TTLCache(max_bytes=1_000)
+    calls = []
+    key = cache_key("/defi/price", {"chain": "solana", "address": "A"})
+    assert key == cache_key("/defi/price", {"address": "A", "chain": "solana"})
+
+    assert await cache.get_or_fetch(key, _fetcher(calls), ttl=10) == "v"
+    assert await cache.get_or_fetch(key, _fetcher(calls), ttl=10) == "v"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+async def test_lru_respeita_orcamento_de_bytes():
+    cache = TTLCache(max_bytes=25)
+    cache.set("a", 1, 10, ttl=10)
+    cache.set("b", 2, 10, ttl=10)
+    assert cache.get("a") == 1          # "a" vira o mais recente
+    cache.set("c", 3, 10, ttl=10)       # estoura -> sai "b"
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_stale_while_revalidate():
+    cache = TTLCache(max_bytes=1_000)
+    calls = []
+    await cache.get_or_fetch("k", _fetcher(calls, "velho"), ttl=0.01, stale_ttl=10)
+    await asyncio.sleep(0.02)
+
+    # Expirado mas dentro da janela stale: devolve o antigo e atualiza em background
+    assert await cache.get_or_fetch("k", _fetcher(calls, "novo"), ttl=10, stale_ttl=10) == "velho"
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert cache.get("k") == "novo"
+    assert cache.stats()["stale_hits"] == 1
+    assert len(calls) == 2
+
+
+async def test_sem_revalidate_stale_vira_miss():
+    cache = TTLCache(max_bytes=1_000)
+    calls = []
+    await cache.get_or_fetch("k", _fetcher(calls, "velho"), ttl=0.01, stale_ttl=10)
+    await asyncio.sleep(0.02)
+
+    # Quem não consegue refrescar em background busca na hora (e não dispara refresh)
+    assert await cache.get_or_fetch("k", _fetcher(calls, "novo"), ttl=10, stale_ttl=10, revalidate=False) == "novo"
+    assert cache.stats()["stale_hits"] == 0 and cache.stats()["misses"] == 2
+    assert len(calls) == 2
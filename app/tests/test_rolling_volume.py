@@ -0,0 +1,88 @@
+import pytest
+
+from app.utils.rolling_volume import BUCKET_SECONDS, VolumeWindow
+from app.utils.solana_normalizer import merge_birdeye_into_snapshot, normalize_solscan_meta_to_snapshot
+from app.services.solana_enrichment import enrich_mint
+
+T0 = 1_700_000_000
+
+
+def _pt(i, vol, buy=1, sell=1):
+    return {"unixTime": T0 + BUCKET_SECONDS * i, "volume_quote": vol, "buy": buy, "sell": sell}
+
+
+def test_janela_somas_5m_15m_1h_e_atualizacao_do_bucket_atual():
+    w = VolumeWindow.from_points([_pt(i, 100 + i, buy=i) for i in range(14)])  # 14 pontos -> guarda 12
+    assert len(w) == 12
+    assert w.sums("1h")["volume"] == sum(100 + i for i in range(2, 14))
+    assert w.sums("15m") == {"volume": 111 + 112 + 113, "buys": 11 + 12 + 13, "sells": 3}
+    assert w.sums("5m")["volume"] == 113
+
+    # Mesmo timestamp do último: substitui; ponto antigo: ignora
+    assert w.push(_pt(13, 500, buy=50)) is True
+    assert w.push(_pt(5, 999)) is False
+    assert w.sums("5m") == {"volume": 500, "buys": 50, "sells": 1}
+    assert w.sums("15m")["volume"] == 111 + 112 + 500
+
+    fields = w.snapshot_fields()
+    assert fields["volumeUSD_15m"] == 723 and fields["txnsBuy_15m"] == 73
+
+    assert w.points_needed(now=T0 + BUCKET_SECONDS * 13 + 10) == 1
+    assert w.points_needed(now=T0 + BUCKET_SECONDS * 16) == 4
+    assert w.points_needed(now=T0 + BUCKET_SECONDS * 100) == 12
+
+
+def test_somas_correntes_nao_derivam_apos_muitos_pushes():
+    w = VolumeWindow()
+    for i in range(5_000):
+        w.push(_pt(i, 0.1 * (i % 7) + 1e6 * (i % 3 == 0)))
+    expected = sum(p["volume_quote"] for p in w.points())
+    assert w.sums("1h")["volume"] == pytest.approx(expected, rel=1e-12)
+
+
+def test_merge_preenche_campos_15m_a_partir_dos_pontos():
+    snap = normalize_solscan_meta_to_snapshot({"symbol": "X"}, "m")
+    pts = [_pt(i, 10.0, buy=2, sell=1) for i in range(12)]
+    out = merge_birdeye_into_snapshot(snap, {"data": {}}, {"data": {"points": pts}}, {"data": {}})
+    assert out["volumeUSD_1h"] == 120.0
+    assert out["volumeUSD_15m"] == 30.0
+    assert (out["txnsBuy_15m"], out["txnsSell_15m"]) == (6, 3)
+
+
+class FakeSolscan:
+    async def token_meta(self, mint):
+        return {"symbol": "X", "holder": 500}
+
+
+class FakeBirdeye:
+    def __init__(self):
+        self.limits = []
+        self.now_bucket = 11
+
+    async def overview_with_fallback(self, mint, chain="solana"):
+        return {"data": {"liquidity": 10_000}}, False
+
+    async def token_volume_points(self, mint, interval="5m", limit=12, chain="solana"):
+        self.limits.append(limit)
+        first = self.now_bucket - limit + 1
+        return {"data": {"points": [_pt(i, 10.0) for i in range(first, self.now_bucket + 1)]}}
+
+    async def token_trades_recent(self, mint, limit=100, chain="solana"):
+        return {"data": {}}
+
+
+@pytest.mark.asyncio
+async def test_enrich_incremental_pede_so_pontos_novos(monkeypatch):
+    import app.utils.rolling_volume as rv
+
+    be = FakeBirdeye()
+    window = VolumeWindow()
+    monkeypatch.setattr(rv.time, "time", lambda: T0 + BUCKET_SECONDS * 11 + 30)
+    snap = await enrich_mint(FakeSolscan(), be, "m", volume_window=window)
+    assert snap["volumeUSD_1h"] == 120.0
+
+    be.now_bucket = 13
+    monkeypatch.setattr(rv.time, "time", lambda: T0 + BUCKET_SECONDS * 13 + 30)
+    snap = await enrich_mint(FakeSolscan(), be, "m", volume_window=window)
+    assert be.limits == [12, 3]
+    assert snap["volumeUSD_1h"] == 120.0 and len(window) == 12
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.timing import RequestTimings, _CURRENT, record, stage, timed
+from app.main import app
+from app.routers.deps import get_birdeye, get_solscan
+
+
+class FakeSolscan:
+    async def token_meta(self, mint):
+        await asyncio.sleep(0.01)
+        return {"symbol": "FAKE", "name": "Fake", "decimals": 6, "supply": "1000000000"}
+
+
+class FakeBirdeye:
+    async def overview_with_fallback(self, mint):
+        await asyncio.sleep(0.01)
+        return {"data": {"price": 1.0, "liquidity": 50_000, "mc": 1_000_000}}, False
+
+    async def token_volume_points(self, mint, interval="5m", limit=12):
+        return {"data": {"points": []}}
+
+    async def token_trades_recent(self, mint, limit=100):
+        return {"data": {}}
+
+
+@pytest.mark.asyncio
+async def test_etapas_somam_e_viram_noop_fora_do_request():
+    # Sem RequestTimings no contexto: nada quebra, nada é gravado
+    with stage("solscan"):
+        pass
+    record("score", 0.1)
+    assert await timed("gpt", asyncio.sleep(0, result=7)) == 7
+
+    timings = RequestTimings()
+    token = _CURRENT.set(timings)
+    try:
+        # tasks filhas (gather) herdam o contexto e gravam no mesmo objeto
+        await asyncio.gather(timed("birdeye_volume", asyncio.sleep(0.001)),
+                             timed("birdeye_volume", asyncio.sleep(0.001)))
+        record("score", 0.002)
+    finally:
+        _CURRENT.reset(token)
+
+    header = timings.header()
+    assert header.startswith("birdeye_volume;dur=")
+    assert 'desc="2x"' in header
+    assert "score;dur=2.0" in header
+    assert header.rsplit(", ", 1)[1].startswith("total;dur=")
+    assert timings.as_dict()["stages"]["birdeye_volume"]["count"] == 2
+
+
+def test_analyze_enriched_emite_server_timing(monkeypatch):
+    async def fake_llm(tokens):
+        await asyncio.sleep(0.01)
+        return [{"tokenAddress": t.get("tokenAddress"), "decision": "WATCH"} for t in tokens]
+
+    monkeypatch.setattr("app.routers.signals.analyze_tokens_async", fake_llm)
+    app.dependency_overrides[get_solscan] = lambda: FakeSolscan()
+    app.dependency_overrides[get_birdeye] = lambda: FakeBirdeye()
+    try:
+        client = TestClient(app)
+        r = client.get("/signals/solana/analyze_enriched/MintTiming111")
+        assert r.status_code == 200
+        names = [p.split(";", 1)[0] for p in r.headers["server-timing"].split(", ")]
+        for name in ("solscan", "birdeye_overview", "birdeye_volume", "birdeye_trades", "score", "gpt", "total"):
+            assert name in names
+        assert "_timings" not in r.json()
+
+        body = client.get("/signals/solana/analyze_enriched/MintTiming111", params={"debug": "true"}).json()
+        assert body["analysis"]["decision"] == "WATCH"
+        assert body["_timings"]["stages"]["solscan"]["ms"] >= 5
+        assert body["_timings"]["total_ms"] >= body["_timings"]["stages"]["gpt"]["ms"]
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_rotas_sem_etapas_nao_ganham_header():
+    r = TestClient(app).get("/health")
+    assert "server-timing" not in r.headers
@@ -0,0 +1,66 @@
+import json
+
+from app.models.signal_model import Signal
+from app.routers.responses import signals_response
+from app.utils.solana_normalizer import merge_birdeye_into_snapshot, normalize_solscan_meta_to_snapshot
+
+
+def _snapshot():
+    snap = normalize_solscan_meta_to_snapshot(
+        {"symbol": "AAA", "holder": 900, "website": "https://a", "telegram": "https://t.me/a"}, "mint1"
+    )
+    snap["links"].append({"type": "medium", "url": "https://m"})
+    return merge_birdeye_into_snapshot(
+        snap,
+        {"data": {"liquidity": 20_000, "market_cap": 300_000, "fdv": 310_000}},
+        {"data": {"points": [{"unixTime": 1, "volume_quote": 2_000, "buy": 30, "sell": 10}]}},
+        {"data": {"buyers": 12, "sellers": 4}},
+    )
+
+
+# Saída esperada fixa (mesmos valores do conversor antigo da rota /signals, mais os
+# campos que ele deixava de fora): compara com algo que não vem do mesmo mapa
+EXPECTED = {
+    "tokenAddress": "mint1",
+    "chainId": 101,
+    "url": "https://solscan.io/token/mint1",
+    "icon": None,
+    "header": "AAA",
+    "description": "",
+    "links": [{"type": "website", "url": "https://a"}, {"type": "telegram", "url": "https://t.me/a"}],
+    "status": "partial",
+    "failed": [],
+    "decision": None,
+    "confidence": None,
+    "rationale": None,
+    "name": None,
+    "symbol": None,
+    "ageMinutes": None,
+    "ageSeconds": None,
+    "priceUSD": None,
+    "liquidityUSD": 20000.0,
+    "mcapUSD": 300000.0,
+    "fdvUSD": 310000.0,
+    "volumeUSD_5m": 2000.0,
+    "volumeUSD_1h": 2000.0,
+    "volumeUSD_24h": None,
+    "volumeH24": None,
+    "txnsBuy_5m": 30,
+    "txnsSell_5m": 10,
+    "buyers_5m": 12,
+    "sellers_5m": 4,
+    "txnsBuy_24h": None,
+    "txnsSell_24h": None,
+    "buySellRatio_24h": None,
+    "score_local": 51.38,
+    "classification": "discard",
+    "flags": [],
+}
+
+
+def test_caminho_rapido_gera_o_json_esperado():
+    fast = Signal.from_solana_snapshot(_snapshot())
+
+    assert fast.model_dump(mode="json") == EXPECTED
+    assert json.loads(signals_response([fast]).body) == [EXPECTED]
+    assert isinstance(fast.txnsBuy_5m, int)
@@ -0,0 +1,81 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import signals as sig_router
+
+
+class FakeSolscan:
+    async def token_meta(self, mint):
+        return {"symbol": mint.upper(), "holder": 500, "website": "https://x"}
+
+
+class FakeBirdeye:
+    async def overview_many_with_fallback(self, mints, chain="solana"):
+        return {}
+
+    async def overview_with_fallback(self, mint, chain="solana"):
+        # "lento" termina por último: o stream deve emitir os outros antes
+        await asyncio.sleep(0.2 if mint == "lento" else 0.01)
+        if mint == "quebrado":
+            raise RuntimeError("boom")
+        return {"data": {"liquidity": 10_000, "market_cap": 100_000}}, False
+
+    async def token_volume_points(self, mint, interval="5m", limit=12, chain="solana"):
+        return {"data": {"points": []}}
+
+    async def token_trades_recent(self, mint, limit=100, chain="solana"):
+        return {"data": {}}
+
+
+def _patch_clients(monkeypatch):
+    @asynccontextmanager
+    async def fake_sol(request):
+        yield FakeSolscan()
+
+    @asynccontextmanager
+    async def fake_be(request):
+        yield FakeBirdeye()
+
+    monkeypatch.setattr(sig_router, "open_solscan", fake_sol)
+    monkeypatch.setattr(sig_router, "open_birdeye", fake_be)
+
+
+def test_stream_ndjson_emite_por_ordem_de_conclusao_com_patches_do_llm(monkeypatch):
+    _patch_clients(monkeypatch)
+    monkeypatch.setattr(sig_router, "LLM_BATCH_SIZE", 2)
+
+    async def fake_llm(tokens):
+        return [{"tokenAddress": t["tokenAddress"], "decision": "entrada", "confidence": 70, "rationale": "ok"}
+                for t in tokens]
+
+    monkeypatch.setattr(sig_router, "analyze_tokens_async", fake_llm)
+
+    client = TestClient(app)
+    r = client.get("/signals", params={"mints": "lento,a,quebrado,b", "analyze": "true", "stream": "ndjson"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+
+    events = [json.loads(line) for line in r.text.splitlines() if line]
+    signals = [e["data"]["tokenAddress"] for e in events if e["event"] == "signal"]
+    decisions = [e["data"]["tokenAddress"] for e in events if e["event"] == "decision"]
+
+    assert signals[-1] == "lento" and sorted(signals) == ["a", "b", "lento"]
+    assert sorted(decisions) == ["a", "b", "lento"]
+    assert events[-1] == {"event": "done", "data": {"requested": 4, "signals": 3, "failed": 1, "decisions": 3}}
+
+
+def test_stream_sse_e_formato_invalido(monkeypatch):
+    _patch_clients(monkeypatch)
+    client = TestClient(app)
+
+    r = client.get("/signals", params={"mints": "a", "stream": "sse"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert r.text.startswith("event: signal\ndata: ")
+    assert "event: done\n" in r.text
+
+    assert client.get("/signals", params={"mints": "a", "stream": "xml"}).status_code == 400
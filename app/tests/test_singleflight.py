@@ -0,0 +1,197 @@
+import asyncio
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_chamadas_concorrentes_viram_uma():
+    sf = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"ok": True}
+
+    out = await asyncio.gather(*(sf.do("mint", upstream) for _ in range(20)))
+    assert len(calls) == 1
+    assert all(o == {"ok": True} for o in out)
+    assert sf.stats() == {"started": 1, "coalesced": 19, "in_flight": 0}
+
+    # Depois de concluída, a chave é liberada (não é cache)
+    await sf.do("mint", upstream)
+    assert len(calls) == 2
+
+
+async def test_excecao_propagada_para_todos():
+    sf = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("429")
+
+    out = await asyncio.gather(*(sf.do("k", upstream) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(o, RuntimeError) for o in out)
+
+
+async def test_cancelar_um_chamador_nao_derruba_os_outros():
+    sf = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.03)
+        return 42
+
+    a = asyncio.create_task(sf.do("k", upstream))
+    b = asyncio.create_task(sf.do("k", upstream))
+    await asyncio.sleep(0.005)
+    a.cancel()
+    assert await b == 42
+    with pytest.raises(asyncio.CancelledError):
+        await a
+
+
+async def test_todos_cancelados_cancela_upstream():
+    sf = SingleFlight()
+    started = asyncio.Event()
+    cancelled = []
+
+    async def upstream():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    t = asyncio.create_task(sf.do("k", upstream))
+    await started.wait()
+    t.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await t
+    await asyncio.sleep(0)
+    assert cancelled == [True]
+    assert sf.in_flight == 0
+
+
+class _RecordingLimiter:
+    def __init__(self):
+        self.priorities = []
+
+    async def acquire(self, path, priority=None):
+        from app.services.rate_limiter import current_priority
+
+        self.priorities.append(current_priority() if priority is None else priority)
+
+    def observe_headers(self, headers, path):
+        pass
+
+    def pause_for(self, seconds, path):
+        pass
+
+
+async def test_chamada_bulk_adquire_com_prioridade_bulk(monkeypatch):
+    import httpx
+    from app.services import birdeye_client as bc
+    from app.services.circuit_breaker import CircuitBreaker
+    from app.services.rate_limiter import PRIORITY_BULK, bulk_priority
+
+    limiter = _RecordingLimiter()
+    monkeypatch.setattr(bc, "BIRDEYE_DRY_RUN", False)
+    monkeypatch.setattr(bc, "BIRDEYE_BREAKER", CircuitBreaker())
+    monkeypatch.setattr(bc, "BIRDEYE_CACHE_TTLS", {})
+    monkeypatch.setattr(bc, "BIRDEYE_LIMITER", limiter)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"data": {"value": 1.0}})
+
+    be = bc.BirdeyeClient(api_key="k")
+    be._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    async with be:
+        with bulk_priority():
+            await be.price("BulkMint")
+    assert limiter.priorities == [PRIORITY_BULK]
+
+
+async def test_chamada_coalescida_sobe_para_prioridade_mais_urgente():
+    from app.services.rate_limiter import PRIORITY_BULK, PRIORITY_INTERACTIVE, bulk_priority, current_priority
+
+    sf = SingleFlight()
+    seen = []
+
+    async def upstream():
+        seen.append(current_priority())
+        await asyncio.sleep(0.02)
+        seen.append(current_priority())
+        return 1
+
+    async def bulk_caller():
+        with bulk_priority():
+            return await sf.do("k", upstream)
+
+    async def interactive_caller():
+        await asyncio.sleep(0.005)
+        return await sf.do("k", upstream)
+
+    assert await asyncio.gather(bulk_caller(), interactive_caller()) == [1, 1]
+    assert seen == [PRIORITY_BULK, PRIORITY_INTERACTIVE]
+
+    # Chamador bulk que entra depois não rebaixa a chamada interativa
+    seen.clear()
+
+    async def late_bulk():
+        await asyncio.sleep(0.005)
+        with bulk_priority():
+            return await sf.do("k", upstream)
+
+    assert await asyncio.gather(sf.do("k", upstream), late_bulk()) == [1, 1]
+    assert seen == [PRIORITY_INTERACTIVE, PRIORITY_INTERACTIVE]
+
+
+async def test_chamada_nao_herda_server_timing_do_primeiro_chamador():
+    from app.core import timing
+
+    sf = SingleFlight()
+    seen = []
+
+    async def upstream():
+        seen.append(timing.current_timings())
+        return 1
+
+    token = timing._CURRENT.set(timing.RequestTimings())
+    try:
+        assert await sf.do("k", upstream) == 1
+    finally:
+        timing._CURRENT.reset(token)
+    assert seen == [None]
+
+
+async def test_cliente_por_request_nao_empresta_chamada_a_outro(monkeypatch):
+    import httpx
+    from app.services import birdeye_client as bc
+    from app.services.circuit_breaker import CircuitBreaker
+
+    monkeypatch.setattr(bc, "BIRDEYE_DRY_RUN", False)
+    monkeypatch.setattr(bc, "BIRDEYE_BREAKER", CircuitBreaker())
+    monkeypatch.setattr(bc, "BIRDEYE_CACHE_TTLS", {})
+    hits = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        hits.append(request.url.path)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json={"data": {"value": 1.0}})
+
+    a = bc.BirdeyeClient(api_key="k")
+    b = bc.BirdeyeClient(api_key="k")
+    a._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    b._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    async with a, b:
+        task_a = asyncio.create_task(a.price("SFMint"))
+        await asyncio.sleep(0.005)
+        task_b = asyncio.create_task(b.price("SFMint"))
+        await asyncio.sleep(0)
+        await a.aclose()  # request de A terminou antes; B segue no próprio cliente
+        assert (await task_b)["data"]["value"] == 1.0
+        await asyncio.gather(task_a, return_exceptions=True)
+    assert len(hits) == 2
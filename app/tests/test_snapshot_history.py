@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from app.database.db import SnapshotStore
+from app.services.snapshot_history import SnapshotWriter
+
+pytestmark = pytest.mark.asyncio
+
+
+def _snap(mint, score, liq=1_000.0):
+    return {
+        "tokenAddress": mint,
+        "score_local": score,
+        "classification": "watchlist",
+        "flags": ["low_liq", "low_volume_5m"],
+        "liquidityUSD": liq,
+        "volumeUSD_1h": 50.0,
+        "buySellPressure_5m": 0.25,
+        "description": "não vai para o histórico",
+    }
+
+
+async def test_store_ultimo_por_mint_e_historico_por_intervalo(tmp_path):
+    store = SnapshotStore(str(tmp_path / "s.db"))
+    store.put_many([
+        ("A", 100.0, _snap("A", 10)),
+        ("A", 200.0, _snap("A", 20)),
+        ("A", 300.0, _snap("A", 30)),
+        ("B", 150.0, _snap("B", 5, liq=None)),
+    ])
+
+    latest = store.latest_many(["A", "B", "C"])
+    assert set(latest) == {"A", "B"}
+    assert latest["A"]["ts"] == 300.0 and latest["A"]["score_local"] == 30
+    assert latest["B"]["liquidityUSD"] is None
+    assert latest["A"]["flags"] == ["low_liq", "low_volume_5m"] and "description" not in latest["A"]
+
+    hist = store.history("A", since=150.0, until=300.0)
+    assert [h["score_local"] for h in hist] == [20, 30]
+    # limit corta pelos mais antigos: ficam os mais recentes, ainda em ordem crescente
+    assert [h["ts"] for h in store.history("A", limit=2)] == [200.0, 300.0]
+    assert store.purge_older_than(250.0) == 3
+    assert [h["ts"] for h in store.history("A")] == [300.0]
+
+
+async def test_writer_grava_em_lote_e_descarrega_no_stop(tmp_path):
+    store = SnapshotStore(str(tmp_path / "w.db"))
+    writer = SnapshotWriter(store_factory=lambda: store, batch_size=50, flush_interval=10, max_queue=120)
+
+    assert writer.record(_snap("X", 1)) is False  # parado: não enfileira
+    writer.start()
+    now = time.time()  # dentro da retenção: o expurgo do 1º lote não pode apagar nada
+    for i in range(130):
+        writer.record(_snap(f"m{i}", i), ts=now - 130 + i)
+    assert writer.stats()["dropped"] == 10
+
+    await writer.stop()
+    assert writer.written == 120
+    assert len(store.latest_many([f"m{i}" for i in range(130)])) == 120
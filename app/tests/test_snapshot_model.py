@@ -0,0 +1,44 @@
+import copy
+
+from app.models.signal_model import Signal
+from app.models.snapshot import Snapshot, snapshot_to_dict
+from app.utils.solana_normalizer import merge_birdeye_into_snapshot, normalize_solscan_meta_to_snapshot
+
+
+def test_snapshot_se_comporta_como_dict():
+    s = Snapshot({"tokenAddress": "m", "holders": None, "birdeyeStatus": {"overview": "ok"}})
+
+    assert s["holders"] is None and "holders" in s
+    assert "liquidityUSD" not in s and s.get("liquidityUSD", 1) == 1
+    assert s == {"tokenAddress": "m", "holders": None, "birdeyeStatus": {"overview": "ok"}}
+    assert list(s) == ["tokenAddress", "holders", "birdeyeStatus"] and len(s) == 3
+
+    s["flags"] = ["x"]
+    del s["holders"]
+    assert s.to_dict() == {"tokenAddress": "m", "flags": ["x"], "birdeyeStatus": {"overview": "ok"}}
+
+    c = copy.copy(s)
+    c["flags"] = []
+    c["solscanError"] = "boom"
+    assert s["flags"] == ["x"] and "solscanError" not in s
+
+
+def test_pipeline_com_snapshot_mantem_o_formato_do_dict():
+    snap = normalize_solscan_meta_to_snapshot({"symbol": "AAA", "holder": 900, "website": "https://a"}, "mint1")
+    assert isinstance(snap, Snapshot)
+
+    snap = merge_birdeye_into_snapshot(
+        snap,
+        {"data": {"liquidity": 20_000, "market_cap": 300_000}},
+        {"data": {"points": [{"volume_quote": 2_000, "buy": 30, "sell": 10}]}},
+        {"data": {"buyers": 12, "sellers": 4}},
+    )
+    snap["birdeyeStatus"] = {"overview": "ok"}
+    d = snapshot_to_dict(snap)
+
+    assert d["header"] == "AAA" and d["lpLockedPct"] is None
+    assert d["volumeUSD_5m"] == 2_000 and d["buySellPressure_5m"] == 0.5
+    assert {"score_local", "score_breakdown", "flags", "classification", "birdeyeStatus"} <= set(d)
+
+    sig = Signal.from_solana_snapshot(snap)
+    assert sig.tokenAddress == "mint1" and sig.liquidityUSD == 20_000 and sig.flags == d["flags"]
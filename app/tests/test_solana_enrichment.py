@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+
+from app.services.birdeye_client import BirdeyeAuthOrPlanError
+from app.services.solana_enrichment import enrich_mints
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeSolscan:
+    async def token_meta(self, mint):
+        await asyncio.sleep(0.01)
+        if mint == "sem_meta":
+            return {}
+        return {"symbol": mint.upper(), "holder": 500, "website": "https://x"}
+
+
+class FakeBirdeye:
+    def __init__(self):
+        self.per_mint_overviews = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _call(self, mint):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            self.in_flight -= 1
+        if mint == "quebrado":
+            raise RuntimeError("boom")
+
+    async def overview_with_fallback(self, mint, chain="solana"):
+        self.per_mint_overviews.append(mint)
+        await self._call(mint)
+        return {"data": {"liquidity": 10_000, "market_cap": 100_000}}, False
+
+    async def overview_many_with_fallback(self, mints, chain="solana"):
+        await asyncio.sleep(0.01)
+        # Simula lote via multi_price (fallback) que não trouxe o mint "c"
+        return {m: ({"data": {"liquidity": 7_000}}, True) for m in mints if m != "c"}
+
+    async def token_volume_points(self, mint, interval="5m", limit=12, chain="solana"):
+        await self._call("ok")
+        raise BirdeyeAuthOrPlanError("403")
+
+    async def token_trades_recent(self, mint, limit=100, chain="solana"):
+        await self._call("ok")
+        return {"data": {"buyers": 3, "sellers": 1}}
+
+
+async def test_enrich_mints_preserva_ordem_e_isola_falhas():
+    be = FakeBirdeye()
+    mints = ["a", "quebrado", "b", "sem_meta", "c"]
+    out = await enrich_mints(FakeSolscan(), be, mints, concurrency=2, batch_overview=False)
+
+    assert [s["tokenAddress"] if s else None for s in out] == ["a", None, "b", None, "c"]
+    assert out[0]["liquidityUSD"] == 10_000
+    assert out[0]["buyers_5m"] == 3
+    assert out[0]["birdeyeFallbackFromOverview"] is False
+
+
+async def test_enrich_mints_respeita_limite_de_concorrencia():
+    be = FakeBirdeye()
+    await enrich_mints(FakeSolscan(), be, [f"m{i}" for i in range(10)], concurrency=2, batch_overview=False)
+    # 2 mints em voo x 3 chamadas Birdeye paralelas por mint
+    assert 3 < be.max_in_flight <= 6
+
+
+async def test_enrich_mints_usa_overview_em_lote_com_fallback_por_mint():
+    be = FakeBirdeye()
+    out = await enrich_mints(FakeSolscan(), be, ["a", "b", "c"], concurrency=4, batch_overview=True)
+
+    assert be.per_mint_overviews == ["c"]
+    assert out[0]["liquidityUSD"] == 7_000 and out[0]["birdeyeFallbackFromOverview"] is True
+    assert out[2]["liquidityUSD"] == 10_000 and out[2]["birdeyeFallbackFromOverview"] is False
+
+
+async def test_birdeye_lote_divide_em_blocos_e_cai_para_multi_price(monkeypatch):
+    from app.services import birdeye_client as bc
+
+    monkeypatch.setattr(bc, "BIRDEYE_DRY_RUN", False)
+    monkeypatch.setattr(bc, "MARKET_DATA_MULTIPLE_MAX", 20)
+    monkeypatch.setattr(bc, "MULTI_PRICE_MAX", 100)
+    calls = []
+
+    async def fake_get(self, path, params=None):
+        addrs = params["list_address"].split(",")
+        calls.append((path, len(addrs)))
+        if path == "/defi/v3/token/market-data/multiple":
+            raise bc.BirdeyeAuthOrPlanError("401")
+        return {"data": {a: {"value": 1.0, "liquidity": 5_000} for a in addrs}}
+
+    monkeypatch.setattr(bc.BirdeyeClient, "_get", fake_get)
+    be = bc.BirdeyeClient(api_key="x")
+    mints = [f"m{i}" for i in range(150)]
+    out = await be.overview_many_with_fallback(mints)
+
+    assert len(out) == 150
+    assert all(used_fallback for (_, used_fallback) in out.values())
+    assert sorted(n for p, n in calls if p == "/defi/multi_price") == [50, 100]
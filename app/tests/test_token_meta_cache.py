@@ -0,0 +1,85 @@
+import pytest
+
+from app.database.db import TokenMetaStore
+from app.services import solscan_client as sc
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_store_ttl_e_cache_negativo(tmp_path):
+    store = TokenMetaStore(str(tmp_path / "t.db"), ttl=60, negative_ttl=0)
+    assert store.get("A") is None
+
+    store.put("A", {"symbol": "AAA"})
+    assert store.get("A") == {"symbol": "AAA"}
+
+    store.put("B", {})              # negativo, já expirado (negative_ttl=0)
+    assert store.get("B") is None
+    store.negative_ttl = 60
+    assert store.get("B") == {}
+
+
+async def test_token_meta_memoriza_versao_e_usa_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(sc, "DRY_RUN", False)
+    monkeypatch.setattr(sc, "SOLSCAN_META_CACHE", True)
+    monkeypatch.setattr(sc, "_META_STORE", TokenMetaStore(str(tmp_path / "m.db")))
+    monkeypatch.setattr(sc, "_META_VERSION", {})
+    calls = []
+
+    async def fake_get_json(self, url, params):
+        calls.append(url.rsplit("/v", 1)[1])
+        if "/v2.0/" in url:
+            return 401, {"error_message": "plano"}
+        mint = params["tokenAddress"]
+        return (200, {"data": {"symbol": mint}}) if mint != "nada" else (404, {})
+
+    monkeypatch.setattr(sc.SolscanClient, "_get_json", fake_get_json)
+    cli = sc.SolscanClient()
+    try:
+        assert await cli.token_meta("A") == {"symbol": "A"}
+        assert await cli.token_meta("B") == {"symbol": "B"}
+        # v2.0 (401) só é tentada uma vez; depois vai direto na v1.0
+        assert calls == ["2.0/token/meta", "1.0/token/meta", "1.0/token/meta"]
+
+        # Segunda leitura vem do SQLite, sem rede
+        assert await cli.token_meta("A") == {"symbol": "A"}
+        assert len(calls) == 3
+
+        # Mint inexistente: cache negativo
+        assert await cli.token_meta("nada") == {}
+        assert await cli.token_meta("nada") == {}
+        assert len(calls) == 4
+    finally:
+        await cli.close()
+
+
+async def test_token_meta_401_na_v1_nao_vira_cache_negativo(tmp_path, monkeypatch):
+    store = TokenMetaStore(str(tmp_path / "m.db"))
+    monkeypatch.setattr(sc, "DRY_RUN", False)
+    monkeypatch.setattr(sc, "SOLSCAN_META_CACHE", True)
+    monkeypatch.setattr(sc, "_META_STORE", store)
+    monkeypatch.setattr(sc, "_META_VERSION", {})
+    calls = []
+
+    async def fake_get_json(self, url, params):
+        calls.append(url.rsplit("/v", 1)[1])
+        return 401, {"error_message": "chave inválida"}
+
+    monkeypatch.setattr(sc.SolscanClient, "_get_json", fake_get_json)
+    cli = sc.SolscanClient()
+    try:
+        assert await cli.token_meta("A") == {}
+        assert store.get("A") is None
+        # Falha de auth memorizada na chave: outros mints nem vão à rede
+        assert await cli.token_meta("B") == {}
+        assert calls == ["2.0/token/meta", "1.0/token/meta"]
+
+        # Passado o recheck, a chave volta a ser testada e o mint não ficou preso no cache
+        async def ok(self, url, params):
+            return 200, {"data": {"symbol": params.get("address") or params.get("tokenAddress")}}
+
+        monkeypatch.setattr(sc, "SOLSCAN_VERSION_RECHECK", 0)
+        monkeypatch.setattr(sc.SolscanClient, "_get_json", ok)
+        assert await cli.token_meta("A") == {"symbol": "A"}
+    finally:
+        await cli.close()
@@ -0,0 +1,52 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.utils.solana_normalizer import attach_local_scoring
+from app.utils.vector_scoring import attach_scores, decode_flags, score_snapshots
+
+
+def _random_snapshot(rnd: random.Random, i: int):
+    def maybe(v):
+        return None if rnd.random() < 0.15 else v
+
+    return {
+        "tokenAddress": f"m{i}",
+        "liquidityUSD": maybe(rnd.choice([0, rnd.uniform(0, 80_000)])),
+        "mcapUSD": maybe(rnd.uniform(0, 5_000_000)),
+        "fdvUSD": maybe(rnd.uniform(0, 20_000_000)),
+        "holders": maybe(rnd.randint(0, 8_000)),
+        "ageMinutes": maybe(rnd.choice([rnd.randint(0, 2_000), rnd.uniform(0, 600)])),
+        "volumeUSD_5m": maybe(rnd.uniform(0, 60_000)),
+        "buySellPressure_5m": maybe(rnd.uniform(-1, 1)),
+        "mintAuthorityDisabled": rnd.random() < 0.8,
+        "freezeAuthorityDisabled": rnd.random() < 0.8,
+        "links": rnd.choice([[], [{"type": "website", "url": "https://x"}], [{"type": "medium", "url": "https://y"}]]),
+    }
+
+
+def test_vetorizado_identico_ao_caminho_por_dict():
+    rnd = random.Random(7)
+    snaps = [_random_snapshot(rnd, i) for i in range(5_000)]
+    expected = [attach_local_scoring(dict(s)) for s in snaps]
+    got = attach_scores([dict(s) for s in snaps])
+
+    for e, g in zip(expected, got):
+        assert g["score_local"] == e["score_local"]
+        assert g["score_breakdown"] == e["score_breakdown"]
+        assert g["flags"] == e["flags"]
+        assert g["classification"] == e["classification"]
+
+
+def test_resultado_em_colunas():
+    res = score_snapshots([
+        {"liquidityUSD": 100_000, "mcapUSD": 1_000_000, "holders": 10_000, "ageMinutes": 600,
+         "volumeUSD_5m": 100_000, "buySellPressure_5m": 1.0, "mintAuthorityDisabled": True,
+         "freezeAuthorityDisabled": True, "links": [{"type": "twitter", "url": "https://t"}]},
+        {},
+    ])
+    assert res.breakdown.shape == (2, 8)
+    assert list(res.labels) == ["high_potential", "discard"]
+    assert decode_flags(res.flags[0]) == []
+    assert "mint_enabled" in decode_flags(res.flags[1])
@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.watchlist import WATCHLIST, Watchlist, WatchlistFullError
+
+
+class FakeSolscan:
+    def __init__(self):
+        self.calls = 0
+
+    async def token_meta(self, mint):
+        self.calls += 1
+        if mint == "sem_meta":
+            return {}
+        return {"symbol": mint.upper(), "holder": 500, "website": "https://x"}
+
+
+class FakeBirdeye:
+    def __init__(self, liquidity=10_000, down=False):
+        self.liquidity = liquidity
+        self.down = down
+
+    async def overview_many_with_fallback(self, mints, chain="solana"):
+        if self.down:
+            return {}
+        return {m: ({"data": {"liquidity": self.liquidity, "market_cap": 100_000}}, False) for m in mints}
+
+    async def overview_with_fallback(self, mint, chain="solana"):
+        if self.down:
+            raise RuntimeError("birdeye fora")
+        return {"data": {"liquidity": self.liquidity, "market_cap": 100_000}}, False
+
+    async def token_volume_points(self, mint, interval="5m", limit=12, chain="solana"):
+        return {"data": {"points": []}}
+
+    async def token_trades_recent(self, mint, limit=100, chain="solana"):
+        return {"data": {}}
+
+
+@pytest.mark.asyncio
+async def test_refresh_mantem_snapshot_anterior_quando_falha():
+    wl = Watchlist(interval=60)
+    wl.add("a")
+    wl.add("sem_meta")
+    sol = FakeSolscan()
+
+    assert await wl.refresh_once(sol, FakeBirdeye()) == 2
+    snap = wl.get("a")
+    assert snap["liquidityUSD"] == 10_000
+    assert snap["freshness"]["source"] == "watchlist" and snap["freshness"]["ageSeconds"] < 1
+    assert snap["birdeyeStatus"] == {"overview": "ok", "volume": "ok", "trades": "ok"}
+    # Sem meta na Solscan: servido como a rota ao vivo serviria (só Birdeye)
+    assert wl.get("sem_meta")["solscanLimitedPlan"] is True
+
+    # Ninguém vencido: leituras não geram chamadas upstream
+    calls = sol.calls
+    assert await wl.refresh_once(sol, FakeBirdeye()) == 0
+    for _ in range(100):
+        wl.get("a")
+    assert sol.calls == calls
+
+    # Refresh forçado com liquidez nova
+    await wl.refresh_once(sol, FakeBirdeye(liquidity=20_000), mints=["a"])
+    assert wl.get("a")["liquidityUSD"] == 20_000
+
+    # Birdeye fora: mantém o snapshot anterior e registra o erro
+    assert await wl.refresh_once(sol, FakeBirdeye(down=True), mints=["a"]) == 0
+    snap = wl.get("a")
+    assert snap["liquidityUSD"] == 20_000
+    assert snap["freshness"]["lastError"] == "birdeye_overview error: RuntimeError"
+
+
+@pytest.mark.asyncio
+async def test_loop_coleta_mint_recem_adicionado_sem_esperar_intervalo():
+    wl = Watchlist(interval=3600)
+    wl.start(FakeSolscan(), FakeBirdeye())
+    try:
+        await asyncio.sleep(0.01)
+        wl.add("novo")
+        for _ in range(50):
+            if wl.get("novo"):
+                break
+            await asyncio.sleep(0.01)
+        assert wl.get("novo") is not None
+    finally:
+        await wl.stop()
+
+
+def test_limite_de_mints():
+    wl = Watchlist(max_mints=1)
+    assert wl.add("a") is True
+    assert wl.add("a") is False
+    with pytest.raises(WatchlistFullError):
+        wl.add("b")
+
+
+def test_rotas_watchlist_e_snapshot_enriched_da_memoria():
+    client = TestClient(app)
+    try:
+        assert client.post("/watchlist/mintX").status_code == 201
+        assert client.get("/watchlist/mintX").status_code == 503
+
+        asyncio.run(WATCHLIST.refresh_once(FakeSolscan(), FakeBirdeye(), mints=["mintX"]))
+
+        r = client.get("/signals/solana/snapshot_enriched/mintX")
+        assert r.status_code == 200
+        assert r.json()["freshness"]["source"] == "watchlist"
+        assert r.json()["birdeyeStatus"]["overview"] == "ok"
+        assert client.get("/watchlist").json()["mints"][0]["hasSnapshot"] is True
+
+        assert client.delete("/watchlist/mintX").status_code == 200
+        assert client.delete("/watchlist/mintX").status_code == 404
+    finally:
+        WATCHLIST.clear()
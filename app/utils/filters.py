@@ -1,6 +1,12 @@
 # app/utils/filters.py
-from typing import Dict, Optional, List
+import os
 import re
+import time
+from typing import Any, Dict, Iterable, Optional, List
+
+from app.core.log import get_logger
+
+log = get_logger(__name__)
 
 # ---------- thresholds (afrouxe conforme necessário) ----------
 MAX_TOKEN_AGE_SECONDS = 30 * 24 * 60 * 60  # 30 dias
@@ -9,14 +15,78 @@ MIN_BUYERS_24H       = 5
 MIN_BUY_SELL_RATIO   = 1.0
 
 REQUIRED_LINK_TYPES = {"twitter", "telegram", "website", "discord", "x"}
-BLACKLIST_PATTERNS = [
-    re.compile(r"\btest\b", re.I),
-    re.compile(r"\brug\b", re.I),
-    re.compile(r"\bscam\b", re.I),
-    re.compile(r"\bairdrop\b", re.I),
-    re.compile(r"\bpump\b", re.I),
-    re.compile(r"\bdev\s+is\s+gone\b", re.I),
+# Termos proibidos na descrição (regex, sem \b — a borda de palavra é aplicada no conjunto)
+DEFAULT_BLACKLIST = [
+    r"test",
+    r"rug",
+    r"scam",
+    r"airdrop",
+    r"pump",
+    r"dev\s+is\s+gone",
 ]
+# Arquivo opcional (um padrão por linha, '#' comenta); recarregado quando o mtime muda
+FILTER_BLACKLIST_FILE = os.getenv("FILTER_BLACKLIST_FILE", "")
+FILTER_BLACKLIST_RELOAD_SECONDS = float(os.getenv("FILTER_BLACKLIST_RELOAD_SECONDS", "5"))
+
+
+class Blacklist:
+    """
+    Todos os padrões compilados numa única alternação: \b(?:p1|p2|...)\b, case-insensitive.
+    Uma varredura por descrição em vez de uma por padrão.
+    Com `path`, o arquivo é relido (no máximo a cada `reload_seconds`) quando o mtime muda;
+    padrão inválido no arquivo mantém a lista anterior.
+    `version` sobe a cada troca de lista: quem memoriza avaliações (ex.: DexIngester)
+    compara para saber quando reavaliar.
+    """
+
+    def __init__(self, patterns: Iterable[str] = DEFAULT_BLACKLIST, path: str = FILTER_BLACKLIST_FILE,
+                 reload_seconds: float = FILTER_BLACKLIST_RELOAD_SECONDS):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self.version = 0
+        self.set_patterns(patterns)
+        self.maybe_reload(force=True)
+
+    def set_patterns(self, patterns: Iterable[str]) -> None:
+        pats = [p.strip() for p in patterns if p and p.strip()]
+        regex = re.compile(r"\b(?:" + "|".join(f"(?:{p})" for p in pats) + r")\b", re.I) if pats else None
+        self.patterns, self._regex = pats, regex
+        self.version += 1
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """Relê o arquivo se ele mudou. True se a lista foi trocada."""
+        if not self.path:
+            return False
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_seconds:
+            return False
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return False
+            with open(self.path, encoding="utf-8") as f:
+                lines = [ln.strip() for ln in f if ln.strip() and not ln.lstrip().startswith("#")]
+            self.set_patterns(lines)
+            self._mtime = mtime
+            return True
+        except (OSError, re.error) as e:
+            log.warning("Blacklist não recarregada", stage="screen", path=self.path, error=str(e))
+            return False
+
+    def search(self, text: str, *, reload: bool = True) -> Optional[str]:
+        """Primeiro termo proibido encontrado em `text` (None se limpo)."""
+        if reload:
+            self.maybe_reload()
+        if self._regex is None or not text:
+            return None
+        m = self._regex.search(text)
+        return m.group(0) if m else None
+
+
+BLACKLIST = Blacklist()
 
 def _to_int(x, default=0) -> int:
     try:
@@ -70,20 +140,20 @@ def has_good_buy_sell_ratio(t: Dict) -> Optional[bool]:
         return True if buys > 0 else None
     return (buys / max(1, sells)) >= MIN_BUY_SELL_RATIO
 
-def has_clean_description(t: Dict) -> Optional[bool]:
+def has_clean_description(t: Dict, *, reload: bool = True) -> Optional[bool]:
     desc = t.get("description")
     if desc is None: return None
-    return not any(p.search(desc) for p in BLACKLIST_PATTERNS)
+    return BLACKLIST.search(desc, reload=reload) is None
 
 # ---------- avaliação principal ----------
-def evaluate_token(t: Dict) -> Optional[Dict]:
+def _screen(t: Dict, *, reload: bool = True) -> Dict[str, Any]:
     checks = {
         "idade":          is_recent(t),
         "volume":         has_good_volume(t),
         "links":          has_official_links(t),
         "compradores":    has_active_buyers(t),
         "buy_sell_ratio": has_good_buy_sell_ratio(t),
-        "descricao":      has_clean_description(t),
+        "descricao":      has_clean_description(t, reload=reload),
     }
     passed   = [k for k,v in checks.items() if v is True]
     failed   = [k for k,v in checks.items() if v is False]
@@ -94,25 +164,51 @@ def evaluate_token(t: Dict) -> Optional[Dict]:
         status = "rejected"
     else:
         status = "ok" if len(passed) >= 3 else ("partial" if len(passed) >= 2 else "rejected")
+    return {"status": status, "passed": passed, "failed": failed, "unknown": unknown, "checks": checks}
 
-    sym = t.get("symbol") or "???"
-    age = (t.get("age") or {}).get("seconds")
-    vol = (t.get("volume") or {}).get("h24")
-    h24 = (t.get("txns") or {}).get("h24") or {}
-    print(f"🔎 {sym}: idade={age} | volume=${vol} | buys={h24.get('buys')} | sells={h24.get('sells')} | "
-          f"status={status} | passou={passed} | falhou={failed} | desconhecido={unknown}")
+def screen_token(t: Dict) -> Dict[str, Any]:
+    """Resultado completo de um token (status + cada check), sem efeitos colaterais."""
+    return _screen(t)
 
-    if status == "rejected":
-        return None
+def screen_tokens(tokens: Iterable[Dict]) -> List[Dict[str, Any]]:
+    """
+    Lote: um resultado por token, na ordem de entrada. A blacklist é verificada
+    (hot-reload) uma vez por chamada, não por token.
+    """
+    BLACKLIST.maybe_reload()
+    return [_screen(t, reload=False) for t in tokens]
+
+def _attach(t: Dict, result: Dict[str, Any]) -> Optional[Dict]:
+    # Anexa a avaliação completa (a rota lê status/failed; quem quiser lê os checks)
+    t["__eval__"] = result
+    return None if result["status"] == "rejected" else t
 
-    # Anexa metadados de avaliação para a rota popular o seu modelo
-    t["__eval__"] = {"status": status, "failed": failed}
-    return t
+def evaluate_token(t: Dict) -> Optional[Dict]:
+    result = _screen(t)
+
+    if log.enabled():
+        h24 = (t.get("txns") or {}).get("h24") or {}
+        log.sample(
+            "Token avaliado",
+            mint=t.get("tokenAddress"),
+            stage="screen",
+            symbol=t.get("symbol"),
+            age_s=(t.get("age") or {}).get("seconds"),
+            volume_h24=(t.get("volume") or {}).get("h24"),
+            buys=h24.get("buys"),
+            sells=h24.get("sells"),
+            status=result["status"],
+            passed=result["passed"],
+            failed=result["failed"],
+            unknown=result["unknown"],
+        )
+
+    # Rejeitado também leva __eval__ (motivos sem recomputar), mas retorna None
+    return _attach(t, result)
 
 def filter_tokens(tokens: List[Dict]) -> List[Dict]:
     out: List[Dict] = []
-    for tk in tokens:
-        r = evaluate_token(tk)
-        if r:
-            out.append(r)
+    for tk, result in zip(tokens, screen_tokens(tokens)):
+        if _attach(tk, result) is not None:
+            out.append(tk)
     return out
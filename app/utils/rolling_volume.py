@@ -0,0 +1,159 @@
+# app/utils/rolling_volume.py
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+# Pontos de 5m do Birdeye (/defi/history/market-trades?type=5m)
+BUCKET_SECONDS = 300
+WINDOW_POINTS = 12            # 1h
+_WINDOWS = {"5m": 1, "15m": 3, "1h": 12}
+
+
+def _ts(point: Dict[str, Any]) -> Optional[int]:
+    ts = point.get("unixTime", point.get("unix_time"))
+    try:
+        return int(ts) if ts is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _f(x: Any) -> float:
+    try:
+        return float(x or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class VolumeWindow:
+    """
+    Ring buffer dos últimos `capacity` pontos de 5m de um mint, com somas correntes
+    de volume/buys/sells para as janelas 5m, 15m e 1h (leitura O(1)).
+
+    - push() com timestamp novo entra no fim; com o mesmo timestamp do último ponto
+      substitui o bucket em andamento (o Birdeye reenvia o ponto atual atualizado).
+    - Pontos mais antigos que o último são ignorados (já estão na janela).
+    - Sem timestamp nos pontos, extend() reconstrói a janela do zero.
+    """
+
+    __slots__ = ("capacity", "_vol", "_buy", "_sell", "_ts", "_head", "_size", "_sums", "_pushes")
+
+    def __init__(self, capacity: int = WINDOW_POINTS):
+        self.capacity = max(max(_WINDOWS.values()), int(capacity))
+        self._vol = [0.0] * self.capacity
+        self._buy = [0.0] * self.capacity
+        self._sell = [0.0] * self.capacity
+        self._ts: List[Optional[int]] = [None] * self.capacity
+        self._head = 0     # próxima posição de escrita
+        self._size = 0
+        # janela -> [volume, buys, sells]
+        self._sums = {w: [0.0, 0.0, 0.0] for w in _WINDOWS}
+        self._pushes = 0
+
+    @classmethod
+    def from_points(cls, points: Iterable[Dict[str, Any]], capacity: int = WINDOW_POINTS) -> "VolumeWindow":
+        w = cls(capacity)
+        w.extend(points)
+        return w
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        if not self._size:
+            return None
+        return self._ts[(self._head - 1) % self.capacity]
+
+    def _idx(self, back: int) -> int:
+        """Posição do ponto `back` passos atrás do último (0 = último)."""
+        return (self._head - 1 - back) % self.capacity
+
+    def _apply(self, idx: int, sign: float, windows) -> None:
+        v, b, s = self._vol[idx], self._buy[idx], self._sell[idx]
+        for w in windows:
+            acc = self._sums[w]
+            acc[0] += sign * v
+            acc[1] += sign * b
+            acc[2] += sign * s
+
+    def _recompute(self) -> None:
+        # Reancora as somas de tempos em tempos (evita deriva de ponto flutuante)
+        for w, n in _WINDOWS.items():
+            idxs = [self._idx(k) for k in range(min(n, self._size))][::-1]
+            self._sums[w] = [
+                float(sum(self._vol[i] for i in idxs)),
+                float(sum(self._buy[i] for i in idxs)),
+                float(sum(self._sell[i] for i in idxs)),
+            ]
+
+    def push(self, point: Dict[str, Any]) -> bool:
+        """Adiciona (ou atualiza) um ponto. Retorna False se ele já era antigo."""
+        ts = _ts(point)
+        last = self.last_ts
+        if ts is not None and last is not None and ts < last:
+            return False
+
+        if ts is not None and last is not None and ts == last:
+            # Bucket em andamento: tira o valor antigo de todas as janelas e grava o novo
+            idx = self._idx(0)
+            self._apply(idx, -1.0, _WINDOWS)
+        else:
+            # Ponto que sai de cada janela ao avançar um bucket
+            for w, n in _WINDOWS.items():
+                if self._size >= n:
+                    self._apply(self._idx(n - 1), -1.0, (w,))
+            idx = self._head
+            self._head = (self._head + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+        self._vol[idx] = _f(point.get("volume_quote"))
+        self._buy[idx] = _f(point.get("buy"))
+        self._sell[idx] = _f(point.get("sell"))
+        self._ts[idx] = ts
+        self._apply(idx, 1.0, _WINDOWS)
+
+        self._pushes += 1
+        if self._pushes % (self.capacity * 8) == 0:
+            self._recompute()
+        return True
+
+    def extend(self, points: Iterable[Dict[str, Any]]) -> int:
+        pts = list(points or [])
+        if pts and all(_ts(p) is None for p in pts):
+            self.clear()
+        elif all(_ts(p) is not None for p in pts):
+            pts.sort(key=_ts)
+        return sum(1 for p in pts if self.push(p))
+
+    def clear(self) -> None:
+        self.__init__(self.capacity)
+
+    def points_needed(self, now: Optional[float] = None) -> int:
+        """Quantos pontos pedir ao upstream: os buckets novos desde o último + o bucket em andamento."""
+        last = self.last_ts
+        if last is None:
+            return self.capacity
+        elapsed = int(((time.time() if now is None else now) - last) // BUCKET_SECONDS)
+        return max(1, min(self.capacity, elapsed + 1))
+
+    def sums(self, window: str) -> Dict[str, float]:
+        v, b, s = self._sums[window]
+        return {"volume": v, "buys": b, "sells": s}
+
+    def snapshot_fields(self) -> Dict[str, Any]:
+        """Campos volumeUSD_/txnsBuy_/txnsSell_ de 5m, 15m e 1h ({} se ainda não há pontos)."""
+        if not self._size:
+            return {}
+        out: Dict[str, Any] = {}
+        for w in _WINDOWS:
+            v, b, s = self._sums[w]
+            out[f"volumeUSD_{w}"] = v
+            out[f"txnsBuy_{w}"] = b
+            out[f"txnsSell_{w}"] = s
+        return out
+
+    def points(self) -> List[Dict[str, Any]]:
+        """Pontos em ordem cronológica (formato do Birdeye)."""
+        return [
+            {"unixTime": self._ts[i], "volume_quote": self._vol[i], "buy": self._buy[i], "sell": self._sell[i]}
+            for i in (self._idx(k) for k in range(self._size - 1, -1, -1))
+        ]
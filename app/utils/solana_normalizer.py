@@ -1,7 +1,14 @@
 # app/utils/solana_normalizer.py
+import math
+import time
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone
 
+from app.models.snapshot import Snapshot
+from app.utils.rolling_volume import VolumeWindow
+from app.core.metrics import STAGE_SCORE
+from app.core.timing import record
+
 def _to_iso(ts: Optional[int]) -> Optional[str]:
     if ts is None:
         return None
@@ -38,10 +45,11 @@ def _links_from_meta(meta: Dict[str, Any]) -> List[Dict[str, str]]:
     return out
 
 
-def normalize_solscan_meta_to_snapshot(meta: Dict[str, Any], mint: str) -> Dict[str, Any]:
+def normalize_solscan_meta_to_snapshot(meta: Dict[str, Any], mint: str) -> Snapshot:
     """
     Converte o JSON 'meta' da Solscan em um snapshot mínimo
     compatível com seu pipeline (usado pelo analyze_tokens).
+    Devolve um Snapshot (slots, interface de dict); to_dict() gera o JSON de sempre.
     """
     listed_iso = _to_iso(meta.get("first_trade_time") or meta.get("created_time"))
     age_min = _age_minutes(listed_iso)
@@ -67,6 +75,7 @@ def normalize_solscan_meta_to_snapshot(meta: Dict[str, Any], mint: str) -> Dict[
         "fdvUSD": None,
 
         "volumeUSD_5m": None,
+        "volumeUSD_15m": None,
         "volumeUSD_1h": None,
         "volumeUSD_24h": None,
 
@@ -103,7 +112,7 @@ def normalize_solscan_meta_to_snapshot(meta: Dict[str, Any], mint: str) -> Dict[
         "pairUrl": None,
         "chain": "sol",
     }
-    return snapshot
+    return Snapshot(snapshot)
     # <- MUITO IMPORTANTE
 
 
@@ -174,10 +183,14 @@ def merge_birdeye_into_snapshot(
     overview: Optional[Dict[str, Any]] = None,
     volume: Optional[Dict[str, Any]] = None,
     trades5m: Optional[Dict[str, Any]] = None,
+    window: Optional[VolumeWindow] = None,
 ) -> Dict[str, Any]:
     """
     Mescla dados do Birdeye (ou mocks) no snapshot já existente.
     Preenche liquidez, mcap/fdv, volumes e pressão de compra/venda.
+
+    `window`: janela de 5m já atualizada (mints vigiados, busca incremental). Quando
+    vem, os pontos e as somas 5m/15m/1h saem dela em vez de `volume`.
     """
     # Overview (liq / mcap / fdv / vol 24h)
     if overview and isinstance(overview, dict):
@@ -189,7 +202,10 @@ def merge_birdeye_into_snapshot(
 
     # Volume por pontos (ex.: série de 5m)
     pts = []
-    if volume and isinstance(volume, dict):
+    if window is not None and len(window):
+        # Somas correntes da janela: O(1), sem reler os pontos
+        snapshot.update(window.snapshot_fields())
+    elif volume and isinstance(volume, dict):
         d = volume.get("data") or {}
         pts = d.get("points") or []
 
@@ -199,13 +215,13 @@ def merge_birdeye_into_snapshot(
             snapshot["txnsBuy_5m"] = last.get("buy", snapshot.get("txnsBuy_5m"))
             snapshot["txnsSell_5m"] = last.get("sell", snapshot.get("txnsSell_5m"))
 
-        # volumeUSD_1h = soma dos últimos 12 pontos de 5m (ou de todos se < 12)
+        # volumeUSD_15m/1h e txns 15m/1h = somas dos últimos 3/12 pontos de 5m (ou de todos se menos)
         if pts:
-            take = pts[-12:] if len(pts) >= 12 else pts
             try:
-                snapshot["volumeUSD_1h"] = float(sum(float(p.get("volume_quote", 0) or 0) for p in take))
+                fields = VolumeWindow.from_points(pts[-12:]).snapshot_fields()
+                snapshot.update({k: v for k, v in fields.items() if not k.endswith("_5m")})
             except Exception:
-                snapshot["volumeUSD_1h"] = snapshot.get("volumeUSD_1h")
+                pass
 
     # Janela curta (5m) com agregados (se vierem por outro endpoint)
     if trades5m and isinstance(trades5m, dict):
@@ -242,11 +258,15 @@ def merge_birdeye_into_snapshot(
         snapshot["buySellPressure_5m"] = None
 
     # >>> NOVO: score local + flags + classificação
+    t0 = time.perf_counter()
     try:
         snapshot = attach_local_scoring(snapshot)
     except Exception:
         # Em caso de erro, seguimos devolvendo o enriched sem score
         pass
+    dt = time.perf_counter() - t0
+    STAGE_SCORE.observe(dt)
+    record("score", dt)
 
     return snapshot
 
@@ -267,7 +287,6 @@ def _zcurve(x: Optional[float], mid: float, width: float) -> float:
     if x is None:
         return 0.0
     # sigmoid ~ centrada em 'mid'
-    import math
     return 1.0 / (1.0 + math.exp(-((float(x) - mid) / max(1e-9, width))))
 
 def _has_socials(links: Optional[List[Dict[str, str]]]) -> bool:
@@ -316,6 +335,18 @@ def compute_flags(snapshot: Dict[str, Any]) -> List[str]:
 
     return flags
 
+# Pesos do score local (a ordem das chaves é a ordem da soma; ver app/utils/vector_scoring.py)
+SCORE_WEIGHTS: Dict[str, float] = {
+    "liq": 0.18,
+    "vol_5m": 0.16,
+    "pressure_5m": 0.16,
+    "cap_liq": 0.14,
+    "holders": 0.12,
+    "age": 0.08,
+    "authority": 0.08,
+    "socials": 0.08,
+}
+
 def compute_local_score(snapshot: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
     liq = snapshot.get("liquidityUSD") or 0
     mcap = snapshot.get("mcapUSD") or 0
@@ -339,16 +370,7 @@ def compute_local_score(snapshot: Dict[str, Any]) -> Tuple[float, Dict[str, floa
     n_authority = 1.0 if (mint_disabled and freeze_disabled) else 0.0
     n_socials   = 1.0 if social_ok else 0.0
 
-    W = {
-        "liq": 0.18,
-        "vol_5m": 0.16,
-        "pressure_5m": 0.16,
-        "cap_liq": 0.14,
-        "holders": 0.12,
-        "age": 0.08,
-        "authority": 0.08,
-        "socials": 0.08,
-    }
+    W = SCORE_WEIGHTS
     comp = {
         "liq": n_liq,
         "vol_5m": n_vol_5m,
@@ -0,0 +1,206 @@
+# app/utils/vector_scoring.py
+"""
+Scoring local em colunas (NumPy) para varreduras de universo e backtests.
+
+Mesma regra de compute_flags / compute_local_score / classify_token do
+solana_normalizer, mas para N snapshots de uma vez. O resultado é idêntico bit a bit
+ao caminho por dict:
+- os componentes são somados na mesma ordem de SCORE_WEIGHTS (sem matmul/BLAS);
+- a sigmoide da idade usa math.exp sobre os valores distintos (np.exp pode diferir
+  em 1 ulp); idade costuma ser minutos inteiros, então são poucos valores;
+- o arredondamento final usa o round() do Python (np.round não é correctly-rounded).
+"""
+import math
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.utils.solana_normalizer import SCORE_WEIGHTS, _has_socials
+
+# Bit i da máscara = FLAG_NAMES[i] (mesma ordem em que compute_flags anexa)
+FLAG_NAMES = (
+    "low_liq",
+    "low_holders",
+    "high_cap_liq",
+    "no_socials",
+    "too_new",
+    "weak_pressure",
+    "low_volume_5m",
+    "mint_enabled",
+    "freeze_enabled",
+    "high_fdv_vs_mcap",
+)
+FLAG_BITS = {name: 1 << i for i, name in enumerate(FLAG_NAMES)}
+_CRITICAL_MASK = FLAG_BITS["mint_enabled"] | FLAG_BITS["freeze_enabled"] | FLAG_BITS["too_new"]
+_BLOCK_HIGH_MASK = (
+    FLAG_BITS["low_liq"] | FLAG_BITS["weak_pressure"] | FLAG_BITS["low_volume_5m"] | FLAG_BITS["high_cap_liq"]
+)
+
+COMPONENTS = tuple(SCORE_WEIGHTS)          # colunas da matriz de breakdown
+CLASS_LABELS = np.array(["discard", "watchlist", "high_potential"])
+
+# snapshot -> coluna numérica (None vira NaN)
+_NUMERIC_FIELDS = {
+    "liquidity": "liquidityUSD",
+    "mcap": "mcapUSD",
+    "fdv": "fdvUSD",
+    "holders": "holders",
+    "age_minutes": "ageMinutes",
+    "volume_5m": "volumeUSD_5m",
+    "pressure_5m": "buySellPressure_5m",
+}
+
+
+class ScoreResult(NamedTuple):
+    score: np.ndarray       # (N,) float64, 0..100 com 2 casas
+    breakdown: np.ndarray   # (N, len(COMPONENTS)) float64, 0..1
+    flags: np.ndarray       # (N,) uint16, bitmask de FLAG_NAMES
+    labels: np.ndarray      # (N,) str, CLASS_LABELS
+
+
+def _num(v: Any) -> float:
+    if v is None:
+        return np.nan
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def columns_from_snapshots(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Extrai as colunas usadas no scoring (uma passada pelos dicts)."""
+    snaps = list(snapshots)
+    cols: Dict[str, np.ndarray] = {
+        name: np.fromiter((_num(s.get(field)) for s in snaps), dtype=np.float64, count=len(snaps))
+        for name, field in _NUMERIC_FIELDS.items()
+    }
+    cols["mint_disabled"] = np.fromiter((bool(s.get("mintAuthorityDisabled")) for s in snaps), dtype=bool, count=len(snaps))
+    cols["freeze_disabled"] = np.fromiter((bool(s.get("freezeAuthorityDisabled")) for s in snaps), dtype=bool, count=len(snaps))
+    cols["has_socials"] = np.fromiter((_has_socials(s.get("links")) for s in snaps), dtype=bool, count=len(snaps))
+    return cols
+
+
+def _minmax(x: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    return np.clip((x - lo) / (hi - lo), 0.0, 1.0)
+
+
+def _zcurve(x: np.ndarray, mid: float, width: float) -> np.ndarray:
+    uniq, inv = np.unique(x, return_inverse=True)
+    w = max(1e-9, width)
+    vals = np.fromiter((1.0 / (1.0 + math.exp(-((u - mid) / w))) for u in uniq.tolist()),
+                       dtype=np.float64, count=len(uniq))
+    return vals[inv.reshape(-1)]
+
+
+def score_columns(
+    liquidity: np.ndarray,
+    mcap: np.ndarray,
+    fdv: np.ndarray,
+    holders: np.ndarray,
+    age_minutes: np.ndarray,
+    volume_5m: np.ndarray,
+    pressure_5m: np.ndarray,
+    mint_disabled: np.ndarray,
+    freeze_disabled: np.ndarray,
+    has_socials: np.ndarray,
+) -> ScoreResult:
+    """
+    Score, breakdown, flags e classificação de N tokens numa passada.
+    Numéricos: float64 com NaN onde o snapshot tem None. Booleanos: arrays bool.
+    """
+    liq_raw = np.asarray(liquidity, dtype=np.float64)
+    mcap_raw = np.asarray(mcap, dtype=np.float64)
+    fdv_raw = np.asarray(fdv, dtype=np.float64)
+    holders_raw = np.asarray(holders, dtype=np.float64)
+    age_raw = np.asarray(age_minutes, dtype=np.float64)
+    vol_raw = np.asarray(volume_5m, dtype=np.float64)
+    press_raw = np.asarray(pressure_5m, dtype=np.float64)
+    mint_ok = np.asarray(mint_disabled, dtype=bool)
+    freeze_ok = np.asarray(freeze_disabled, dtype=bool)
+    socials = np.asarray(has_socials, dtype=bool)
+    n = liq_raw.shape[0]
+
+    # Mesma semântica do `x or 0` do caminho por dict
+    liq = np.nan_to_num(liq_raw, nan=0.0)
+    mcap0 = np.nan_to_num(mcap_raw, nan=0.0)
+    fdv0 = np.nan_to_num(fdv_raw, nan=0.0)
+    holders0 = np.nan_to_num(holders_raw, nan=0.0)
+    age0 = np.nan_to_num(age_raw, nan=0.0)
+    vol0 = np.nan_to_num(vol_raw, nan=0.0)
+    press0 = np.nan_to_num(press_raw, nan=0.0)
+    liq_nz = liq != 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cap_liq = np.where(liq_nz, mcap0 / np.where(liq_nz, liq, 1.0), np.nan)
+
+    # --- breakdown (0..1) ---
+    comp = {
+        "liq": _minmax(liq, 3_000, 50_000),
+        "vol_5m": _minmax(vol0, 1_500, 50_000),
+        "pressure_5m": np.clip((press0 + 1.0) / 2.0, 0.0, 1.0),
+        "cap_liq": 1.0 - _minmax(np.where(liq_nz, cap_liq, 9999.0), 60, 100),
+        "holders": _minmax(holders0, 200, 5_000),
+        "age": _zcurve(age0, mid=120, width=60),
+        "authority": (mint_ok & freeze_ok).astype(np.float64),
+        "socials": socials.astype(np.float64),
+    }
+    breakdown = np.empty((n, len(COMPONENTS)), dtype=np.float64)
+    score01 = np.zeros(n, dtype=np.float64)
+    for j, key in enumerate(COMPONENTS):
+        breakdown[:, j] = comp[key]
+        score01 += SCORE_WEIGHTS[key] * comp[key]
+    scaled = 100.0 * np.clip(score01, 0.0, 1.0)
+    score = np.fromiter((round(v, 2) for v in scaled.tolist()), dtype=np.float64, count=n)
+
+    # --- flags (bitmask) ---
+    liq_none = np.isnan(liq_raw)
+    mcap_truthy = mcap0 != 0
+    fdv_truthy = fdv0 != 0
+    bits = [
+        liq_none | (liq < 3000),
+        np.isnan(holders_raw) | (holders0 < 200),
+        liq_nz & mcap_truthy & (np.nan_to_num(cap_liq, nan=0.0) > 80),
+        ~socials,
+        ~np.isnan(age_raw) & (age0 < 30),
+        ~np.isnan(press_raw) & (press0 < -0.25),
+        np.isnan(vol_raw) | (vol0 < 1500),
+        ~mint_ok,
+        ~freeze_ok,
+        fdv_truthy & mcap_truthy & (fdv0 > 5 * mcap0),
+    ]
+    flags = np.zeros(n, dtype=np.uint16)
+    for i, b in enumerate(bits):
+        flags |= (b.astype(np.uint16) << np.uint16(i))
+
+    # --- classificação ---
+    critical = (flags & _CRITICAL_MASK) != 0
+    blocked = (flags & _BLOCK_HIGH_MASK) != 0
+    code = np.where(score >= 55, 1, 0)
+    code = np.where((score >= 72) & ~blocked, 2, code)
+    code = np.where(critical, 0, code)
+    return ScoreResult(score, breakdown, flags, CLASS_LABELS[code])
+
+
+def score_snapshots(snapshots: Iterable[Dict[str, Any]]) -> ScoreResult:
+    return score_columns(**columns_from_snapshots(snapshots))
+
+
+def decode_flags(mask: int) -> List[str]:
+    """Bitmask -> lista de flags, na mesma ordem do compute_flags."""
+    mask = int(mask)
+    return [name for i, name in enumerate(FLAG_NAMES) if mask & (1 << i)]
+
+
+def breakdown_dict(row: np.ndarray) -> Dict[str, float]:
+    return {key: float(v) for key, v in zip(COMPONENTS, row.tolist())}
+
+
+def attach_scores(snapshots: List[Dict[str, Any]], result: Optional[ScoreResult] = None) -> List[Dict[str, Any]]:
+    """Equivalente em lote a attach_local_scoring (preenche score_local/breakdown/flags/classification)."""
+    result = result if result is not None else score_snapshots(snapshots)
+    for i, snap in enumerate(snapshots):
+        snap["score_local"] = float(result.score[i])
+        snap["score_breakdown"] = breakdown_dict(result.breakdown[i])
+        snap["flags"] = decode_flags(result.flags[i])
+        snap["classification"] = str(result.labels[i])
+    return snapshots
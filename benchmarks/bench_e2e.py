@@ -0,0 +1,212 @@
+# benchmarks/bench_e2e.py
+"""
+Throughput ponta a ponta de /signals, sem rede externa: Birdeye, Solscan,
+DexScreener e OpenAI respondem pelo stub local (benchmarks/stub_upstreams.py),
+com latência sorteada e 429/5xx injetados.
+
+Para cada tamanho de lote (padrão 1, 10, 100, 1000 mints) dispara --requests
+chamadas a /signals?mints=... (mints inéditos por chamada, caches frios) e mede
+throughput, p50/p95/p99 por request e chamadas upstream por (upstream, rota, status).
+A saída é JSON (stdout e --out) para servir de baseline entre commits.
+
+    python -m benchmarks.bench_e2e
+    python -m benchmarks.bench_e2e --sizes 1,10,100 --analyze --dex \\
+        --latency "lognormal:25:0.5,openai=lognormal:600:0.3" --rate-429 0.02 --rate-5xx 0.01 \\
+        --out baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+PORT = int(os.getenv("STUB_PORT", "8766"))
+STUB = f"http://127.0.0.1:{PORT}"
+os.environ.setdefault("BIRDEYE_BASE_URL", STUB)
+os.environ.setdefault("SOLSCAN_BASE", STUB)
+os.environ.setdefault("DEX_PROFILES_URL", f"{STUB}/token-profiles/latest/v1")
+os.environ.setdefault("OPENAI_BASE_URL", f"{STUB}/v1")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("BIRDEYE_API_KEY", "bench")
+os.environ["DRY_RUN"] = "false"
+os.environ["BIRDEYE_DRY_RUN"] = "false"
+# Sem limite de plano do lado do cliente (o stub injeta 429 quando pedido) e sem tarefas de fundo
+os.environ.setdefault("BIRDEYE_RPS", "100000")
+os.environ.setdefault("WATCHLIST_ENABLED", "false")
+os.environ.setdefault("DEX_INGEST_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="memebot-bench-"), "memebot.db"))
+
+import httpx  # noqa: E402
+
+from app.main import app, lifespan  # noqa: E402
+from app.services.solana_enrichment import ENRICH_CONCURRENCY  # noqa: E402
+from benchmarks import stub_upstreams  # noqa: E402
+from benchmarks.stub_upstreams import StubServer  # noqa: E402
+
+
+def _pct(samples: List[float], p: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+def _git_rev() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def _calls_delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, Any]:
+    detail = {k: after[k] - before.get(k, 0) for k in sorted(after) if after[k] - before.get(k, 0)}
+    by_upstream: Counter = Counter()
+    by_status: Counter = Counter()
+    for key, n in detail.items():
+        upstream, _, status = key.split(" ")
+        by_upstream[upstream] += n
+        by_status[status] += n
+    return {
+        "total": sum(detail.values()),
+        "by_upstream": dict(by_upstream),
+        "by_status": dict(by_status),
+        "detail": detail,
+    }
+
+
+async def _scenario(
+    cli: httpx.AsyncClient,
+    name: str,
+    size: int,
+    n_requests: int,
+    concurrency: int,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    sem = asyncio.Semaphore(concurrency)
+    lat: List[float] = []
+    statuses: Counter = Counter()
+    signals = 0
+
+    async def one(req: int) -> None:
+        nonlocal signals
+        q = dict(params)
+        if name == "solana":
+            q["mints"] = ",".join(f"Bench{size}r{req}m{i:05d}" for i in range(size))
+        async with sem:
+            t0 = time.perf_counter()
+            r = await cli.get("/signals", params=q)
+            lat.append((time.perf_counter() - t0) * 1000.0)
+        statuses[r.status_code] += 1
+        if r.status_code == 200:
+            signals += len(r.json())
+
+    before = stub_upstreams.calls_snapshot()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    wall = time.perf_counter() - started
+
+    return {
+        "scenario": name,
+        "mints": size,
+        "requests": n_requests,
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "signals": signals,
+        "wall_s": round(wall, 3),
+        "throughput": {
+            "requests_per_s": round(n_requests / wall, 3),
+            "mints_per_s": round(size * n_requests / wall, 2),
+            "signals_per_s": round(signals / wall, 2),
+        },
+        "latency_ms": {
+            "p50": round(_pct(lat, 50), 2),
+            "p95": round(_pct(lat, 95), 2),
+            "p99": round(_pct(lat, 99), 2),
+            "mean": round(statistics.fmean(lat), 2),
+            "max": round(max(lat), 2),
+        },
+        "upstream_calls": _calls_delta(before, stub_upstreams.calls_snapshot()),
+    }
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    stub_upstreams.configure(
+        latency=args.latency,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        error_upstreams=tuple(u.strip() for u in args.error_upstreams.split(",") if u.strip()),
+        dex_profiles=args.dex_profiles,
+        seed=args.seed,
+    )
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    base = {"analyze": "true" if args.analyze else "false", "concurrency": args.enrich_concurrency}
+    results = []
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as cli:
+            # Aquece pools/conexões e imports preguiçosos fora da medição
+            await _scenario(cli, "solana", 2, 1, 1, base)
+            for size in sizes:
+                results.append(await _scenario(cli, "solana", size, args.requests, args.concurrency, base))
+                print(f"solana n={size}: {results[-1]['throughput']['mints_per_s']} mints/s "
+                      f"p50={results[-1]['latency_ms']['p50']}ms", file=sys.stderr)
+            if args.dex:
+                results.append(await _scenario(cli, "dex", args.dex_profiles, args.requests, args.concurrency,
+                                               {"chain": "dex", "analyze": base["analyze"]}))
+
+    return {
+        "benchmark": "bench_e2e",
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "config": {
+            "sizes": sizes,
+            "requests_per_size": args.requests,
+            "request_concurrency": args.concurrency,
+            "enrich_concurrency": args.enrich_concurrency,
+            "analyze": args.analyze,
+            "latency": args.latency or f"fixed:{stub_upstreams.STUB_LATENCY_MS}",
+            "rate_429": args.rate_429,
+            "rate_5xx": args.rate_5xx,
+            "error_upstreams": args.error_upstreams,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1,10,100,1000", help="Mints por request, separados por vírgula")
+    ap.add_argument("--requests", type=int, default=5, help="Requests por tamanho")
+    ap.add_argument("--concurrency", type=int, default=1, help="Requests simultâneos")
+    ap.add_argument("--enrich-concurrency", type=int, default=ENRICH_CONCURRENCY)
+    ap.add_argument("--analyze", action="store_true", help="Inclui o LLM (stub OpenAI)")
+    ap.add_argument("--dex", action="store_true", help="Inclui o cenário chain=dex")
+    ap.add_argument("--dex-profiles", type=int, default=stub_upstreams.STUB_DEX_PROFILES)
+    ap.add_argument("--latency", default=stub_upstreams.STUB_LATENCY,
+                    help='Ex.: "lognormal:25:0.5,openai=lognormal:600:0.3" (ver stub_upstreams)')
+    ap.add_argument("--rate-429", type=float, default=stub_upstreams.STUB_RATE_429)
+    ap.add_argument("--rate-5xx", type=float, default=stub_upstreams.STUB_RATE_5XX)
+    ap.add_argument("--error-upstreams", default=",".join(stub_upstreams.UPSTREAMS))
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--out", default=None, help="Grava o JSON também neste arquivo")
+    args = ap.parse_args()
+
+    stub = StubServer(port=PORT).start()
+    try:
+        report = asyncio.run(main(args))
+    finally:
+        stub.stop()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
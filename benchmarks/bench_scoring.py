@@ -0,0 +1,72 @@
+# benchmarks/bench_scoring.py
+"""
+Scoring local por dict (attach_local_scoring) vs colunar (NumPy), com checagem de igualdade.
+
+    python -m benchmarks.bench_scoring --n 50000
+"""
+import argparse
+import json
+import random
+import time
+
+from app.utils.solana_normalizer import attach_local_scoring
+from app.utils.vector_scoring import columns_from_snapshots, decode_flags, score_columns
+
+
+def _snapshots(n: int, seed: int = 42):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        out.append({
+            "tokenAddress": f"m{i}",
+            "liquidityUSD": rnd.uniform(0, 80_000),
+            "mcapUSD": rnd.uniform(0, 5_000_000),
+            "fdvUSD": rnd.uniform(0, 20_000_000),
+            "holders": rnd.randint(0, 8_000),
+            "ageMinutes": rnd.randint(0, 5_000),
+            "volumeUSD_5m": rnd.uniform(0, 60_000),
+            "buySellPressure_5m": rnd.uniform(-1, 1),
+            "mintAuthorityDisabled": rnd.random() < 0.8,
+            "freezeAuthorityDisabled": rnd.random() < 0.8,
+            "links": [{"type": "website", "url": "https://x"}] if rnd.random() < 0.7 else [],
+        })
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=50_000)
+    args = ap.parse_args()
+    snaps = _snapshots(args.n)
+
+    t0 = time.perf_counter()
+    per_dict = [attach_local_scoring(dict(s)) for s in snaps]
+    dict_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cols = columns_from_snapshots(snaps)
+    extract_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    res = score_columns(**cols)
+    vector_s = time.perf_counter() - t0
+
+    identical = all(
+        d["score_local"] == float(res.score[i])
+        and d["flags"] == decode_flags(res.flags[i])
+        and d["classification"] == str(res.labels[i])
+        for i, d in enumerate(per_dict)
+    )
+    print(json.dumps({
+        "n": args.n,
+        "per_dict_ms": round(dict_s * 1000, 1),
+        "columns_extract_ms": round(extract_s * 1000, 1),
+        "vectorized_ms": round(vector_s * 1000, 1),
+        "speedup_scoring": round(dict_s / vector_s, 1),
+        "speedup_incl_extract": round(dict_s / (vector_s + extract_s), 1),
+        "identical": identical,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_shared_clients.py
+"""
+Compara latência (p50/p99) de /signals/solana/snapshot_enriched/{mint} entre:
+  - per-request: um httpx.AsyncClient novo por request (comportamento antigo)
+  - shared:      clientes criados no lifespan e reaproveitados (pool keep-alive)
+
+    python -m benchmarks.bench_shared_clients --requests 300 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+PORT = int(os.getenv("STUB_PORT", "8765"))
+os.environ.setdefault("BIRDEYE_BASE_URL", f"http://127.0.0.1:{PORT}")
+os.environ.setdefault("SOLSCAN_BASE", f"http://127.0.0.1:{PORT}")
+os.environ.setdefault("BIRDEYE_API_KEY", "bench")
+os.environ["DRY_RUN"] = "false"
+os.environ["BIRDEYE_DRY_RUN"] = "false"
+# Mede só o efeito do pool de conexões: sem rate limit de plano e sem cache de respostas
+os.environ.setdefault("BIRDEYE_RPS", "100000")
+os.environ.setdefault("SOLSCAN_META_CACHE", "false")
+os.environ.setdefault("BIRDEYE_CACHE_TTLS", ",".join(
+    f"{p}=0" for p in ("/defi/token_overview", "/defi/price", "/defi/token_pair",
+                       "/defi/history/market-trades", "/defi/token_trades_recent")
+))
+
+import httpx  # noqa: E402
+
+from app.main import app, lifespan  # noqa: E402
+from benchmarks.stub_upstreams import StubServer  # noqa: E402
+
+MINT = "So11111111111111111111111111111111111111112"
+
+
+def _pct(samples, p):
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+async def _drive(n_requests: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    lat = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as cli:
+        async def one():
+            async with sem:
+                t0 = time.perf_counter()
+                r = await cli.get(f"/signals/solana/snapshot_enriched/{MINT}")
+                lat.append((time.perf_counter() - t0) * 1000.0)
+                r.raise_for_status()
+        await asyncio.gather(*(one() for _ in range(n_requests)))
+    return {
+        "requests": n_requests,
+        "p50_ms": round(_pct(lat, 50), 2),
+        "p99_ms": round(_pct(lat, 99), 2),
+        "mean_ms": round(statistics.fmean(lat), 2),
+    }
+
+
+async def main(n_requests: int, concurrency: int):
+    out = {}
+
+    # Modo antigo: nada no app.state -> deps criam um cliente por request
+    app.state.solscan = None
+    app.state.birdeye = None
+    out["per_request"] = await _drive(n_requests, concurrency)
+
+    # Modo compartilhado: lifespan cria os clientes com pool
+    async with lifespan(app):
+        await _drive(min(20, n_requests), concurrency)  # aquece o pool
+        out["shared"] = await _drive(n_requests, concurrency)
+
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=300)
+    ap.add_argument("--concurrency", type=int, default=20)
+    args = ap.parse_args()
+
+    stub = StubServer(port=PORT).start()
+    try:
+        asyncio.run(main(args.requests, args.concurrency))
+    finally:
+        stub.stop()
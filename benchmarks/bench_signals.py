@@ -0,0 +1,97 @@
+# benchmarks/bench_signals.py
+"""
+Montagem + serialização de N Signals (padrão 10k) a partir de snapshots Solana:
+  - validated: Signal(**campos) + revalidação do response_model + jsonable_encoder + json.dumps
+               (o que o /signals fazia)
+  - construct: Signal.model_construct (sem validação) — medido só para comparação
+  - fast:      Signal.from_solana_snapshot (model_validate) + signals_response (dump_json do core)
+
+    python -m benchmarks.bench_signals --n 10000
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.signal_model import Link, Signal, solana_signal_fields
+from app.routers.responses import signals_response
+from app.utils.solana_normalizer import merge_birdeye_into_snapshot, normalize_solscan_meta_to_snapshot
+
+
+def _snapshots(n: int):
+    out = []
+    for i in range(n):
+        snap = normalize_solscan_meta_to_snapshot(
+            {"symbol": f"T{i}", "holder": 100 + i % 5000, "website": "https://x", "twitter": "https://x.com/t"},
+            f"mint{i:06d}",
+        )
+        out.append(merge_birdeye_into_snapshot(
+            snap,
+            {"data": {"liquidity": 5_000 + i, "market_cap": 250_000, "fdv": 300_000, "volume_24h_quote": 9e5}},
+            {"data": {"points": [{"unixTime": 1_700_000_000 + 300 * k, "volume_quote": 1_000.0 + k,
+                                  "buy": 10 + k, "sell": 8} for k in range(12)]}},
+            {"data": {"buyers": 12, "sellers": 7}},
+        ))
+    return out
+
+
+def _best(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=10_000)
+    args = ap.parse_args()
+    snaps = _snapshots(args.n)
+    response_adapter = TypeAdapter(List[Signal])
+
+    def build_legacy():
+        return [Signal(**solana_signal_fields(s)) for s in snaps]
+
+    def build_construct():
+        out = []
+        for s in snaps:
+            f = solana_signal_fields(s)
+            f["links"] = [Link.model_construct(**l) for l in f["links"]]
+            out.append(Signal.model_construct(**f))
+        return out
+
+    def build_fast():
+        return [Signal.from_solana_snapshot(s) for s in snaps]
+
+    def validated():
+        sigs = build_legacy()
+        checked = response_adapter.validate_python([s.model_dump() for s in sigs])
+        return json.dumps(jsonable_encoder(checked)).encode("utf-8")
+
+    def fast():
+        return signals_response(build_fast()).body
+
+    assert json.loads(validated()) == json.loads(fast())
+    build_validated_ms = _best(build_legacy)
+    build_construct_ms = _best(build_construct)
+    build_fast_ms = _best(build_fast)
+    total_validated = _best(validated)
+    total_fast = _best(fast)
+    print(json.dumps({
+        "n": args.n,
+        "build_validated_ms": round(build_validated_ms, 1),
+        "build_construct_ms": round(build_construct_ms, 1),
+        "build_fast_ms": round(build_fast_ms, 1),
+        "end_to_end_validated_ms": round(total_validated, 1),
+        "end_to_end_fast_ms": round(total_fast, 1),
+        "speedup_end_to_end": round(total_validated / total_fast, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
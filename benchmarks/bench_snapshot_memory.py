@@ -0,0 +1,76 @@
+# benchmarks/bench_snapshot_memory.py
+"""
+Memória (tracemalloc) e tempo de N snapshots enriquecidos: dict vs Snapshot (slots).
+No modo dict o snapshot é convertido com to_dict() logo após o normalize (mesmo conteúdo).
+
+    python -m benchmarks.bench_snapshot_memory --n 100000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from app.models.snapshot import Snapshot
+from app.utils.solana_normalizer import merge_birdeye_into_snapshot, normalize_solscan_meta_to_snapshot
+
+
+def _build(n: int, as_dict: bool):
+    out = []
+    for i in range(n):
+        snap = normalize_solscan_meta_to_snapshot(
+            {"symbol": f"T{i}", "holder": 100 + i % 5000, "website": "https://x", "created_time": 1_700_000_000},
+            f"mint{i:06d}",
+        )
+        if as_dict:
+            snap = snap.to_dict()
+        snap = merge_birdeye_into_snapshot(
+            snap,
+            {"data": {"liquidity": 5_000 + i, "market_cap": 250_000, "fdv": 300_000}},
+            {"data": {"points": [{"unixTime": 1_700_000_000 + 300 * k, "volume_quote": 1_000.0 + k,
+                                  "buy": 10 + k, "sell": 8} for k in range(12)]}},
+            {"data": {"buyers": 12, "sellers": 7}},
+        )
+        out.append(snap)
+    return out
+
+
+def _measure(n: int, as_dict: bool):
+    # Tempo sem tracemalloc (ele deixa a alocação ~10x mais lenta)
+    gc.collect()
+    t0 = time.perf_counter()
+    snaps = _build(n, as_dict)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for s in snaps:
+        s.to_dict() if isinstance(s, Snapshot) else dict(s)
+    serialize_s = time.perf_counter() - t0
+    del snaps
+
+    gc.collect()
+    tracemalloc.start()
+    snaps = _build(n, as_dict)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del snaps
+    return {"retained_mb": round(current / 2**20, 1), "build_s": round(build_s, 2), "to_dict_s": round(serialize_s, 2)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    args = ap.parse_args()
+
+    as_dict = _measure(args.n, as_dict=True)
+    slots = _measure(args.n, as_dict=False)
+    print(json.dumps({
+        "n": args.n,
+        "dict": as_dict,
+        "snapshot_slots": slots,
+        "memory_ratio": round(as_dict["retained_mb"] / slots["retained_mb"], 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+# benchmarks/stub_upstreams.py
+"""
+Servidor local que imita Birdeye + Solscan + DexScreener + OpenAI para benchmarks offline.
+
+    python -m benchmarks.stub_upstreams --port 8765 --latency-ms 20
+    python -m benchmarks.stub_upstreams --latency "lognormal:20:0.5,openai=lognormal:700:0.3" --rate-429 0.02
+
+Payloads variam de forma determinística por mint (hash), no formato que os clientes
+esperam. Cada upstream tem sua distribuição de latência e pode injetar 429/5xx;
+as chamadas ficam contadas por (upstream, rota, status) (ver calls_snapshot).
+
+Latência (ms): "20" | "fixed:20" | "uniform:10:40" | "lognormal:<mediana>:<sigma>",
+por upstream com "birdeye=...,solscan=...,dexscreener=...,openai=..." (sem nome = todos).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+UPSTREAMS = ("birdeye", "solscan", "dexscreener", "openai")
+
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "20"))
+STUB_LATENCY = os.getenv("STUB_LATENCY", "")
+STUB_RATE_429 = float(os.getenv("STUB_RATE_429", "0"))
+STUB_RATE_5XX = float(os.getenv("STUB_RATE_5XX", "0"))
+STUB_RETRY_AFTER = os.getenv("STUB_RETRY_AFTER", "0")
+STUB_DEX_PROFILES = int(os.getenv("STUB_DEX_PROFILES", "30"))
+
+# ------------------------------
+# Configuração (latência / erros)
+# ------------------------------
+def parse_latency(spec: str) -> Callable[[], float]:
+    """'lognormal:20:0.5' -> função que sorteia a latência em segundos."""
+    parts = str(spec).strip().split(":")
+    if len(parts) == 1:
+        parts = ["fixed"] + parts
+    kind, args = parts[0], [float(p) for p in parts[1:]]
+    if kind == "fixed":
+        ms = args[0] if args else 0.0
+        return lambda: ms / 1000.0
+    if kind == "uniform":
+        lo, hi = args
+        return lambda: random.uniform(lo, hi) / 1000.0
+    if kind == "lognormal":
+        median, sigma = args
+        mu = math.log(max(median, 1e-6))
+        return lambda: random.lognormvariate(mu, sigma) / 1000.0
+    raise ValueError(f"Distribuição de latência desconhecida: {spec!r}")
+
+
+def parse_latency_map(spec: str, default: str) -> Dict[str, Callable[[], float]]:
+    out = {u: parse_latency(default) for u in UPSTREAMS}
+    for item in filter(None, (p.strip() for p in (spec or "").split(","))):
+        name, sep, value = item.partition("=")
+        if not sep:
+            out = {u: parse_latency(item) for u in UPSTREAMS}
+        elif name in out:
+            out[name] = parse_latency(value)
+        else:
+            raise ValueError(f"Upstream desconhecido: {name!r}")
+    return out
+
+
+class _State:
+    def __init__(self) -> None:
+        self.latency = parse_latency_map(STUB_LATENCY, f"fixed:{STUB_LATENCY_MS}")
+        self.rate_429: Dict[str, float] = {u: STUB_RATE_429 for u in UPSTREAMS}
+        self.rate_5xx: Dict[str, float] = {u: STUB_RATE_5XX for u in UPSTREAMS}
+        self.retry_after = STUB_RETRY_AFTER
+        self.dex_profiles = STUB_DEX_PROFILES
+        self.rng = random.Random()
+        self.lock = threading.Lock()
+        self.calls: Counter = Counter()
+
+
+STATE = _State()
+
+
+def configure(
+    *,
+    latency: Optional[str] = None,
+    rate_429: Optional[float] = None,
+    rate_5xx: Optional[float] = None,
+    error_upstreams: Tuple[str, ...] = UPSTREAMS,
+    retry_after: Optional[str] = None,
+    dex_profiles: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> None:
+    """Ajusta o stub em tempo de execução (o benchmark chama antes de cada cenário)."""
+    if latency is not None:
+        STATE.latency = parse_latency_map(latency, f"fixed:{STUB_LATENCY_MS}")
+    for u in UPSTREAMS:
+        if rate_429 is not None:
+            STATE.rate_429[u] = rate_429 if u in error_upstreams else 0.0
+        if rate_5xx is not None:
+            STATE.rate_5xx[u] = rate_5xx if u in error_upstreams else 0.0
+    if retry_after is not None:
+        STATE.retry_after = retry_after
+    if dex_profiles is not None:
+        STATE.dex_profiles = dex_profiles
+    if seed is not None:
+        STATE.rng.seed(seed)
+        random.seed(seed)
+
+
+def calls_snapshot() -> Dict[str, int]:
+    """{"upstream route status": n} — diferença entre dois snapshots = chamadas do cenário."""
+    with STATE.lock:
+        return {f"{u} {path} {status}": n for (u, path, status), n in STATE.calls.items()}
+
+
+def reset_calls() -> None:
+    with STATE.lock:
+        STATE.calls.clear()
+
+
+def _upstream(name: str):
+    """Latência sorteada + injeção de 429/5xx + contagem, em volta do handler."""
+    def deco(handler):
+        async def endpoint(request: Request):
+            delay = STATE.latency[name]()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            roll = STATE.rng.random()
+            if roll < STATE.rate_429[name]:
+                resp = JSONResponse({"success": False, "message": "Too many requests"}, status_code=429,
+                                    headers={"Retry-After": STATE.retry_after})
+            elif roll < STATE.rate_429[name] + STATE.rate_5xx[name]:
+                resp = JSONResponse({"success": False, "message": "Service unavailable"}, status_code=503)
+            else:
+                resp = await handler(request)
+            with STATE.lock:
+                STATE.calls[(name, request.url.path, resp.status_code)] += 1
+            return resp
+        return endpoint
+    return deco
+
+
+# ------------------------------
+# Payloads
+# ------------------------------
+def _seed(mint: str) -> int:
+    return int.from_bytes(hashlib.blake2b(mint.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def _market(mint: str) -> Dict[str, float]:
+    h = _seed(mint)
+    liquidity = 2_000 + h % 250_000
+    mcap = liquidity * (4 + h % 40)
+    return {
+        "address": mint,
+        "price": round(0.00001 + (h % 100_000) / 1e7, 8),
+        "liquidity": liquidity,
+        "market_cap": mcap,
+        "fdv": int(mcap * 1.1),
+        "volume_24h_quote": liquidity * (0.5 + (h % 30) / 10),
+    }
+
+
+@_upstream("birdeye")
+async def token_overview(request: Request):
+    return JSONResponse({"success": True, "data": _market(request.query_params.get("address", ""))})
+
+
+@_upstream("birdeye")
+async def price(request: Request):
+    m = _market(request.query_params.get("address", ""))
+    return JSONResponse({"success": True, "data": {"value": m["price"], "liquidity": m["liquidity"]}})
+
+
+@_upstream("birdeye")
+async def market_data_multiple(request: Request):
+    mints = [m for m in request.query_params.get("list_address", "").split(",") if m]
+    return JSONResponse({"success": True, "data": {m: _market(m) for m in mints}})
+
+
+@_upstream("birdeye")
+async def multi_price(request: Request):
+    mints = [m for m in request.query_params.get("list_address", "").split(",") if m]
+    return JSONResponse({"success": True, "data": {
+        m: {"value": _market(m)["price"], "liquidity": _market(m)["liquidity"]} for m in mints
+    }})
+
+
+@_upstream("birdeye")
+async def market_trades(request: Request):
+    h = _seed(request.query_params.get("address", ""))
+    limit = int(request.query_params.get("limit", "12") or 12)
+    now = int(time.time()) // 300 * 300
+    points = [
+        {"unixTime": now - 300 * (limit - 1 - i), "volume_quote": 500 + (h >> i) % 5_000,
+         "buy": 5 + (h >> (i + 1)) % 40, "sell": 3 + (h >> (i + 2)) % 30}
+        for i in range(limit)
+    ]
+    return JSONResponse({"success": True, "data": {"points": points}})
+
+
+@_upstream("birdeye")
+async def trades_recent(request: Request):
+    h = _seed(request.query_params.get("address", ""))
+    return JSONResponse({"success": True, "data": {
+        "buyers": 5 + h % 60, "sellers": 3 + (h >> 3) % 40, "buys": 10 + h % 90, "sells": 6 + (h >> 5) % 70,
+    }})
+
+
+@_upstream("birdeye")
+async def token_pair(request: Request):
+    return JSONResponse({"success": True, "data": []})
+
+
+def _solscan_meta(mint: str) -> Dict[str, object]:
+    h = _seed(mint)
+    return {
+        "address": mint, "symbol": f"S{h % 10_000}", "name": f"Stub {h % 10_000}",
+        "holder": 50 + h % 20_000, "website": "https://example.org" if h % 3 else None,
+        "twitter": f"https://x.com/stub{h % 1000}" if h % 2 else None,
+        "created_time": int(time.time()) - 600 - h % 604_800,
+        "mint_authority": None if h % 5 else "Auth111", "freeze_authority": None,
+    }
+
+
+@_upstream("solscan")
+async def solscan_meta_v2(request: Request):
+    return JSONResponse({"success": True, "data": _solscan_meta(request.query_params.get("address", ""))})
+
+
+@_upstream("solscan")
+async def solscan_meta_v1(request: Request):
+    return JSONResponse({"success": True, "data": _solscan_meta(request.query_params.get("tokenAddress", ""))})
+
+
+@_upstream("dexscreener")
+async def dex_profiles(request: Request):
+    chains = ("solana", "ethereum", "bsc", "base")
+    descriptions = ("community token", "fair launch, locked liquidity", "100x guaranteed pump", "")
+    out = []
+    for i in range(STATE.dex_profiles):
+        addr = f"dex{i:06d}"
+        chain = chains[i % len(chains)]
+        out.append({
+            "url": f"https://dexscreener.com/{chain}/{addr}", "chainId": chain, "tokenAddress": addr,
+            "icon": f"https://cdn.example.org/{addr}.png", "header": f"https://cdn.example.org/{addr}-h.png",
+            "description": descriptions[i % len(descriptions)],
+            "links": [{"type": "twitter", "url": f"https://x.com/{addr}"}],
+        })
+    return JSONResponse(out)
+
+
+_ADDR_RE = re.compile(r'"tokenAddress":\s*"([^"]+)"')
+_DECISIONS = ("comprar", "observar", "evitar")
+
+
+@_upstream("openai")
+async def chat_completions(request: Request):
+    body = await request.json()
+    user = next((m.get("content", "") for m in body.get("messages", []) if m.get("role") == "user"), "")
+    verdicts = []
+    for addr in dict.fromkeys(_ADDR_RE.findall(user)):
+        h = _seed(addr)
+        verdicts.append({
+            "tokenAddress": addr, "decision": _DECISIONS[h % 3], "confidence": 40 + h % 55,
+            "rationale": "Liquidez e atividade avaliadas pelo stub.",
+        })
+    return JSONResponse({
+        "id": f"chatcmpl-stub{int(time.time() * 1000)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0, "finish_reason": "stop",
+            "message": {"role": "assistant", "content": json.dumps(verdicts, ensure_ascii=False)},
+        }],
+        "usage": {"prompt_tokens": len(user) // 4, "completion_tokens": 30 * len(verdicts),
+                  "total_tokens": len(user) // 4 + 30 * len(verdicts)},
+    })
+
+
+app = Starlette(routes=[
+    Route("/defi/token_overview", token_overview),
+    Route("/defi/price", price),
+    Route("/defi/multi_price", multi_price),
+    Route("/defi/v3/token/market-data/multiple", market_data_multiple),
+    Route("/defi/history/market-trades", market_trades),
+    Route("/defi/token_trades_recent", trades_recent),
+    Route("/defi/token_pair", token_pair),
+    Route("/v2.0/token/meta", solscan_meta_v2),
+    Route("/v1.0/token/meta", solscan_meta_v1),
+    Route("/token-profiles/latest/v1", dex_profiles),
+    Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+])
+
+
+class StubServer:
+    """Sobe o stub com uvicorn numa thread (para usar dentro de um benchmark)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765):
+        import uvicorn
+        self.host = host
+        self.port = port
+        self._server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=STUB_LATENCY_MS)
+    ap.add_argument("--latency", default=STUB_LATENCY, help="Distribuição(ões) de latência; ver docstring")
+    ap.add_argument("--rate-429", type=float, default=STUB_RATE_429)
+    ap.add_argument("--rate-5xx", type=float, default=STUB_RATE_5XX)
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+    STUB_LATENCY_MS = args.latency_ms
+    configure(latency=args.latency, rate_429=args.rate_429, rate_5xx=args.rate_5xx, seed=args.seed)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")